@@ -0,0 +1,150 @@
+"""
+Lecturas y escrituras concurrentes sobre SQLite con la configuracion de
+Django por defecto (rollback journal, transacciones DEFERRED, una conexion
+nueva por request) contra la del proyecto (backend ``todo_challenge.db``:
+WAL, busy_timeout, mmap, transacciones IMMEDIATE y ``CONN_MAX_AGE``).
+
+``--readers`` hilos leen una pagina del listado y ``--writers`` hilos
+invierten ``completed`` leyendo y escribiendo en una transaccion, durante
+``--seconds``. Despues de cada operacion se cierra la conexion si su
+``CONN_MAX_AGE`` vencio, como al terminar un request. Cada configuracion
+usa su propia copia de la base.
+
+    python -m benchmarks.bench_sqlite_tuning --rows 100000 --readers 8 --writers 4
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks import common
+
+
+def configure(directory):
+    """Agrega los alias ``plain`` y ``tuned`` (antes de configurar Django)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_challenge.settings")
+    from django.conf import settings
+
+    default = settings.DATABASES["default"]
+    settings.DATABASES["plain"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(directory, "plain.sqlite3"),
+    }
+    settings.DATABASES["tuned"] = {
+        **default, "NAME": os.path.join(directory, "tuned.sqlite3")
+    }
+    return ["plain", "tuned"]
+
+
+def read(alias, rnd, user_ids, task_ids):
+    from tasks.models import Task
+
+    list(
+        Task.objects.using(alias).filter(user_id=rnd.choice(user_ids))
+        .order_by("-created_at").values("id", "title", "completed")[:20]
+    )
+
+
+def write(alias, rnd, user_ids, task_ids):
+    from django.db import transaction
+    from django.db.models import F
+    from tasks.models import Task
+
+    pk = rnd.choice(task_ids)
+    with transaction.atomic(using=alias):
+        tasks = Task.objects.using(alias).filter(pk=pk)
+        completed = tasks.values_list("completed", flat=True).first()
+        tasks.update(completed=not completed, version=F("version") + 1)
+
+
+def worker(alias, operation, deadline, args, results, seed):
+    from django.db import OperationalError, connections
+
+    rnd = random.Random(seed)
+    latencies, errors = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            operation(alias, rnd, *args)
+        except OperationalError:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+        connections[alias].close_if_unusable_or_obsolete()
+    connections[alias].close()
+    results.append((operation.__name__, latencies, errors))
+
+
+def run(alias, readers, writers, seconds, args):
+    results = []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=worker, args=(alias, operation, deadline, args, results, n)
+        )
+        for n, operation in enumerate([read] * readers + [write] * writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def report(alias, results, seconds):
+    from django.db import connections
+
+    with connections[alias].cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode")
+        journal = cursor.fetchone()[0]
+    connections[alias].close()
+    print(f"{alias} (journal_mode={journal})")
+    for name in ("read", "write"):
+        latencies = [t for op, samples, _ in results if op == name for t in samples]
+        errors = sum(e for op, _, e in results if op == name)
+        p50, p99 = common.percentiles(latencies or [0])
+        print(
+            f"  {name:5} {len(latencies) / seconds:8.0f} ops/s "
+            f"p50={p50:8.2f}ms p99={p99:8.2f}ms locked={errors}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="todo-bench-")
+    aliases = configure(directory)
+    common.setup(os.path.join(directory, "seed.sqlite3"))
+    common.seed_tasks(args.rows, users=args.users, heavy_share=0)
+
+    from django.conf import settings
+    from django.db import connection
+    from tasks.models import Task
+
+    for alias in aliases:
+        # Copia compacta en modo rollback journal; cada backend la configura.
+        with connection.cursor() as cursor:
+            cursor.execute("VACUUM INTO %s", [settings.DATABASES[alias]["NAME"]])
+    user_ids = list(Task.objects.values_list("user_id", flat=True).distinct())
+    task_ids = list(Task.objects.values_list("id", flat=True))
+    print(
+        f"{args.rows} tareas, {args.readers} lectores y {args.writers} escritores, "
+        f"{args.seconds:g}s por configuracion\n"
+    )
+    for alias in aliases:
+        results = run(
+            alias, args.readers, args.writers, args.seconds, (user_ids, task_ids)
+        )
+        report(alias, results, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Carga concurrente sobre el listado y el detalle de tareas: vistas sync bajo
+WSGI (pool de ``--wsgi-threads`` hilos, como un servidor gthread), vistas
+sync bajo ASGI y vistas async (``/api/async/``) bajo ASGI. ``--concurrency``
+clientes (1000 por defecto) hacen requests sin pausa hasta completar
+``--requests``; la latencia incluye la espera en la cola del servidor.
+
+Los handlers de Django se llaman en el mismo proceso (sin sockets), asi que
+se compara solo el modelo de concurrencia de cada opcion.
+
+    python -m benchmarks.bench_task_async --rows 100000 --concurrency 1000
+"""
+import argparse
+import asyncio
+import io
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+
+
+def build_requests(count, tokens, task_ids, prefix, seed=1):
+    """(path, query_string, token): 70% listados, 30% detalles."""
+    rnd = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        user_id, token = rnd.choice(tokens)
+        if rnd.random() < 0.7:
+            requests.append((prefix, f"limit=10&offset={rnd.randint(0, 50)}", token))
+        else:
+            requests.append((f"{prefix}{rnd.choice(task_ids[user_id])}/", "", token))
+    return requests
+
+
+def call_wsgi(handler, path, query, token):
+    status = []
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_AUTHORIZATION": f"Bearer {token}",
+        "wsgi.input": io.BytesIO(b""),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+    }
+    body = b"".join(handler(environ, lambda code, headers: status.append(code)))
+    return int(status[0].split()[0]), len(body)
+
+
+async def call_asgi(application, path, query, token):
+    status, size = [], 0
+    disconnect = asyncio.Event()
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await application({
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 40000),
+        "server": ("testserver", 80),
+    }, receive, send)
+    disconnect.set()
+    return status[0], size
+
+
+async def run_load(requests, concurrency, call):
+    """Ejecuta ``requests`` con ``concurrency`` clientes; devuelve latencias."""
+    queue = list(reversed(requests))
+    latencies, errors = [], 0
+
+    async def client():
+        nonlocal errors
+        while queue:
+            path, query, token = queue.pop()
+            start = time.perf_counter()
+            status, _ = await call(path, query, token)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(label, latencies, errors, elapsed):
+    p50, p99 = common.percentiles(latencies)
+    print(
+        f"  {label:22} {len(latencies) / elapsed:8.0f} req/s "
+        f"p50={p50:9.2f}ms p99={p99:9.2f}ms errores={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--wsgi-threads", type=int, default=32)
+    args = parser.parse_args()
+
+    common.setup()
+    owners = common.seed_tasks(args.rows, users=args.users, heavy_share=0)
+
+    from django.conf import settings
+    from django.core.handlers.asgi import ASGIHandler
+    from django.core.handlers.wsgi import WSGIHandler
+    from rest_framework_simplejwt.tokens import AccessToken
+    from tasks.models import Task
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    settings.TASKS_CACHE_ENABLED = False
+    task_ids = {}
+    for pk, user_id in Task.objects.values_list("id", "user_id"):
+        task_ids.setdefault(user_id, []).append(pk)
+    tokens = [
+        (user.id, str(AccessToken.for_user(user)))
+        for user in owners if user.id in task_ids
+    ]
+
+    wsgi = WSGIHandler()
+    asgi = ASGIHandler()
+    pool = ThreadPoolExecutor(args.wsgi_threads)
+
+    async def wsgi_call(path, query, token):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, call_wsgi, wsgi, path, query, token)
+
+    async def asgi_call(path, query, token):
+        return await call_asgi(asgi, path, query, token)
+
+    scenarios = [
+        (f"WSGI sync ({args.wsgi_threads} hilos)", "/api/", wsgi_call),
+        ("ASGI sync", "/api/", asgi_call),
+        ("ASGI async", "/api/async/", asgi_call),
+    ]
+    print(
+        f"{args.rows} tareas, {args.users} usuarios, {args.requests} requests, "
+        f"{args.concurrency} clientes concurrentes\n"
+    )
+    for label, prefix, call in scenarios:
+        requests = build_requests(args.requests, tokens, task_ids, prefix)
+        report(label, *asyncio.run(run_load(requests, args.concurrency, call)))
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Importacion en streaming (tasks.importer): filas/s y pico de memoria
+(tracemalloc) al importar archivos NDJSON de distinto tamaño. El pico no
+deberia crecer con la cantidad de filas.
+
+    python -m benchmarks.bench_task_import --sizes 10000 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import common
+
+
+def write_file(rows, seed=1):
+    rnd = random.Random(seed)
+    words = common.vocabulary(seed=seed)
+    fd, path = tempfile.mkstemp(suffix=".ndjson")
+    with os.fdopen(fd, "w") as f:
+        for _ in range(rows):
+            f.write(json.dumps({
+                "title": " ".join(rnd.choices(words, k=3)),
+                "description": " ".join(rnd.choices(words, k=12)),
+                "completed": rnd.random() < 0.5,
+            }) + "\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    common.setup()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from tasks.importer import TaskImporter, decode_lines, ndjson_rows
+
+    settings.DEBUG = False  # con DEBUG cada INSERT queda en connection.queries
+    user = User.objects.create(username="bench-import", password="!")
+    for size in args.sizes:
+        path = write_file(size)
+        importer = TaskImporter(user.id, batch_size=args.batch_size, max_errors=100)
+        with open(path, "rb") as stream:
+            tracemalloc.start()
+            start = time.perf_counter()
+            summary = importer.run(ndjson_rows(decode_lines(stream)))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        os.remove(path)
+        print(
+            f"{size:>8} filas  {summary['accepted'] / elapsed:9.0f} filas/s  "
+            f"pico={peak / 2**20:6.2f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Planes de consulta y latencia p50/p99 del listado de tareas antes y despues
+de los indices compuestos de ``Task``.
+
+Para cada combinacion de filtro (TaskFilter) y orden (OrderingFilter) que
+permite TaskListCreateView se mide lo mismo que hace la vista: la pagina de
+``LimitOffsetPagination`` y su ``COUNT(*)``.
+
+    python -m benchmarks.bench_task_indexes --rows 2000000 --repeat 30
+"""
+import argparse
+from datetime import timedelta
+
+from benchmarks import common
+
+FILTERS = {
+    "sin filtro": {},
+    "completed=true": {"completed": "true"},
+    "completed=false": {"completed": "false"},
+    "created_at rango": {"created_at_after": -180, "created_at_before": -90},
+    "updated_at rango": {"updated_at_after": -180, "updated_at_before": -90},
+}
+ORDERINGS = ["-created_at", "created_at", "-updated_at", "updated_at", "title", "-title"]
+
+
+def build_params(spec):
+    from django.utils import timezone
+
+    today = timezone.localdate()
+    return {
+        key: (today + timedelta(days=value)).isoformat()
+        if isinstance(value, int)
+        else value
+        for key, value in spec.items()
+    }
+
+
+def build_queryset(user, params, ordering):
+    from tasks.filters import TaskFilter
+    from tasks.models import Task
+
+    queryset = Task.objects.filter(user=user)
+    return TaskFilter(params, queryset=queryset).qs.order_by(ordering)
+
+
+def query_plan(queryset):
+    from django.db import connection
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " | ".join(row[-1] for row in cursor.fetchall())
+
+
+def drop_indexes():
+    """Vuelve al esquema original: solo el indice del FK ``user``."""
+    from django.db import connection
+    from tasks.models import Task
+
+    with connection.schema_editor() as editor:
+        for index in Task._meta.indexes:
+            editor.remove_index(Task, index)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX bench_task_user_id ON tasks_task (user_id)"
+        )
+        cursor.execute("ANALYZE")
+
+
+def create_indexes():
+    from django.db import connection
+    from tasks.models import Task
+
+    with connection.cursor() as cursor:
+        cursor.execute("DROP INDEX bench_task_user_id")
+    with connection.schema_editor() as editor:
+        for index in Task._meta.indexes:
+            editor.add_index(Task, index)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def run(user, repeat, limit):
+    results = {}
+    for filter_name, spec in FILTERS.items():
+        params = build_params(spec)
+        for ordering in ORDERINGS:
+            queryset = build_queryset(user, params, ordering)
+
+            def page_and_count():
+                queryset.count()
+                list(queryset[:limit])
+
+            p50, p99 = common.timeit(page_and_count, repeat)
+            results[(filter_name, ordering)] = (
+                query_plan(queryset[:limit]),
+                p50,
+                p99,
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    common.setup()
+    users = common.seed_tasks(args.rows, users=args.users)
+    heavy = users[0]
+
+    drop_indexes()
+    before = run(heavy, args.repeat, args.limit)
+    create_indexes()
+    after = run(heavy, args.repeat, args.limit)
+
+    print(f"{args.rows} tareas, usuario pesado con ~{args.rows // 2}\n")
+    for key, (plan_before, p50_b, p99_b) in before.items():
+        plan_after, p50_a, p99_a = after[key]
+        print(f"[{key[0]} / ordering={key[1]}]")
+        print(f"  antes   p50={p50_b:9.2f}ms p99={p99_b:9.2f}ms  {plan_before}")
+        print(f"  despues p50={p50_a:9.2f}ms p99={p99_a:9.2f}ms  {plan_after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Listado paginado del usuario pesado segun ``?pagination=``: ``offset``
+(COUNT exacto), ``nocount`` (limit + 1) y ``cached`` (contadores de
+TaskCollection), pasando por TaskListCreateView sin cache de respuestas.
+
+    python -m benchmarks.bench_task_pagination --rows 1000000
+"""
+import argparse
+
+from benchmarks import common
+
+MODES = ["offset", "nocount", "cached", "cursor"]
+PARAMS = {"sin filtro": {}, "completed=true": {"completed": "true"}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    common.setup()
+    heavy = common.seed_tasks(args.rows, users=args.users)[0]
+
+    from django.conf import settings
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from tasks.models import TaskCollection
+    from tasks.stats import count_tasks
+    from tasks.views import TaskListCreateView
+
+    settings.TASKS_CACHE_ENABLED = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    TaskCollection.objects.create(user=heavy, version=1, **count_tasks(heavy.id))
+    view = TaskListCreateView.as_view()
+    factory = APIRequestFactory()
+    print(f"{args.rows} tareas, usuario pesado con ~{args.rows // 2}\n")
+    for label, params in PARAMS.items():
+        print(label)
+        for mode in MODES:
+            def page():
+                request = factory.get("/api/", {"pagination": mode, **params})
+                force_authenticate(request, user=heavy)
+                response = view(request)
+                assert response.status_code == 200, response.data
+
+            p50, p99 = common.timeit(page, args.repeat)
+            print(f"  {mode:8} p50={p50:9.2f}ms p99={p99:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
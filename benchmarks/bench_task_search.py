@@ -0,0 +1,62 @@
+"""
+Busqueda de tareas: LIKE '%termino%' (SearchFilter de DRF) contra el indice
+FTS5 (TaskSearchFilter), midiendo p50/p99 de la pagina y su COUNT(*).
+
+    python -m benchmarks.bench_task_search --rows 1000000
+"""
+import argparse
+
+from benchmarks import common
+
+TERMS = ["leche", "revisar codigo", "fac", "reunion casa", "inexistente"]
+
+
+class SearchView:
+    search_fields = ["title", "description"]
+
+
+def build_request(term):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    return Request(APIRequestFactory().get("/", {"search": term}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    common.setup()
+    heavy = common.seed_tasks(args.rows, users=args.users)[0]
+
+    from rest_framework.filters import SearchFilter
+    from tasks.filters import TaskSearchFilter
+    from tasks.models import Task
+
+    backends = {"LIKE": SearchFilter(), "FTS5": TaskSearchFilter()}
+    print(f"{args.rows} tareas, usuario pesado con ~{args.rows // 2}\n")
+    for term in TERMS:
+        request = build_request(term)
+        print(f"search={term!r}")
+        for name, backend in backends.items():
+            queryset = backend.filter_queryset(
+                request, Task.objects.filter(user=heavy), SearchView()
+            )
+
+            def page_and_count():
+                queryset.count()
+                list(queryset[:args.limit])
+
+            p50, p99 = common.timeit(page_and_count, args.repeat)
+            print(
+                f"  {name:5} p50={p50:9.2f}ms p99={p99:9.2f}ms "
+                f"matches={queryset.count()}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Serializacion del listado: ``TaskSerializer`` sobre instancias del modelo
+contra ``TaskReadSerializer`` sobre ``values()``, incluyendo la consulta.
+
+    python -m benchmarks.bench_task_serializer --repeat 20
+"""
+import argparse
+
+from benchmarks import common
+
+SIZES = [100, 1_000, 10_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    common.setup()
+    user = common.seed_tasks(max(SIZES), users=1, heavy_share=1.0)[0]
+
+    from tasks.models import Task
+    from tasks.serializers import TaskReadSerializer, TaskSerializer
+
+    queryset = Task.objects.filter(user=user).order_by("-created_at")
+    for size in SIZES:
+        page = queryset[:size]
+        paths = {
+            "TaskSerializer": lambda: TaskSerializer(page, many=True).data,
+            "TaskReadSerializer": lambda: TaskReadSerializer(
+                page.values(*TaskReadSerializer.fields), many=True
+            ).data,
+        }
+        assert paths["TaskSerializer"]() == paths["TaskReadSerializer"]()
+        print(f"{size} filas")
+        for name, fn in paths.items():
+            p50, p99 = common.timeit(fn, args.repeat)
+            print(f"  {name:18} p50={p50:9.2f}ms p99={p99:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
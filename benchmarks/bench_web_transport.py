@@ -0,0 +1,137 @@
+"""
+Latencia de las paginas de la web segun como llaman a la API
+(``API_TRANSPORT``): HTTP contra un servidor WSGI con hilos en el mismo
+proceso (loopback real: socket, segundo request y JSON), con una conexion
+nueva por llamada (``requests.request``) y con HttpTransport (sesion con
+pool keep-alive), e InProcessTransport (la vista de la API se llama directo).
+
+Las paginas se piden con el Client de Django: listado de tareas, detalle y
+toggle (POST con redirect), ``--repeat`` veces cada una.
+
+    python -m benchmarks.bench_web_transport --rows 20000 --repeat 300
+"""
+import argparse
+import random
+import socket
+import threading
+
+from benchmarks import common
+
+TRANSPORTS = (
+    "benchmarks.bench_web_transport.UnpooledHttpTransport",
+    "web.transport.HttpTransport",
+    "web.transport.InProcessTransport",
+)
+
+
+def unpooled_transport_class():
+    from web.transport import HttpTransport
+
+    class UnpooledHttpTransport(HttpTransport):
+        """Como antes del pool: ``requests`` abre una conexion por llamada."""
+        def send(self, method, url, json=None, headers=None, params=None, timeout=None):
+            import requests
+
+            return requests.request(
+                method, url, json=json, headers=headers, params=params,
+                timeout=timeout,
+            )
+
+        def post(self, url, json=None, headers=None, timeout=None):
+            return self.send("POST", url, json=json, headers=headers, timeout=timeout)
+
+    return UnpooledHttpTransport
+
+
+def __getattr__(name):
+    # La clase se arma despues de configurar Django (importa web.transport).
+    if name == "UnpooledHttpTransport":
+        return unpooled_transport_class()
+    raise AttributeError(name)
+
+
+def start_api_server():
+    """Sirve el proyecto en un puerto libre de 127.0.0.1 y devuelve la URL base."""
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+    class QuietHandler(WSGIRequestHandler):
+        def setup(self):
+            # Como gunicorn: sin Nagle. wsgiref escribe headers y cuerpo por
+            # separado y, con keep-alive, el ACK demorado del cliente frena
+            # cada respuesta ~40 ms.
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler, allow_reuse_address=True)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/api"
+
+
+def login(username, password):
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client()
+    response = client.post(
+        reverse("web:login"), {"username": username, "password": password}
+    )
+    assert response.status_code == 302, response.status_code
+    return client
+
+
+def pages(client, task_ids, repeat, seed=1):
+    from django.urls import reverse
+
+    rnd = random.Random(seed)
+    results = {}
+    for name, call in (
+        ("listado", lambda: client.get(reverse("web:tasks"))),
+        ("detalle", lambda: client.get(
+            reverse("web:task-detail", args=[rnd.choice(task_ids)])
+        )),
+        ("toggle", lambda: client.post(
+            reverse("web:task-toggle", args=[rnd.choice(task_ids)])
+        )),
+    ):
+        call()  # calienta caches y conexiones
+        results[name] = common.timeit(call, repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    common.setup()
+    from django.conf import settings
+
+    settings.ALLOWED_HOSTS = ["*"]
+    owner = common.seed_tasks(args.rows, users=20)[0]
+    owner.set_password("bench")
+    owner.save()
+
+    from tasks.models import Task
+    from web.transport import http_pool_stats
+
+    task_ids = list(Task.objects.filter(user=owner).values_list("id", flat=True))
+    settings.API_BASE_URL = start_api_server()
+    print(f"{args.rows} tareas ({len(task_ids)} del usuario), p50/p99 en ms\n")
+    for transport in TRANSPORTS:
+        settings.API_TRANSPORT = transport
+        client = login(owner.username, "bench")
+        print(transport.rsplit(".", 1)[1])
+        for name, (p50, p99) in pages(client, task_ids, args.repeat).items():
+            print(f"  {name:<8} p50 {p50:7.2f}  p99 {p99:7.2f}")
+        if transport == "web.transport.HttpTransport":
+            print(f"  pool: {http_pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
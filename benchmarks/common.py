@@ -0,0 +1,125 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Cada benchmark corre contra una base SQLite temporal (nunca contra
+``data/db.sqlite3``) con todas las migraciones aplicadas::
+
+    python -m benchmarks.bench_task_indexes --rows 2000000
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import django
+
+
+def setup(db_path=None):
+    """Configura Django sobre una base temporal y aplica migraciones."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "todo_challenge.settings")
+    from django.conf import settings
+
+    if db_path is None:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="todo-bench-"), "bench.sqlite3")
+    settings.DATABASES["default"]["NAME"] = db_path
+    settings.LOGGING = {"version": 1, "disable_existing_loggers": False}
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+    return db_path
+
+
+def percentiles(samples):
+    """Devuelve (p50, p99) en milisegundos."""
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered)
+    p99 = ordered[min(len(ordered) - 1, int(round(len(ordered) * 0.99)) - 1)]
+    return p50 * 1000, p99 * 1000
+
+
+def timeit(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+@contextmanager
+def manual_timestamps():
+    """Permite fijar created_at/updated_at a mano durante el seed."""
+    from tasks.models import Task
+
+    fields = [Task._meta.get_field("created_at"), Task._meta.get_field("updated_at")]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+WORDS = (
+    "comprar leche pan pagar factura llamar medico enviar informe revisar "
+    "codigo preparar reunion limpiar casa estudiar examen regar plantas "
+    "reservar vuelo renovar seguro ordenar escritorio"
+).split()
+
+
+def vocabulary(size=5000, seed=1):
+    """WORDS mas ``size`` palabras sinteticas, para que los terminos no
+    aparezcan en todas las filas."""
+    rnd = random.Random(seed)
+    syllables = ["ma", "te", "ri", "so", "lu", "na", "pe", "ca", "do", "vi", "ra", "no"]
+    synthetic = {
+        "".join(rnd.choices(syllables, k=rnd.randint(2, 4))) for _ in range(size)
+    }
+    return WORDS + sorted(synthetic - set(WORDS))
+
+
+def seed_tasks(rows, users=20, heavy_share=0.5, batch_size=10000, seed=1):
+    """
+    Crea ``users`` usuarios y ``rows`` tareas. El primer usuario (el
+    "pesado") concentra ``heavy_share`` de las filas. Devuelve los usuarios.
+    """
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from tasks.models import Task
+
+    rnd = random.Random(seed)
+    words = vocabulary(seed=seed)
+    owners = User.objects.bulk_create(
+        [User(username=f"bench{i}", password="!") for i in range(users)]
+    )
+    now = timezone.now()
+    heavy_rows = int(rows * heavy_share)
+    with manual_timestamps():
+        batch = []
+        for n in range(rows):
+            owner = owners[0] if n < heavy_rows else rnd.choice(owners[1:] or owners)
+            created = now - timedelta(seconds=rnd.randint(0, 3 * 365 * 86400))
+            updated = created + timedelta(seconds=rnd.randint(0, 30 * 86400))
+            batch.append(
+                Task(
+                    user=owner,
+                    title=" ".join(rnd.choices(words, k=3)),
+                    description=" ".join(rnd.choices(words, k=12)),
+                    completed=rnd.random() < 0.5,
+                    created_at=created,
+                    updated_at=min(updated, now),
+                )
+            )
+            if len(batch) >= batch_size:
+                Task.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Task.objects.bulk_create(batch)
+    return owners
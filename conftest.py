@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_task_response_cache():
+    """Cada test arranca con el cache de respuestas de tasks vacio."""
+    from tasks.cache import clear_response_cache
+
+    clear_response_cache()
+    yield
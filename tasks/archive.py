@@ -0,0 +1,102 @@
+"""
+Archivo de tareas viejas: mueve de Task a ArchivedTask las tareas
+completadas (y sin cambios) hace mas de ``TASKS_ARCHIVE_AFTER_DAYS``.
+
+Cada lote es una transaccion corta: un ``DELETE ... RETURNING`` (seleccion y
+borrado en una sola sentencia, asi que una tarea reabierta o editada en el
+medio deja de ser candidata y no se archiva), el INSERT en ArchivedTask y la
+señal ``tasks_changed`` de cada usuario. Si se interrumpe, alcanza con volver
+a correrlo: cada lote confirmado ya no vuelve a aparecer.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+from .signals import tasks_changed
+
+
+def archive_cutoff(days=None):
+    if days is None:
+        days = settings.TASKS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def archive_candidates(cutoff, after_id=0, user_ids=None):
+    queryset = Task.objects.filter(
+        completed=True,
+        completed_at__lt=cutoff,
+        updated_at__lt=cutoff,
+        id__gt=after_id,
+    )
+    if user_ids is not None:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return queryset.order_by("id")
+
+
+def take_batch(using, candidates, batch_size):
+    """Borra de Task hasta ``batch_size`` candidatas y las devuelve."""
+    connection = connections[using]
+    ids = candidates.values("id")[:batch_size]
+    if connection.vendor not in ("sqlite", "postgresql"):
+        ids = list(ids.select_for_update().values_list("id", flat=True))
+        tasks = list(Task.objects.using(using).filter(id__in=ids))
+        Task.objects.using(using).filter(id__in=ids).delete()
+        return tasks
+
+    qn = connection.ops.quote_name
+    subquery, params = ids.query.get_compiler(using).as_sql()
+    columns = ", ".join(qn(field.column) for field in Task._meta.concrete_fields)
+    sql = (
+        f"DELETE FROM {qn(Task._meta.db_table)} WHERE {qn('id')} IN ({subquery}) "
+        f"RETURNING {columns}"
+    )
+    return list(Task.objects.db_manager(using).raw(sql, params))
+
+
+def archive_batch(cutoff, batch_size, after_id=0, user_ids=None):
+    """
+    Archiva en una transaccion hasta ``batch_size`` tareas con id mayor a
+    ``after_id``. Devuelve las tareas archivadas.
+    """
+    using = router.db_for_write(Task)
+    now = timezone.now()
+    with transaction.atomic(using=using):
+        tasks = take_batch(
+            using, archive_candidates(cutoff, after_id, user_ids), batch_size
+        )
+        ArchivedTask.objects.using(using).bulk_create(
+            ArchivedTask(
+                archived_at=now,
+                **{name: getattr(task, name) for name in ArchivedTask.copied_fields},
+            )
+            for task in tasks
+        )
+        by_user = defaultdict(list)
+        for task in tasks:
+            by_user[task.user_id].append(task)
+        for user_id, user_tasks in by_user.items():
+            tasks_changed.send(
+                sender=Task, user_id=user_id, before=user_tasks, archived=True
+            )
+    return tasks
+
+
+def archive_tasks(cutoff, batch_size=None, user_ids=None, pause=0):
+    """Archiva lote por lote hasta agotar las candidatas; devuelve cuantas movio."""
+    if batch_size is None:
+        batch_size = settings.TASKS_ARCHIVE_BATCH_SIZE
+    archived, after_id = 0, 0
+    while True:
+        tasks = archive_batch(cutoff, batch_size, after_id, user_ids)
+        if not tasks:
+            return archived
+        archived += len(tasks)
+        after_id = max(task.id for task in tasks)
+        if pause:
+            # Deja pasar a los escritores entre lotes.
+            time.sleep(pause)
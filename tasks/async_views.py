@@ -0,0 +1,214 @@
+"""
+Variantes async (ASGI) de listado, alta, detalle, baja y toggle de tareas,
+montadas en ``/api/async/``.
+
+Bajo ASGI cada vista sync de DRF ocupa un hilo durante todo el request.
+Estas atienden el request en el event loop: autentican el JWT, chequean
+permisos, filtran, paginan y serializan sin hilos, y leen con el ORM async
+(``acount``, ``afirst``, iteracion async), de una replica si hay
+(tasks.replicas); la autenticacion es la de la API
+(CachedJWTAuthentication), que normalmente no consulta la base. Las
+escrituras son una funcion sync dentro de ``transaction.atomic`` (el ORM
+async no soporta transacciones) que reutiliza la vista sync
+correspondiente: validacion, señales, contadores y bajas quedan iguales.
+Cada consulta del ORM async todavia corre en un hilo, pero solo mientras
+dura la consulta.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import MethodNotAllowed, NotFound, ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from users.authentication import CachedJWTAuthentication, get_user_status_cache
+
+from .replicas import read_from_replica
+from .shards import activate_shard, alookup, use_shard
+from .signals import reported_by_views
+from .versions import set_task_etag
+from .views import TaskDetailView, TaskListCreateView, TaskToggleView
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+    """CachedJWTAuthentication que, si tiene que leer al usuario, usa el ORM async."""
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            return await sync_to_async(self.get_user)(validated_token)
+        user = JWTStatelessUserAuthentication.get_user(self, validated_token)
+        if settings.JWT_USER_STATUS_TTL:
+            is_active = get_user_status_cache().get(user.id)
+            if is_active is None:
+                is_active = await self.user_model.objects.filter(pk=user.id).values_list(
+                    "is_active", flat=True
+                ).afirst()
+                is_active = self.remember_status(user.id, is_active)
+            self.check_active(is_active)
+        return user
+
+
+class AsyncTaskView(View):
+    """
+    Base de las vistas async. Arma el Request de DRF, autentica y delega la
+    configuracion (queryset, filtros, paginador, serializador, permisos y
+    manejo de errores) en una instancia de ``sync_view_class`` que no se
+    despacha. Los handlers devuelven un Response de DRF que se renderiza
+    aca como JSON (Django renderizaria un Response en un hilo).
+    """
+    sync_view_class = None
+    renderer = JSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Como APIView: la autenticacion es por token, no por sesion.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        authenticator = AsyncJWTAuthentication()
+        request = Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[authenticator],
+        )
+        request.accepted_renderer = self.renderer
+        request.accepted_media_type = self.renderer.media_type
+        self.sync_view = self.sync_view_class(
+            request=request, args=args, kwargs=kwargs, format_kwarg=None, headers={}
+        )
+        with use_shard(None), reported_by_views():
+            try:
+                await self.authenticate(request, authenticator)
+                method = request.method.lower()
+                if method not in self.http_method_names or not hasattr(self, method):
+                    raise MethodNotAllowed(request.method)
+                self.sync_view.check_permissions(request)
+                activate_shard(
+                    await alookup(request.user.id),
+                    write=request.method not in SAFE_METHODS,
+                    user_id=request.user.id,
+                )
+                response = await getattr(self, method)(request, *args, **kwargs)
+            except Exception as exc:
+                response = self.sync_view.handle_exception(exc)
+        return self.render(response)
+
+    async def authenticate(self, request, authenticator):
+        # Se completa lo que haria Request._authenticate, sin consultas sync.
+        request._authenticator = None
+        request.user, request.auth = AnonymousUser(), None
+        try:
+            result = await authenticator.aauthenticate(request)
+        except Exception:
+            request._not_authenticated()
+            raise
+        if result is not None:
+            request._authenticator = authenticator
+            request.user, request.auth = result
+
+    def render(self, response):
+        if not isinstance(response, Response):
+            return response
+        body = b""
+        if response.data is not None:
+            body = self.renderer.render(
+                response.data, self.renderer.media_type, {"response": response}
+            )
+        rendered = HttpResponse(
+            body, status=response.status_code, content_type=self.renderer.media_type
+        )
+        for name, value in response.headers.items():
+            if name.lower() != "content-type":
+                rendered[name] = value
+        return rendered
+
+    async def options(self, request, *args, **kwargs):
+        return self.sync_view.options(request, *args, **kwargs)
+
+
+class AsyncTaskListCreateView(AsyncTaskView):
+    """
+    GET: listado con los filtros, busqueda, ``ordering`` y ``fields`` del
+    listado sync; solo paginacion offset. POST: alta.
+    """
+    sync_view_class = TaskListCreateView
+
+    async def get(self, request):
+        view = self.sync_view
+        paginator = view.paginator
+        mode = request.query_params.get(paginator.mode_query_param, "offset")
+        if mode != "offset":
+            raise ValidationError({paginator.mode_query_param: [
+                "Las vistas async solo soportan la paginacion offset."
+            ]})
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator.delegate = None
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        with read_from_replica(request.user.id):
+            paginator.count = await queryset.acount()
+            rows = [
+                row async for row in
+                queryset[paginator.offset:paginator.offset + paginator.limit]
+            ]
+        data = view.get_serializer(rows, many=True).data
+        return paginator.get_paginated_response(data)
+
+    async def post(self, request):
+        view = self.sync_view
+        serializer = view.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        await sync_to_async(view.perform_create)(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class AsyncTaskDetailView(AsyncTaskView):
+    """GET: detalle. DELETE: baja (con su marca para la sincronizacion)."""
+    sync_view_class = TaskDetailView
+
+    async def get_object(self, request, pk):
+        view = self.sync_view
+        task = await view.get_queryset().filter(pk=pk).afirst()
+        if task is None:
+            raise NotFound
+        view.check_object_permissions(request, task)
+        return task
+
+    async def get(self, request, pk):
+        with read_from_replica(request.user.id):
+            row = await self.get_object(request, pk)
+        return Response(self.sync_view.get_serializer(row).data)
+
+    async def delete(self, request, pk):
+        task = await self.get_object(request, pk)
+        await sync_to_async(self.sync_view.perform_destroy)(task)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class AsyncTaskToggleView(AsyncTaskView):
+    """PATCH: igual que TaskToggleView (acepta ``completed`` e ``If-Match``)."""
+    sync_view_class = TaskToggleView
+
+    async def patch(self, request, pk):
+        view = self.sync_view
+        task = await sync_to_async(view.toggle_task)(request, pk)
+        response = Response(view.get_serializer(task).data, status=status.HTTP_200_OK)
+        return set_task_etag(response, task)
@@ -0,0 +1,165 @@
+"""
+Cache de respuestas de lectura de la API de tareas.
+
+Guarda el ``response.data`` ya serializado de listados y detalles con clave
+(usuario, version, vista, URL). La version es la que ya se leyo de la base
+para el ETag: la de ``TaskCollection`` en el listado y la de la tarea en el
+detalle. Cada escritura las incrementa, lo que deja inalcanzables las
+entradas anteriores sin borrarlas, tambien en los caches de otros procesos.
+
+Usa el cache de Django ``TASKS_CACHE_ALIAS`` si esta en ``CACHES``; si no,
+un LRU acotado en memoria del proceso.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+
+class LRUCache:
+    """
+    Cache en memoria acotada a ``max_entries`` (descarta la menos usada).
+    Implementa el subconjunto de la API de caches de Django que usa este
+    modulo.
+    """
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expires(self, timeout):
+        return None if timeout is None else time.monotonic() + timeout
+
+    def _get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires is not None and expires <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _set(self, key, value, timeout):
+        self._data[key] = (self._expires(timeout), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._get(key)
+            return default if item is None else item[1]
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            self._set(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def incr(self, key, delta=1):
+        with self._lock:
+            item = self._get(key)
+            if item is None:
+                raise ValueError(f"Key '{key}' not found")
+            expires, value = item
+            self._data[key] = (expires, value + delta)
+            return value + delta
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStats:
+    """Contadores de aciertos/fallos del proceso actual."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+stats = CacheStats()
+_fallback = None
+_fallback_lock = threading.Lock()
+
+
+def get_response_cache():
+    """``CACHES[TASKS_CACHE_ALIAS]`` si esta configurado, si no el LRU local."""
+    global _fallback
+    alias = settings.TASKS_CACHE_ALIAS
+    if alias in settings.CACHES:
+        return caches[alias]
+    if _fallback is None:
+        with _fallback_lock:
+            if _fallback is None:
+                _fallback = LRUCache(settings.TASKS_CACHE_LRU_MAX_ENTRIES)
+    return _fallback
+
+
+def clear_response_cache():
+    get_response_cache().clear()
+    stats.reset()
+
+
+def response_key(request, view_name, version):
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    return f"tasks:resp:{request.user.id}:{version}:{view_name}:{url}"
+
+
+def cached_response(request, view_name, version, build):
+    """
+    Devuelve la respuesta cacheada para ``request`` en ``version`` o la
+    construye con ``build()`` y la guarda si fue un 200. Sin version (la
+    tarea no existe) no se usa el cache.
+    """
+    if not settings.TASKS_CACHE_ENABLED or version is None:
+        return build()
+    cache = get_response_cache()
+    key = response_key(request, view_name, version)
+    data = cache.get(key)
+    if data is not None:
+        stats.hit()
+        return Response(data)
+    stats.miss()
+    response = build()
+    if response.status_code == 200:
+        cache.set(key, response.data, settings.TASKS_CACHE_TIMEOUT)
+    return response
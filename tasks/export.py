@@ -0,0 +1,45 @@
+"""
+Exportacion en streaming de las tareas de un usuario (NDJSON o CSV).
+
+Las filas se leen con ``values().iterator(chunk_size)`` y se serializan con
+TaskReadSerializer a medida que se envian: la memoria no depende de la
+cantidad de tareas.
+"""
+import csv
+import json
+
+from .serializers import TaskReadSerializer
+
+
+class Echo:
+    """Buffer de una linea para ``csv.writer``: devuelve lo escrito."""
+    def write(self, value):
+        return value
+
+
+def iter_rows(queryset, chunk_size):
+    serializer = TaskReadSerializer()
+    rows = queryset.values(*TaskReadSerializer.fields).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield serializer.to_representation(row)
+
+
+def ndjson_lines(queryset, chunk_size):
+    for item in iter_rows(queryset, chunk_size):
+        yield json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def csv_lines(queryset, chunk_size):
+    writer = csv.writer(Echo())
+    # El encabezado sale antes de consultar la base.
+    yield writer.writerow(TaskReadSerializer.fields)
+    for item in iter_rows(queryset, chunk_size):
+        yield writer.writerow(
+            "" if value is None else value for value in item.values()
+        )
+
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", ndjson_lines),
+    "csv": ("text/csv; charset=utf-8", csv_lines),
+}
@@ -3,8 +3,11 @@ from django_filters import (
     BooleanFilter,
     DateFromToRangeFilter
 )
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework.filters import SearchFilter
 
-from .models import Task
+from .models import ArchivedTask, Task
+from .search import FTS_TABLE, build_match_query, rank_expression, search_available
 
 
 class TaskFilter(FilterSet):
@@ -24,3 +27,51 @@ class TaskFilter(FilterSet):
     class Meta:
         model = Task
         fields = ['completed', 'created_at', 'updated_at']
+
+
+class ArchivedTaskFilter(TaskFilter):
+    """Los filtros de TaskFilter sobre ArchivedTask (``include_archived``)."""
+    class Meta(TaskFilter.Meta):
+        model = ArchivedTask
+
+
+class TaskFilterBackend(DjangoFilterBackend):
+    """DjangoFilterBackend que aplica ArchivedTaskFilter a ArchivedTask."""
+    def get_filterset_class(self, view, queryset=None):
+        if queryset is not None and queryset.model is ArchivedTask:
+            return ArchivedTaskFilter
+        return super().get_filterset_class(view, queryset)
+
+
+class TaskSearchFilter(SearchFilter):
+    """
+    Busqueda full-text con el indice FTS5 de tasks.search.
+    Cada termino matchea por prefijo y los resultados se ordenan por
+    relevancia (bm25) salvo que se pida otro ``ordering``.
+    Fuera de SQLite, y sobre ArchivedTask (que no tiene indice), se comporta
+    como el SearchFilter de DRF. Si la vista combina tareas y archivadas
+    (``view.reads_archive``) no ordena por relevancia.
+    """
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if not search_available(queryset.db) or queryset.model is not Task:
+            return super().filter_queryset(request, queryset, view)
+
+        match = build_match_query(terms)
+        if not match:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        # El ``+`` impide que SQLite resuelva el join buscando en FTS fila a
+        # fila (re-evaluando el MATCH por cada tarea del usuario): el indice
+        # full-text siempre es la tabla externa del join.
+        where = [f"+{FTS_TABLE}.rowid = {table}.id", f"{FTS_TABLE} MATCH %s"]
+        if getattr(view, "reads_archive", False):
+            return queryset.extra(tables=[FTS_TABLE], where=where, params=[match])
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=where,
+            params=[match],
+            select={"search_rank": rank_expression()},
+        ).order_by("search_rank", "-created_at")
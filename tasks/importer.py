@@ -0,0 +1,113 @@
+"""
+Importacion en streaming de tareas desde NDJSON o CSV.
+
+El cuerpo del request se lee linea a linea (nunca completo en memoria),
+cada fila se valida con las reglas de TaskSerializer y las validas se
+insertan con ``bulk_create`` en lotes de ``batch_size``, cada lote en su
+propia transaccion.
+"""
+import codecs
+import csv
+import json
+
+from django.utils import timezone
+from rest_framework import serializers
+
+from .models import Task
+from .serializers import TaskSerializer
+from .shards import atomic
+
+
+def ndjson_rows(lines):
+    """(numero de linea, fila o error) por cada linea no vacia."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None, {"non_field_errors": ["JSON invalido."]}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {"non_field_errors": ["Se esperaba un objeto."]}
+            continue
+        yield number, row, None
+
+
+def csv_rows(lines):
+    reader = csv.DictReader(lines)
+    for row in reader:
+        row.pop(None, None)  # columnas de mas sin encabezado
+        yield reader.line_num, row, None
+
+
+PARSERS = {
+    "application/x-ndjson": ndjson_rows,
+    "text/csv": csv_rows,
+}
+
+
+class TaskImporter:
+    """
+    Valida e inserta las filas de ``rows`` para el usuario ``user_id``. ``on_batch(after=...)``
+    se llama con las tareas de cada lote dentro de la transaccion del lote.
+    """
+    def __init__(self, user_id, batch_size, max_errors, on_batch=None, context=None):
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_batch = on_batch
+        self.validator = TaskSerializer(context=context or {})
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = {}
+
+    def reject(self, number, errors):
+        self.rejected += 1
+        # Solo se guardan los primeros errores: la memoria no crece con el archivo.
+        if len(self.errors) < self.max_errors:
+            self.errors[number] = errors
+
+    def flush(self, batch):
+        if not batch:
+            return
+        now = timezone.now()
+        for task in batch:
+            task.mark_completion(False, now)
+        with atomic():
+            Task.objects.bulk_create(batch)
+            if self.on_batch is not None:
+                self.on_batch(after=batch)
+        self.accepted += len(batch)
+
+    def run(self, rows):
+        batch = []
+        for number, row, errors in rows:
+            if errors is None:
+                try:
+                    attrs = self.validator.run_validation(row)
+                except serializers.ValidationError as exc:
+                    errors = exc.detail
+            if errors is not None:
+                self.reject(number, errors)
+                continue
+            batch.append(Task(user_id=self.user_id, **attrs))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        self.flush(batch)
+        return self.summary()
+
+    def summary(self):
+        return {
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "errors": self.errors,
+        }
+
+
+def decode_lines(stream, encoding="utf-8"):
+    """Lineas de texto de un stream binario, leidas de a una."""
+    if stream is None:
+        return iter(())
+    return codecs.iterdecode(iter(stream.readline, b""), encoding, errors="replace")
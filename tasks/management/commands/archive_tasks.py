@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.archive import archive_cutoff, archive_tasks
+from tasks.shards import fan_out, group_by_shard
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a ArchivedTask las tareas completadas y sin cambios hace mas de "
+        "TASKS_ARCHIVE_AFTER_DAYS dias, en lotes de una transaccion cada uno "
+        "(los shards en paralelo). Si se interrumpe, se retoma volviendo a "
+        "correrlo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.TASKS_ARCHIVE_AFTER_DAYS,
+            help="Antiguedad minima en dias.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.TASKS_ARCHIVE_BATCH_SIZE,
+            help="Tareas por transaccion.",
+        )
+        parser.add_argument(
+            "--pause", type=float, default=0,
+            help="Segundos de espera entre lotes.",
+        )
+        parser.add_argument(
+            "--user", type=int, action="append", dest="users",
+            help="Id de usuario a archivar (repetible). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options["days"])
+        groups = group_by_shard(options["users"])
+        archived = fan_out(lambda alias: archive_tasks(
+            cutoff,
+            batch_size=options["batch_size"],
+            user_ids=groups[alias],
+            pause=options["pause"],
+        ), aliases=groups)
+        self.stdout.write(
+            self.style.SUCCESS(f"{sum(archived.values())} tareas archivadas.")
+        )
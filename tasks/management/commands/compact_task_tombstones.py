@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from tasks.shards import fan_out
+from tasks.sync import compact_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina las marcas de tareas borradas mas viejas que "
+        "TASKS_TOMBSTONE_RETENTION_DAYS, en todos los shards."
+    )
+
+    def handle(self, *args, **options):
+        deleted = fan_out(lambda alias: compact_tombstones())
+        self.stdout.write(
+            self.style.SUCCESS(f"{sum(deleted.values())} marcas eliminadas.")
+        )
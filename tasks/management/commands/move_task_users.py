@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.shards import move_user, plan_rebalance, task_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve usuarios (con sus tareas, contadores, estadisticas, marcas de "
+        "baja y archivadas) entre los shards de TASK_SHARDS. Sin opciones, "
+        "muestra usuarios y tareas por shard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="users",
+            help="Id de usuario a mover (repetible). Requiere --to.",
+        )
+        parser.add_argument("--to", help="Shard de destino.")
+        parser.add_argument(
+            "--rebalance", action="store_true",
+            help="Mueve usuarios hasta emparejar la cantidad de tareas por shard.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Con --rebalance, solo muestra los movimientos.",
+        )
+        parser.add_argument(
+            "--wait", type=float, default=None,
+            help="Segundos de espera antes de copiar cada usuario. Por "
+                 "defecto, TASK_SHARD_CACHE_SECONDS.",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"]:
+            if options["to"] not in settings.TASK_SHARDS:
+                raise CommandError(
+                    f"--to debe ser uno de: {', '.join(settings.TASK_SHARDS)}."
+                )
+            moves = [(user_id, None, options["to"]) for user_id in options["users"]]
+        elif options["rebalance"]:
+            moves = plan_rebalance(task_counts())
+        else:
+            for alias, per_user in task_counts().items():
+                self.stdout.write(
+                    f"{alias}: {len(per_user)} usuarios, "
+                    f"{sum(per_user.values())} tareas."
+                )
+            return
+
+        for user_id, source, target in moves:
+            if options["dry_run"]:
+                self.stdout.write(f"Usuario {user_id}: {source} -> {target}")
+                continue
+            source = move_user(user_id, target, wait=options["wait"])
+            self.stdout.write(f"Usuario {user_id}: {source} -> {target}")
+        if not options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"{len(moves)} usuarios movidos."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.search import rebuild_search_index, search_available
+from tasks.stats import touch_collections
+
+
+class Command(BaseCommand):
+    help = "Reconstruye el indice full-text (FTS5) de tareas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if not search_available(using):
+            raise CommandError("El indice full-text solo existe en SQLite.")
+        rebuild_search_index(using)
+        # Las busquedas pueden devolver otras tareas: los listados cacheados
+        # (y sus ETags) de los usuarios de esta base dejan de valer.
+        touch_collections(using)
+        self.stdout.write(self.style.SUCCESS("Indice de busqueda reconstruido."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from tasks.shards import fan_out, group_by_shard
+from tasks.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde las tareas los contadores de TaskCollection y las "
+        "estadisticas diarias (TaskDailyStats), en todos los shards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="users",
+            help="Id de usuario a recalcular (repetible). Por defecto, todos.",
+        )
+
+    def handle(self, *args, **options):
+        groups = group_by_shard(options["users"])
+        rebuilt = fan_out(
+            lambda alias: rebuild_stats(user_ids=groups[alias]), aliases=groups
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"{sum(rebuilt.values())} usuarios recalculados.")
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:24
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+# En SQLite agregar la columna reconstruye tasks_task y se pierden los
+# triggers que mantienen el indice full-text: se vuelven a crear.
+search_index = import_module("tasks.migrations.0003_task_search_index")
+recreate_search_triggers = search_index.run_sqlite(search_index.CREATE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0005_tasktombstone"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.AddField(
+            model_name="task",
+            name="version",
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+    ]
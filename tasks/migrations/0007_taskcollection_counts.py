@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:35
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def populate_counts(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    TaskCollection = apps.get_model("tasks", "TaskCollection")
+    db = schema_editor.connection.alias
+    counts = (
+        Task.objects.using(db)
+        .values("user_id")
+        .annotate(total=Count("id"), completed=Count("id", filter=Q(completed=True)))
+    )
+    for row in counts:
+        TaskCollection.objects.using(db).update_or_create(
+            user_id=row["user_id"],
+            defaults={"task_count": row["total"], "completed_count": row["completed"]},
+            create_defaults={
+                "version": 1,
+                "modified_at": timezone.now(),
+                "task_count": row["total"],
+                "completed_count": row["completed"],
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0006_task_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskcollection",
+            name="completed_count",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="taskcollection",
+            name="task_count",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def populate_stats(apps, schema_editor):
+    # Sin historial, las tareas ya completadas toman updated_at como fecha
+    # de completado.
+    Task = apps.get_model("tasks", "Task")
+    TaskDailyStats = apps.get_model("tasks", "TaskDailyStats")
+    db = schema_editor.connection.alias
+    tasks = Task.objects.using(db)
+    tasks.filter(completed=True, completed_at__isnull=True).update(
+        completed_at=F("updated_at")
+    )
+    tz = timezone.get_current_timezone()
+    days = {}
+    for field, position in (("created_at", 0), ("completed_at", 1)):
+        rows = tasks.filter(**{f"{field}__isnull": False})
+        if field == "completed_at":
+            rows = rows.filter(completed=True)
+        rows = (
+            rows.annotate(day=TruncDate(field, tzinfo=tz))
+            .values("user_id", "day")
+            .annotate(n=Count("id"))
+        )
+        for row in rows:
+            days.setdefault((row["user_id"], row["day"]), [0, 0])[position] = row["n"]
+    TaskDailyStats.objects.using(db).bulk_create(
+        TaskDailyStats(
+            user_id=user_id, day=day,
+            created_count=created_count, completed_count=completed_count,
+        )
+        for (user_id, day), (created_count, completed_count) in days.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_taskcollection_counts"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="completed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="TaskDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("created_count", models.BigIntegerField(default=0)),
+                ("completed_count", models.BigIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("user", "day"), name="task_daily_stats_user_day_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
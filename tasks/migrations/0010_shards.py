@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:20
+
+from importlib import import_module
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# En SQLite quitar la constraint del FK reconstruye tasks_task y se pierden
+# los triggers que mantienen el indice full-text: se vuelven a crear.
+search_index = import_module("tasks.migrations.0003_task_search_index")
+recreate_search_triggers = search_index.run_sqlite(search_index.CREATE_SQL)
+
+
+def assign_existing_users(apps, schema_editor):
+    # Las tareas de los usuarios existentes estan en esta base.
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    UserShard = apps.get_model("tasks", "UserShard")
+    db = schema_editor.connection.alias
+    UserShard.objects.using(db).bulk_create(
+        UserShard(user_id=user_id, alias=db)
+        for user_id in User.objects.using(db).values_list("pk", flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("tasks", "0009_archivedtask"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, recreate_search_triggers),
+        migrations.CreateModel(
+            name="TaskIdSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("last_id", models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="UserShard",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="task_shard",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("alias", models.CharField(max_length=100)),
+                ("moving", models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="archivedtask",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskcollection",
+            name="user",
+            field=models.OneToOneField(
+                db_constraint=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                primary_key=True,
+                related_name="task_collection",
+                serialize=False,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="taskdailystats",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tasktombstone",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(recreate_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(assign_existing_users, migrations.RunPython.noop),
+    ]
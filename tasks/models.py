@@ -1,20 +1,395 @@
-from django.db import models
+from django.conf import settings
+from django.db import connections, models, router, transaction
+from django.db.models import Case, F, Max, Value, When
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .signals import tasks_changed, views_report_changes
+
+
+class TaskQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+        # Sin base elegida, save() la resuelve con la instancia (el shard de
+        # su usuario) y no con el shard activo.
+        task = self.model(**kwargs)
+        task.save(force_insert=True)
+        return task
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        Task.assign_ids(self.db, objs)
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Task(models.Model):
     """
     Modelo que representa una Task
     """
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # El indice propio del FK queda cubierto por los indices compuestos que
+    # empiezan por ``user``. Sin constraint: la tarea puede estar en otro
+    # shard que el usuario (tasks.shards).
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, db_constraint=False
+    )
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     completed = models.BooleanField(default=False)
+    # Ultima vez que paso a completada; no se borra al reabrirla (las
+    # estadisticas usan el dia de completado de las tareas completadas).
+    completed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Se incrementa con cada escritura: ETag del detalle y control de
+    # concurrencia optimista (If-Match).
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        # Un indice por cada combinacion de filtro/orden que expone
+        # TaskListCreateView, siempre con ``user`` como prefijo.
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="task_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "completed", "-created_at"],
+                name="task_user_completed_idx",
+            ),
+            models.Index(
+                fields=["user", "-updated_at"],
+                name="task_user_updated_idx",
+            ),
+            models.Index(
+                fields=["user", "title"],
+                name="task_user_title_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.pk is None:
+            using = kwargs.get("using") or router.db_for_write(Task, instance=self)
+            Task.assign_ids(using, [self])
+        if self.completed and self.completed_at is None:
+            self.completed_at = timezone.now()
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "completed_at"}
+        if views_report_changes():
+            super().save(*args, **kwargs)
+            return
+        # Escritura fuera de la API: incrementa la version (ETag y cache del
+        # detalle) y avisa con tasks_changed (contadores y cache del listado).
+        using = kwargs.get("using") or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            before = []
+            if not self._state.adding:
+                before = list(
+                    Task.objects.using(using).filter(pk=self.pk)
+                    .values("created_at", "completed", "completed_at", "version")
+                )
+            if before:
+                self.version = before[0]["version"] + 1
+                if kwargs.get("update_fields") is not None:
+                    kwargs["update_fields"] = {*kwargs["update_fields"], "version"}
+            super().save(*args, **kwargs)
+            self.report_change(using, before, [self])
+
+    def delete(self, *args, **kwargs):
+        if views_report_changes():
+            return super().delete(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(Task, instance=self)
+        with transaction.atomic(using=using):
+            deleted = super().delete(*args, **kwargs)
+            self.report_change(using, [self], [])
+        return deleted
+
+    def report_change(self, using, before, after):
+        from .shards import use_shard  # tasks.shards importa este modulo
+
+        # Los resumenes del usuario estan en la misma base que la tarea.
+        with use_shard(using):
+            tasks_changed.send(
+                sender=Task, user_id=self.user_id, before=before, after=after
+            )
+
+    @classmethod
+    def assign_ids(cls, using, tasks):
+        """
+        Con varios shards, asigna a las tareas nuevas ids del rango de
+        ``using`` (TaskIdSequence). Con uno solo los asigna la base.
+        """
+        if len(settings.TASK_SHARDS) < 2:
+            return
+        new = [task for task in tasks if task.pk is None]
+        if new:
+            first = TaskIdSequence.allocate(using, len(new))
+            for offset, task in enumerate(new):
+                task.pk = first + offset
+
+    def mark_completion(self, was_completed, now):
+        """Fija ``completed_at`` si la tarea acaba de pasar a completada."""
+        if self.completed and (not was_completed or self.completed_at is None):
+            self.completed_at = now
+
+    @classmethod
+    def toggle(cls, pk, user_id, completed=None, versions=None):
+        """
+        Invierte el estado de la tarea (o lo fija en ``completed``),
+        incrementa ``version`` y actualiza ``updated_at`` (y ``completed_at``
+        si pasa a completada) en una sola
+        sentencia ``UPDATE ... RETURNING``, sin leer antes. Devuelve la tarea
+        actualizada o None si no existe, no es de ``user_id``, su version no
+        esta en ``versions`` o ya tenia el estado ``completed`` pedido.
+        """
+        using = router.db_for_write(cls)
+        connection = connections[using]
+        now = timezone.now()
+        if connection.vendor not in ("sqlite", "postgresql"):
+            # Sin UPDATE ... RETURNING: UPDATE condicional y luego SELECT.
+            filters = {"pk": pk, "user_id": user_id}
+            if versions is not None:
+                filters["version__in"] = versions
+            queryset = cls.objects.using(using).filter(**filters)
+            if completed is None:
+                value = Case(
+                    When(completed=True, then=Value(False)), default=Value(True)
+                )
+            else:
+                value = Value(completed)
+                queryset = queryset.exclude(completed=completed)
+            if not queryset.update(
+                completed=value,
+                completed_at=Case(
+                    When(completed=False, then=Value(now)), default=F("completed_at")
+                ) if completed in (None, True) else F("completed_at"),
+                version=F("version") + 1,
+                updated_at=now,
+            ):
+                return None
+            return cls.objects.using(using).get(pk=pk)
+
+        qn = connection.ops.quote_name
+        now = connection.ops.adapt_datetimefield_value(now)
+        # Las expresiones del SET ven los valores previos de la fila.
+        completed_at = (
+            f"CASE WHEN {qn('completed')} THEN {qn('completed_at')} ELSE %s END"
+        )
+        if completed is None:
+            value = f"NOT {qn('completed')}"
+            params = [now, now]
+        elif completed:
+            value = "%s"
+            params = [True, now, now]
+        else:
+            value = "%s"
+            completed_at = qn("completed_at")
+            params = [False, now]
+        where = f"{qn('id')} = %s AND {qn('user_id')} = %s"
+        params += [pk, user_id]
+        if completed is not None:
+            where += f" AND {qn('completed')} <> %s"
+            params.append(bool(completed))
+        if versions is not None:
+            if not versions:
+                return None
+            where += f" AND {qn('version')} IN ({', '.join(['%s'] * len(versions))})"
+            params += sorted(versions)
+        columns = ", ".join(qn(field.column) for field in cls._meta.concrete_fields)
+        sql = (
+            f"UPDATE {qn(cls._meta.db_table)} SET {qn('completed')} = {value}, "
+            f"{qn('completed_at')} = {completed_at}, "
+            f"{qn('version')} = {qn('version')} + 1, {qn('updated_at')} = %s "
+            f"WHERE {where} RETURNING {columns}"
+        )
+        return next(iter(cls.objects.db_manager(using).raw(sql, params)), None)
+
+
+class TaskIdSequence(models.Model):
+    """
+    Ultimo id de Task asignado en esta base cuando hay varios shards. Cada
+    shard asigna ids de su propio rango de ``TASK_SHARD_ID_BLOCK`` (segun
+    su posicion en ``TASK_SHARDS``): las tareas conservan el id al mover
+    al usuario de shard sin chocar con las del destino, cosa que el
+    autoincremental de la base no garantiza. Una sola fila por base.
+    """
+    last_id = models.BigIntegerField()
+
+    @classmethod
+    def id_range(cls, using):
+        start = settings.TASK_SHARDS.index(using) * settings.TASK_SHARD_ID_BLOCK
+        return start, start + settings.TASK_SHARD_ID_BLOCK
+
+    @classmethod
+    def initial_id(cls, using):
+        # Ids ya usados del rango, incluidos los de tareas borradas (marcas
+        # de baja) y archivadas: no se reutilizan.
+        start, end = cls.id_range(using)
+        used = [
+            model.objects.using(using)
+            .filter(**{f"{field}__gte": start, f"{field}__lt": end})
+            .aggregate(last=Max(field))["last"]
+            for model, field in (
+                (Task, "id"), (ArchivedTask, "id"), (TaskTombstone, "task_id"),
+            )
+        ]
+        return max([start, *(value for value in used if value is not None)])
+
+    @classmethod
+    def allocate(cls, using, count):
+        """Reserva ``count`` ids consecutivos en ``using``; devuelve el primero."""
+        with transaction.atomic(using=using):
+            sequence = cls.objects.using(using).select_for_update().filter(pk=1).first()
+            if sequence is None:
+                sequence = cls(pk=1, last_id=cls.initial_id(using))
+            sequence.last_id += count
+            sequence.save(using=using)
+        return sequence.last_id - count + 1
+
+
+class TaskCollection(models.Model):
+    """
+    Estado agregado de las tareas de un usuario. ``version`` se incrementa
+    con cada escritura (ver tasks.versions) y alimenta el ETag y el
+    Last-Modified del listado. ``task_count`` y ``completed_count`` se
+    mantienen de forma incremental y evitan el COUNT(*) del paginador
+    ``?pagination=cached``.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_collection",
+        db_constraint=False,
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    modified_at = models.DateTimeField(default=timezone.now)
+    task_count = models.BigIntegerField(default=0)
+    completed_count = models.BigIntegerField(default=0)
+    # Tareas movidas a ArchivedTask (no cuentan en task_count).
+    archived_count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+
+class TaskTombstone(models.Model):
+    """
+    Marca de una tarea eliminada, para que la sincronizacion incremental
+    (tasks.sync) pueda informar bajas. Se compactan pasados
+    ``TASKS_TOMBSTONE_RETENTION_DAYS`` (comando compact_task_tombstones).
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, db_constraint=False
+    )
+    task_id = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_at"],
+                name="tombstone_user_deleted_idx",
+            ),
+            # Compactacion: borra por antiguedad sin importar el usuario.
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -{self.task_id}"
+
+    @classmethod
+    def record(cls, user_id, task_ids):
+        """Registra la baja de ``task_ids`` con un solo INSERT."""
+        now = timezone.now()
+        cls.objects.bulk_create(
+            cls(user_id=user_id, task_id=task_id, deleted_at=now)
+            for task_id in task_ids
+        )
+
+
+class TaskDailyStats(models.Model):
+    """
+    Resumen diario por usuario: tareas creadas ese dia (``created_count``) y
+    tareas completadas cuyo ``completed_at`` cae ese dia
+    (``completed_count``). Se mantiene en cada escritura (tasks.stats) y se
+    reconstruye con el comando rebuild_task_stats.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, db_constraint=False
+    )
+    day = models.DateField()
+    created_count = models.BigIntegerField(default=0)
+    completed_count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "day"], name="task_daily_stats_user_day_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.day}"
+
+
+class ArchivedTask(models.Model):
+    """
+    Tarea completada hace mas de ``TASKS_ARCHIVE_AFTER_DAYS``, movida fuera
+    de Task (comando archive_tasks) para que la tabla caliente y sus
+    indices solo tengan tareas vigentes. Conserva el ``id`` original. Es de
+    solo lectura: se lista con ``?include_archived=true``.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, db_index=False, db_constraint=False
+    )
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    completed = models.BooleanField(default=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    version = models.PositiveIntegerField(default=1)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    # Columnas copiadas de Task al archivar.
+    copied_fields = [
+        "id", "user_id", "title", "description", "completed", "completed_at",
+        "created_at", "updated_at", "version",
+    ]
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at"],
+                name="archived_user_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class UserShard(models.Model):
+    """
+    Base (alias de ``TASK_SHARDS``) que guarda las tareas, contadores,
+    estadisticas, marcas de baja y archivadas del usuario. Siempre vive en
+    ``default``; ``moving`` bloquea las escrituras mientras el comando
+    move_task_users lo cambia de shard (tasks.shards).
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="task_shard"
+    )
+    alias = models.CharField(max_length=100)
+    moving = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.user_id} @{self.alias}"
@@ -0,0 +1,248 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime
+
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import (
+    Cursor,
+    CursorPagination,
+    LimitOffsetPagination,
+    _reverse_ordering,
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .filters import TaskFilter
+from .versions import get_collection_state
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginacion keyset sobre (campo de orden, id).
+
+    El cursor guarda los valores de la ultima fila vista, asi que la pagina
+    10.000 cuesta lo mismo que la primera (no hay OFFSET ni COUNT) y las
+    inserciones concurrentes no desplazan ni duplican resultados.
+    Respeta el ``ordering`` de OrderingFilter y desempata siempre por ``id``.
+    """
+    ordering = "-created_at"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_keyset(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.keyset_filter(self.cursor.position, reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = self.cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def get_keyset(self, request, queryset, view):
+        """Ordering pedido + ``id`` como desempate en la misma direccion."""
+        ordering = self.get_ordering(request, queryset, view)
+        if any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            return ordering
+        return ordering + ("-id" if ordering[0].startswith("-") else "id",)
+
+    def keyset_filter(self, position, reverse=False):
+        """
+        Filas estrictamente posteriores (o anteriores si ``reverse``) a
+        ``position`` segun el keyset. El primer campo se acota ademas con un
+        rango inclusivo para que la base pueda usar el indice y saltar
+        directamente al cursor.
+        """
+        condition = Q()
+        equal = Q()
+        bound = None
+        for index, (field, value) in enumerate(zip(self.ordering, position)):
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+            if index == 0:
+                bound = Q(**{f"{name}__{lookup}e": value})
+        return bound & condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+            reverse = bool(tokens.get("r", False))
+            position = tokens["p"]
+            ordering = tokens["o"]
+        except (TypeError, ValueError, KeyError, AttributeError, BinasciiError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or list(self.ordering) != ordering
+            or len(position) != len(self.ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"o": list(self.ordering), "p": cursor.position}
+        if cursor.reverse:
+            tokens["r"] = 1
+        encoded = urlsafe_b64encode(
+            json.dumps(tokens, separators=(",", ":")).encode("ascii")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for field in ordering:
+            name = field.lstrip("-")
+            if name == "pk":
+                name = "id"
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(value.isoformat() if isinstance(value, datetime) else value)
+        return position
+
+
+class TaskNoCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset sin ``count``: pide ``limit + 1`` filas para saber si hay
+    pagina siguiente y se ahorra el ``SELECT COUNT(*)``.
+    """
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        results = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(results) > self.limit
+        return results[:self.limit]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.offset_query_param, self.offset + self.limit)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        schema = super().get_paginated_response_schema(schema)
+        del schema["properties"]["count"]
+        schema["required"].remove("count")
+        return schema
+
+
+class TaskCachedCountPagination(LimitOffsetPagination):
+    """
+    Limit/offset con ``count`` tomado de los contadores de TaskCollection
+    (sin filtros o solo con ``completed``). Con cualquier otro filtro o
+    busqueda hace el COUNT exacto.
+    """
+    # Parametros que no cambian el conjunto de filas contadas.
+    neutral_params = {
+        "limit", "offset", "pagination", "ordering", "fields", "exclude",
+        "format", "completed",
+    }
+
+    def get_count(self, queryset):
+        count = self.get_cached_count(self.request)
+        return queryset.count() if count is None else count
+
+    def get_cached_count(self, request):
+        if set(request.query_params) - self.neutral_params:
+            return None
+        _, _, total, completed = get_collection_state(request)
+        if total is None:  # todavia sin contadores
+            return None
+        filterset = TaskFilter(data=request.query_params)
+        if not filterset.form.is_valid():
+            return None
+        value = filterset.form.cleaned_data.get("completed")
+        if value is None:
+            return total
+        return completed if value else total - completed
+
+
+class TaskPagination(LimitOffsetPagination):
+    """
+    LimitOffset por defecto. ``?pagination=`` elige otro modo:
+    ``cursor`` (keyset, TaskCursorPagination) para recorrer cuentas grandes,
+    ``nocount`` (sin ``count``) y ``cached`` (``count`` de los contadores
+    por usuario).
+    """
+    mode_query_param = "pagination"
+    modes = {
+        "offset": None,
+        "cursor": TaskCursorPagination,
+        "nocount": TaskNoCountPagination,
+        "cached": TaskCachedCountPagination,
+    }
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.mode_query_param, "offset")
+        if mode not in self.modes:
+            raise ValidationError({
+                self.mode_query_param: [
+                    f"Modo de paginacion invalido. Opciones: {', '.join(self.modes)}."
+                ]
+            })
+        if mode == "cursor" and queryset.query.combinator:
+            # El keyset filtra cada pagina y un UNION no admite filter().
+            raise ValidationError({self.mode_query_param: [
+                "La paginacion cursor no admite include_archived."
+            ]})
+        paginator_class = self.modes[mode]
+        self.delegate = paginator_class() if paginator_class else None
+        if self.delegate is not None:
+            return self.delegate.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+        return super().get_paginated_response(data)
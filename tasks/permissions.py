@@ -3,4 +3,8 @@ from rest_framework.permissions import BasePermission
 class IsOwner(BasePermission):
     """Permite acceso solo al dueño del objeto."""
     def has_object_permission(self, request, view, obj):
-        return getattr(obj, 'user_id', None) == getattr(request.user, 'id', None)
+        if isinstance(obj, dict):  # filas de values() (TaskReadMixin)
+            owner_id = obj.get('user_id')
+        else:
+            owner_id = getattr(obj, 'user_id', None)
+        return owner_id == getattr(request.user, 'id', None)
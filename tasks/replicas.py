@@ -0,0 +1,108 @@
+"""
+Lecturas de tareas en replicas de solo lectura.
+
+``DATABASE_READ_REPLICAS`` lista alias de ``DATABASES`` (conexiones de solo
+lectura al mismo archivo SQLite, o replicas reales). Los GET del listado y
+del detalle corren dentro de ``read_from_replica``: mientras dura, el router
+manda las lecturas a una replica al azar. Todo lo demas (escrituras, otras
+vistas, comandos) usa ``default``.
+
+Para que un usuario lea sus propias escrituras, cada escritura confirmada
+(señal ``tasks_changed``) lo fija al primario durante
+``DATABASE_REPLICA_PIN_SECONDS``. La marca se guarda en
+``CACHES[DATABASE_REPLICA_PIN_CACHE]``, compartido por todos los workers:
+el request que lee puede atenderlo otro proceso que el que escribio.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, router, transaction
+from django.dispatch import receiver
+
+from .shards import current_shard
+from .signals import tasks_changed
+
+_read_alias = ContextVar("tasks_read_alias", default=None)
+
+
+def pin_key(user_id):
+    return f"tasks:pin:{user_id}"
+
+
+def pin_cache():
+    return caches[settings.DATABASE_REPLICA_PIN_CACHE]
+
+
+def pin_to_primary(user_id):
+    pin_cache().set(
+        pin_key(user_id), True, timeout=settings.DATABASE_REPLICA_PIN_SECONDS
+    )
+
+
+def is_pinned(user_id):
+    return bool(pin_cache().get(pin_key(user_id)))
+
+
+@receiver(tasks_changed)
+def pin_writer(sender, user_id, **kwargs):
+    if settings.DATABASE_READ_REPLICAS and settings.DATABASE_REPLICA_PIN_SECONDS:
+        # Al confirmar: la ventana empieza cuando la escritura es visible.
+        transaction.on_commit(
+            lambda: pin_to_primary(user_id), using=router.db_for_write(sender)
+        )
+
+
+def choose_read_alias(user_id):
+    """Replica para las lecturas de ``user_id``, o None (primario)."""
+    replicas = settings.DATABASE_READ_REPLICAS
+    # Las replicas lo son de default: no sirven a usuarios de otros shards.
+    if not replicas or current_shard() not in (None, DEFAULT_DB_ALIAS):
+        return None
+    if is_pinned(user_id):
+        return None
+    return random.choice(replicas)
+
+
+@contextmanager
+def read_from_replica(user_id):
+    token = _read_alias.set(choose_read_alias(user_id))
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def replica_read(method):
+    """Ejecuta un handler de lectura de una vista dentro de read_from_replica."""
+    @wraps(method)
+    def wrapper(view, request, *args, **kwargs):
+        with read_from_replica(request.user.id):
+            return method(view, request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Lecturas dentro de ``read_from_replica`` a la replica elegida; el resto,
+    al router siguiente (``default``). No migra las replicas.
+    """
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_READ_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,43 @@
+"""
+Indice full-text (SQLite FTS5) sobre ``Task.title`` y ``Task.description``.
+
+La tabla virtual es de contenido externo (``content='tasks_task'``): no
+duplica el texto, solo guarda el indice invertido. Los triggers creados por
+la migracion 0003 la mantienen sincronizada con cada INSERT/UPDATE/DELETE.
+"""
+from django.db import connections
+
+FTS_TABLE = "tasks_task_fts"
+
+# Peso de cada columna en bm25: un match en el titulo vale mas.
+RANK_WEIGHTS = (10.0, 1.0)
+
+
+def search_available(using="default"):
+    return connections[using].vendor == "sqlite"
+
+
+def build_match_query(terms):
+    """
+    Traduce los terminos de busqueda a una expresion MATCH de FTS5.
+    Cada termino se cita (para neutralizar la sintaxis de FTS5) y se busca
+    por prefijo; los terminos se combinan con AND.
+    """
+    tokens = []
+    for term in terms:
+        term = term.replace('"', " ").strip()
+        if term:
+            tokens.append(f'"{term}"*')
+    return " ".join(tokens)
+
+
+def rank_expression():
+    weights = ", ".join(str(weight) for weight in RANK_WEIGHTS)
+    return f"bm25({FTS_TABLE}, {weights})"
+
+
+def rebuild_search_index(using="default"):
+    """Reconstruye el indice completo a partir de ``tasks_task``."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
@@ -1,10 +1,43 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import ISO_8601, api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
 from .models import Task
 
 User = get_user_model()
 
 
+class TaskListSerializer(serializers.ListSerializer):
+    """
+    Escrituras masivas: un solo INSERT (bulk_create) o UPDATE (bulk_update)
+    para toda la lista.
+    """
+    def create(self, validated_data):
+        # bulk_create no llama a save(): completed_at se fija a mano.
+        now = timezone.now()
+        tasks = [Task(**attrs) for attrs in validated_data]
+        for task in tasks:
+            task.mark_completion(False, now)
+        return Task.objects.bulk_create(tasks)
+
+    def update(self, instances, validated_data):
+        # bulk_update no pasa por los auto_now: updated_at se fija a mano.
+        now = timezone.now()
+        fields = {"updated_at", "version", "completed_at"}
+        for task, attrs in zip(instances, validated_data):
+            was_completed = task.completed
+            for field, value in attrs.items():
+                setattr(task, field, value)
+                fields.add(field)
+            task.mark_completion(was_completed, now)
+            task.updated_at = now
+            task.version += 1
+        Task.objects.bulk_update(instances, sorted(fields))
+        return instances
+
+
 class TaskSerializer(serializers.ModelSerializer):
     """Serializador para exponer/validar tareas."""
     class Meta:
@@ -18,3 +51,99 @@ class TaskSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = TaskListSerializer
+
+    def update(self, instance, validated_data):
+        if validated_data.get("completed") and not instance.completed:
+            instance.completed_at = timezone.now()
+        return super().update(instance, validated_data)
+
+
+class TaskReadSerializer:
+    """
+    Serializacion de solo lectura (listado y detalle) sobre filas de
+    ``values()`` con los campos de ``TaskSerializer``: arma los dicts
+    directamente, sin instanciar modelos ni recorrer los fields de DRF.
+    La salida es identica a ``TaskSerializer(...).data``; escrituras y
+    validacion siguen pasando por ``TaskSerializer``.
+    """
+    fields = TaskSerializer.Meta.fields
+    _compiled = None
+
+    def __init__(self, instance=None, many=False, context=None, fields=None, **kwargs):
+        self.instance = instance
+        self.many = many
+        self.context = context or {}
+        if fields is not None:
+            self.fields = fields
+        self.converters = self.compile()
+
+    @classmethod
+    def get_fields(cls):
+        """Fields de TaskSerializer con conversion distinta de la identidad."""
+        if cls._compiled is None:
+            fields = TaskSerializer().fields
+            cls._compiled = [
+                (name, fields[name]) for name in cls.fields
+                if isinstance(fields[name], serializers.DateTimeField)
+            ]
+        return cls._compiled
+
+    def compile(self):
+        # El resto de los campos ya llega de values() con el tipo de salida
+        # (int, str, bool o None).
+        return [
+            (name, self.datetime_converter(field))
+            for name, field in self.get_fields() if name in self.fields
+        ]
+
+    def datetime_converter(self, field):
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        tz = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or tz is None:
+            return field.to_representation
+
+        def to_representation(value):
+            # Mismo resultado que DateTimeField.to_representation en el caso
+            # comun (datetime aware e ISO 8601); el resto lo resuelve DRF.
+            if not value or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(tz).isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+        return to_representation
+
+    def to_representation(self, row):
+        data = {name: row[name] for name in self.fields}
+        for name, convert in self.converters:
+            if data[name] is not None:
+                data[name] = convert(data[name])
+        return data
+
+    @property
+    def data(self):
+        if self.many:
+            return ReturnList(
+                [self.to_representation(row) for row in self.instance],
+                serializer=self,
+            )
+        return ReturnDict(self.to_representation(self.instance), serializer=self)
+
+
+class TaskIdsSerializer(serializers.Serializer):
+    """Valida la lista de ids de las operaciones masivas."""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+    )
+    completed = serializers.BooleanField(required=False)
+
+    def validate_ids(self, value):
+        if len(value) > settings.TASKS_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                f"Maximo {settings.TASKS_BULK_MAX_ITEMS} tareas por operacion."
+            )
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Hay ids repetidos.")
+        return value
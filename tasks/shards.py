@@ -0,0 +1,361 @@
+"""
+Particion (sharding) de los datos de tareas por usuario.
+
+``TASK_SHARDS`` lista los alias de ``DATABASES`` que guardan tareas. Cada
+usuario vive en uno solo, anotado en ``UserShard`` (en ``default``): ahi
+estan sus tareas, contadores, estadisticas, marcas de baja y archivadas.
+Los usuarios nuevos se reparten por id; el comando move_task_users los
+mueve de shard o rebalancea.
+
+Las vistas activan el shard del usuario al autenticar
+(``activate_shard``) y ShardRouter manda ahi las consultas de los
+modelos de tareas. Fuera de un request (comandos) se activa uno con
+``use_shard`` o se recorren todos con ``fan_out``, que consulta los shards
+en paralelo y junta los resultados. Las transacciones sobre tareas usan
+``atomic()``: ``transaction.atomic`` en el shard activo.
+
+Con un solo shard (la configuracion por defecto) todo queda en ``default``
+y no se consulta ``UserShard``.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.db.models import Count
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .cache import get_response_cache
+from .models import (
+    ArchivedTask,
+    Task,
+    TaskCollection,
+    TaskDailyStats,
+    TaskTombstone,
+    UserShard,
+)
+
+# Modelos con los datos de un usuario: viven en su shard y se mueven juntos.
+SHARDED_MODELS = (Task, ArchivedTask, TaskCollection, TaskDailyStats, TaskTombstone)
+
+_active_shard = ContextVar("tasks_active_shard", default=None)
+# Usuario del shard activado por ``activate_shard``: ``atomic()`` revisa su
+# entrada del directorio al empezar cada transaccion.
+_active_user = ContextVar("tasks_active_user", default=None)
+
+
+class ShardMoving(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Las tareas se estan moviendo de base. Reintentar."
+    default_code = "shard_moving"
+
+
+def placement(user_id):
+    """Shard inicial de un usuario nuevo."""
+    shards = settings.TASK_SHARDS
+    return shards[user_id % len(shards)]
+
+
+def directory_key(user_id):
+    return f"tasks:shard:{user_id}"
+
+
+def forget(user_id):
+    get_response_cache().delete(directory_key(user_id))
+
+
+def remember(shard):
+    entry = (shard.alias, shard.moving)
+    # Durante una mudanza no se guarda: al terminar, el origen queda vacio y
+    # los demas procesos tienen que ver el cambio en el siguiente request.
+    if not shard.moving:
+        get_response_cache().set(
+            directory_key(shard.user_id), entry, settings.TASK_SHARD_CACHE_SECONDS
+        )
+    return entry
+
+
+def lookup(user_id):
+    """(alias, moving) del usuario. Si no tenia shard asignado, se asigna."""
+    if len(settings.TASK_SHARDS) < 2:
+        return settings.TASK_SHARDS[0], False
+    entry = get_response_cache().get(directory_key(user_id))
+    if entry is None:
+        shard, _ = UserShard.objects.get_or_create(
+            user_id=user_id, defaults={"alias": placement(user_id)}
+        )
+        entry = remember(shard)
+    return entry
+
+
+async def alookup(user_id):
+    """``lookup`` con el ORM async."""
+    if len(settings.TASK_SHARDS) < 2:
+        return settings.TASK_SHARDS[0], False
+    entry = get_response_cache().get(directory_key(user_id))
+    if entry is None:
+        shard, _ = await UserShard.objects.aget_or_create(
+            user_id=user_id, defaults={"alias": placement(user_id)}
+        )
+        entry = remember(shard)
+    return entry
+
+
+def shard_for(user_id):
+    return lookup(user_id)[0]
+
+
+def current_shard():
+    return _active_shard.get()
+
+
+@contextmanager
+def use_shard(alias):
+    """Activa ``alias`` (None: ninguno) y restaura el shard previo al salir."""
+    token = _active_shard.set(alias)
+    user_token = _active_user.set(None)
+    try:
+        yield
+    finally:
+        _active_user.reset(user_token)
+        _active_shard.reset(token)
+
+
+def activate_shard(entry, write=False, user_id=None):
+    """
+    Activa el shard de ``entry`` (de ``lookup``) del usuario ``user_id``
+    hasta el fin del ``use_shard`` que lo contiene. Las escrituras de un
+    usuario que se esta moviendo responden 503.
+    """
+    alias, moving = entry
+    if write and moving:
+        raise ShardMoving
+    _active_shard.set(alias)
+    _active_user.set(user_id)
+    return alias
+
+
+def task_db():
+    """Base donde se escriben las tareas en el contexto actual."""
+    return router.db_for_write(Task)
+
+
+def check_directory(user_id, alias):
+    """ShardMoving si ``user_id`` se esta moviendo o ya no esta en ``alias``."""
+    if not UserShard.objects.filter(
+        user_id=user_id, alias=alias, moving=False
+    ).exists():
+        raise ShardMoving
+
+
+@contextmanager
+def atomic():
+    """
+    ``transaction.atomic`` en el shard activo (tambien como decorador).
+
+    Con varios shards, la transaccion externa vuelve a leer la entrada del
+    usuario activo en el directorio despues de tomar el lock de escritura
+    (las transacciones son IMMEDIATE): una escritura que empezo antes de una
+    mudanza no llega a escribir en el origen despues de que ``move_user``
+    copio o borro sus filas.
+    """
+    using = task_db()
+    user_id = _active_user.get()
+    outermost = not connections[using].in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and user_id is not None and len(settings.TASK_SHARDS) > 1:
+            check_directory(user_id, using)
+        yield
+
+
+def fan_out(function, aliases=None):
+    """
+    Llama a ``function(alias)`` con cada shard activo, en paralelo (un hilo
+    por shard), y devuelve ``{alias: resultado}``.
+    """
+    aliases = list(settings.TASK_SHARDS if aliases is None else aliases)
+
+    def run(alias):
+        with use_shard(alias):
+            return function(alias)
+
+    if len(aliases) == 1:
+        return {aliases[0]: run(aliases[0])}
+
+    def run_in_thread(alias):
+        try:
+            return run(alias)
+        finally:
+            # Las conexiones son por hilo: se cierran las de este.
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+        return dict(zip(aliases, pool.map(run_in_thread, aliases)))
+
+
+def group_by_shard(user_ids):
+    """``{alias: [user_id, ...]}`` (None: todos los usuarios en cada shard)."""
+    if user_ids is None:
+        return {alias: None for alias in settings.TASK_SHARDS}
+    groups = {}
+    for user_id in user_ids:
+        groups.setdefault(shard_for(user_id), []).append(user_id)
+    return groups
+
+
+def task_counts():
+    """``{alias: {user_id: tareas}}`` de todos los shards."""
+    return fan_out(lambda alias: dict(
+        Task.objects.using(alias).values_list("user_id")
+        .annotate(n=Count("id")).order_by()
+    ))
+
+
+def insert_rows(model, using, rows):
+    """
+    INSERT de ``rows`` tal cual: ``raw`` evita que ``auto_now`` y
+    ``auto_now_add`` pisen las fechas. TaskDailyStats y TaskTombstone toman
+    ids nuevos en cada base; el resto conserva los suyos.
+    """
+    fields = model._meta.local_concrete_fields
+    if model in (TaskDailyStats, TaskTombstone):
+        fields = [field for field in fields if not field.primary_key]
+    size = connections[using].ops.bulk_batch_size(fields, rows) or len(rows)
+    for start in range(0, len(rows), size):
+        model._base_manager._insert(
+            rows[start:start + size], fields=fields, raw=True, using=using
+        )
+
+
+def copy_user_rows(user_id, source, target, batch_size=1000):
+    for model in SHARDED_MODELS:
+        # Restos de un intento anterior que no llego a terminar.
+        model.objects.using(target).filter(user_id=user_id).delete()
+        rows = model.objects.using(source).filter(user_id=user_id).order_by()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                insert_rows(model, target, batch)
+                batch = []
+        if batch:
+            insert_rows(model, target, batch)
+
+
+def delete_user_rows(user_id, using):
+    for model in SHARDED_MODELS:
+        model.objects.using(using).filter(user_id=user_id).delete()
+
+
+def move_user(user_id, target, wait=None):
+    """
+    Mueve los datos de ``user_id`` al shard ``target`` y devuelve el de
+    origen. Mientras dura, sus escrituras responden 503; las lecturas siguen
+    en el origen hasta el cambio. Antes de copiar espera ``wait`` segundos
+    (por defecto ``TASK_SHARD_CACHE_SECONDS``) para que ningun proceso siga
+    escribiendo con el shard anterior en cache. Mientras dura, ``lookup``
+    no guarda el directorio en cache: al terminar todos leen el destino.
+    La copia y el borrado corren con el lock de escritura del origen y las
+    transacciones de ``atomic()`` revisan el directorio despues de tomarlo:
+    una escritura en curso termina antes de la copia o responde 503.
+    """
+    if target not in settings.TASK_SHARDS:
+        raise ValueError(f"{target!r} no esta en TASK_SHARDS.")
+    shard, _ = UserShard.objects.get_or_create(
+        user_id=user_id, defaults={"alias": placement(user_id)}
+    )
+    source = shard.alias
+    if source == target:
+        return source
+    directory = UserShard.objects.filter(user_id=user_id)
+    directory.update(moving=True)
+    forget(user_id)
+    try:
+        time.sleep(settings.TASK_SHARD_CACHE_SECONDS if wait is None else wait)
+        with transaction.atomic(using=source):
+            with transaction.atomic(using=target):
+                copy_user_rows(user_id, source, target)
+            directory.update(alias=target, moving=False)
+            delete_user_rows(user_id, source)
+    except BaseException:
+        directory.filter(alias=source).update(moving=False)
+        raise
+    finally:
+        forget(user_id)
+    return source
+
+
+def plan_rebalance(counts):
+    """
+    Movimientos ``[(user_id, origen, destino), ...]`` que emparejan la
+    cantidad de tareas por shard: mueve del shard mas cargado al menos
+    cargado el usuario mas grande que no invierta la diferencia.
+    """
+    users = {alias: dict(per_user) for alias, per_user in counts.items()}
+    load = {alias: sum(per_user.values()) for alias, per_user in users.items()}
+    moves = []
+    while True:
+        fullest = max(load, key=load.get)
+        emptiest = min(load, key=load.get)
+        gap = load[fullest] - load[emptiest]
+        candidates = [
+            (size, user_id) for user_id, size in users[fullest].items()
+            if 0 < size and 2 * size <= gap
+        ]
+        if not candidates:
+            return moves
+        size, user_id = max(candidates)
+        del users[fullest][user_id]
+        users[emptiest][user_id] = size
+        load[fullest] -= size
+        load[emptiest] += size
+        moves.append((user_id, fullest, emptiest))
+
+
+class ShardRouter:
+    """
+    Modelos de SHARDED_MODELS: al shard del ``user_id`` de la instancia o,
+    sin instancia, al shard activo (sin shard activo, ``default``).
+    UserShard siempre en ``default``.
+    """
+    def db_for_model(self, model, instance=None, **hints):
+        if model is UserShard:
+            return DEFAULT_DB_ALIAS
+        if model not in SHARDED_MODELS:
+            return None
+        user_id = getattr(instance, "user_id", None)
+        if isinstance(instance, SHARDED_MODELS) and user_id is not None:
+            return shard_for(user_id)
+        return _active_shard.get()
+
+    db_for_read = db_for_model
+    db_for_write = db_for_model
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # El usuario esta en default y sus tareas en cualquier shard.
+        if isinstance(obj1, SHARDED_MODELS) or isinstance(obj2, SHARDED_MODELS):
+            return True
+        return None
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def assign_new_user(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserShard.objects.get_or_create(
+            user_id=instance.pk, defaults={"alias": placement(instance.pk)}
+        )
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def delete_sharded_rows(sender, instance, using, **kwargs):
+    # El CASCADE de Django solo borra en la base del usuario.
+    alias = shard_for(instance.pk)
+    if alias != using:
+        with transaction.atomic(using=alias):
+            delete_user_rows(instance.pk, alias)
+        forget(instance.pk)
@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.dispatch import Signal
+
+# Se envia despues de cualquier escritura sobre las tareas de un usuario,
+# dentro de la misma transaccion que la escritura.
+# Argumentos: ``user_id`` y el estado de las tareas afectadas antes
+# (``before``) y despues (``after``) de la escritura: tareas, filas de
+# ``values()`` o ``tasks.stats.TaskState`` con created_at, completed y
+# completed_at. Una creacion solo tiene ``after`` y un borrado solo
+# ``before``. De ahi salen los contadores de TaskCollection y TaskDailyStats.
+# ``archived=True`` indica que las tareas de ``before`` se movieron a
+# ArchivedTask (tasks.archive) en lugar de borrarse.
+tasks_changed = Signal()
+
+# Las vistas de la API envian tasks_changed ellas mismas, con el estado
+# exacto de cada escritura. Fuera de ellas (shell, admin, scripts) lo envian
+# Task.save y Task.delete.
+_views_report = ContextVar("tasks_views_report", default=False)
+
+
+@contextmanager
+def reported_by_views():
+    token = _views_report.set(True)
+    try:
+        yield
+    finally:
+        _views_report.reset(token)
+
+
+def views_report_changes():
+    return _views_report.get()
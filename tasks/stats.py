@@ -0,0 +1,252 @@
+"""
+Resumenes por usuario que se mantienen en cada escritura: version y
+contadores de ``TaskCollection`` y estadisticas diarias (``TaskDailyStats``).
+Las tareas archivadas (ArchivedTask) salen de los contadores de Task pero
+siguen contando en las estadisticas diarias.
+
+Cada escritura envia ``tasks_changed`` con el estado de las tareas afectadas
+antes (``before``) y despues (``after``) de escribir; de ahi salen todos los
+deltas. Los resumenes son una funcion del estado actual de ``Task``, asi que
+``rebuild_stats`` los puede recalcular desde cero.
+"""
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.db import connections, router
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ArchivedTask, Task, TaskCollection, TaskDailyStats
+from .shards import atomic
+from .signals import tasks_changed
+
+TaskState = namedtuple("TaskState", ["created_at", "completed", "completed_at"])
+
+
+def task_state(task):
+    """TaskState de una tarea, una fila de ``values()`` o un TaskState."""
+    if isinstance(task, TaskState):
+        return task
+    if isinstance(task, dict):
+        return TaskState(task["created_at"], task["completed"], task["completed_at"])
+    return TaskState(task.created_at, task.completed, task.completed_at)
+
+
+def day_of(moment):
+    return timezone.localdate(moment)
+
+
+def daily_deltas(before, after):
+    """Variacion de (creadas, completadas) por dia entre ``before`` y ``after``."""
+    created, completed = Counter(), Counter()
+    for sign, states in ((-1, before), (1, after)):
+        for state in states:
+            created[day_of(state.created_at)] += sign
+            if state.completed and state.completed_at is not None:
+                completed[day_of(state.completed_at)] += sign
+    days = {day for day in {*created, *completed} if created[day] or completed[day]}
+    return {day: (created[day], completed[day]) for day in days}
+
+
+def apply_daily_deltas(user_id, deltas):
+    """Suma ``deltas`` a TaskDailyStats con un solo upsert."""
+    if not deltas:
+        return
+    using = router.db_for_write(TaskDailyStats)
+    connection = connections[using]
+    if connection.vendor not in ("sqlite", "postgresql"):
+        for day, (created, completed) in deltas.items():
+            updated = TaskDailyStats.objects.using(using).filter(
+                user_id=user_id, day=day
+            ).update(
+                created_count=F("created_count") + created,
+                completed_count=F("completed_count") + completed,
+            )
+            if not updated:
+                TaskDailyStats.objects.using(using).create(
+                    user_id=user_id, day=day,
+                    created_count=created, completed_count=completed,
+                )
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(TaskDailyStats._meta.db_table)
+    params = []
+    for day, (created, completed) in sorted(deltas.items()):
+        params += [user_id, connection.ops.adapt_datefield_value(day), created, completed]
+    values = ", ".join(["(%s, %s, %s, %s)"] * len(deltas))
+    sql = (
+        f"INSERT INTO {table} ({qn('user_id')}, {qn('day')}, "
+        f"{qn('created_count')}, {qn('completed_count')}) VALUES {values} "
+        f"ON CONFLICT ({qn('user_id')}, {qn('day')}) DO UPDATE SET "
+        f"{qn('created_count')} = {table}.{qn('created_count')} + excluded.{qn('created_count')}, "
+        f"{qn('completed_count')} = {table}.{qn('completed_count')} + excluded.{qn('completed_count')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+@receiver(tasks_changed)
+def update_task_summaries(sender, user_id, before=(), after=(), archived=False, **kwargs):
+    before = [task_state(task) for task in before]
+    after = [task_state(task) for task in after]
+    now = timezone.now()
+    updated = TaskCollection.objects.filter(user_id=user_id).update(
+        version=F("version") + 1,
+        modified_at=now,
+        task_count=F("task_count") + len(after) - len(before),
+        completed_count=F("completed_count")
+        + sum(state.completed for state in after)
+        - sum(state.completed for state in before),
+        archived_count=F("archived_count") + (len(before) if archived else 0),
+    )
+    if not updated:
+        # Primera escritura del usuario: todo se calcula exacto (ya incluye
+        # la escritura actual).
+        rebuild_stats(user_ids=[user_id], modified_at=now)
+    elif not archived:
+        # Las archivadas siguen contando en las estadisticas diarias.
+        apply_daily_deltas(user_id, daily_deltas(before, after))
+
+
+def touch_collections(using, user_ids=None):
+    """
+    Incrementa la version de los listados (ETag y cache de respuestas) sin
+    cambiar contadores: para procesos que cambian lo que devuelve el
+    listado sin escribir tareas (por ejemplo, reconstruir el indice FTS).
+    """
+    collections = TaskCollection.objects.using(using)
+    if user_ids is not None:
+        collections = collections.filter(user_id__in=user_ids)
+    return collections.update(version=F("version") + 1, modified_at=timezone.now())
+
+
+def count_tasks(user_id):
+    """Contadores exactos (COUNT) de las tareas del usuario."""
+    return Task.objects.filter(user_id=user_id).aggregate(
+        task_count=Count("id"),
+        completed_count=Count("id", filter=Q(completed=True)),
+    )
+
+
+def rebuild_stats(user_ids=None, modified_at=None):
+    """
+    Recalcula contadores y estadisticas diarias desde ``Task`` para
+    ``user_ids`` (o todos los usuarios con tareas o resumenes). Incrementa
+    la version de los resumenes que ya existian: los contadores corregidos
+    cambian el ``count`` de ``pagination=cached`` (ETag y cache de respuestas).
+    """
+    modified_at = modified_at or timezone.now()
+    tz = timezone.get_current_timezone()
+    tasks = Task.objects.all()
+    archived = ArchivedTask.objects.all()
+    collections = TaskCollection.objects.all()
+    daily = TaskDailyStats.objects.all()
+    if user_ids is not None:
+        tasks = tasks.filter(user_id__in=user_ids)
+        archived = archived.filter(user_id__in=user_ids)
+        collections = collections.filter(user_id__in=user_ids)
+        daily = daily.filter(user_id__in=user_ids)
+
+    empty = {"task_count": 0, "completed_count": 0, "archived_count": 0}
+    counts = {}
+    for row in tasks.values("user_id").annotate(
+        task_count=Count("id"),
+        completed_count=Count("id", filter=Q(completed=True)),
+    ):
+        counts[row["user_id"]] = {**empty, **row}
+    for row in archived.values("user_id").annotate(archived_count=Count("id")):
+        counts.setdefault(row["user_id"], dict(empty))["archived_count"] = (
+            row["archived_count"]
+        )
+
+    deltas = {}
+    for queryset in (tasks, archived):
+        created = (
+            queryset.annotate(day=TruncDate("created_at", tzinfo=tz))
+            .values("user_id", "day").annotate(n=Count("id"))
+        )
+        completed = (
+            queryset.filter(completed=True, completed_at__isnull=False)
+            .annotate(day=TruncDate("completed_at", tzinfo=tz))
+            .values("user_id", "day").annotate(n=Count("id"))
+        )
+        for row in created:
+            deltas.setdefault((row["user_id"], row["day"]), [0, 0])[0] += row["n"]
+        for row in completed:
+            deltas.setdefault((row["user_id"], row["day"]), [0, 0])[1] += row["n"]
+
+    with atomic():
+        daily.delete()
+        TaskDailyStats.objects.bulk_create(
+            TaskDailyStats(
+                user_id=user_id, day=day,
+                created_count=created_count, completed_count=completed_count,
+            )
+            for (user_id, day), (created_count, completed_count) in deltas.items()
+        )
+        existing = set(collections.values_list("user_id", flat=True))
+        for user_id in existing - set(counts):
+            counts[user_id] = dict(empty)
+        if user_ids is not None:
+            for user_id in set(user_ids) - set(counts):
+                counts[user_id] = dict(empty)
+        for user_id, row in counts.items():
+            values = {name: row[name] for name in empty}
+            if user_id in existing:
+                TaskCollection.objects.filter(user_id=user_id).update(
+                    version=F("version") + 1, modified_at=modified_at, **values
+                )
+            else:
+                TaskCollection.objects.get_or_create(
+                    user_id=user_id,
+                    defaults={
+                        "version": 1,
+                        "modified_at": modified_at,
+                        **values,
+                    },
+                )
+    return len(counts)
+
+
+def get_stats(user_id, days):
+    """
+    Totales y los histogramas de los ultimos ``days`` dias. Lee una fila de
+    TaskCollection y a lo sumo ``days`` filas de TaskDailyStats.
+    """
+    counts = (
+        TaskCollection.objects.filter(user_id=user_id)
+        .values_list("task_count", "completed_count", "archived_count")
+        .first()
+    )
+    if counts is None:
+        # Usuario sin resumenes todavia: se inicializan una vez.
+        rebuild_stats(user_ids=[user_id])
+        return get_stats(user_id, days)
+    total, completed, archived = counts
+
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    rows = {
+        day: (created_count, completed_count)
+        for day, created_count, completed_count in TaskDailyStats.objects.filter(
+            user_id=user_id, day__gte=start, day__lte=today
+        ).values_list("day", "created_count", "completed_count")
+    }
+    window = [start + timedelta(days=offset) for offset in range(days)]
+    return {
+        "total": total,
+        "completed": completed,
+        "pending": total - completed,
+        "archived": archived,
+        "created_per_day": [
+            {"date": day.isoformat(), "count": rows.get(day, (0, 0))[0]}
+            for day in window
+        ],
+        "completed_per_day": [
+            {"date": day.isoformat(), "count": rows.get(day, (0, 0))[1]}
+            for day in window
+        ],
+    }
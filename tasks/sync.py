@@ -0,0 +1,93 @@
+"""
+Sincronizacion incremental: cambios de las tareas de un usuario desde un
+cursor.
+
+El cursor es el instante de la consulta anterior. Como ``updated_at`` se fija
+antes del commit, una escritura lenta puede confirmarse con un timestamp
+anterior al cursor ya entregado: por eso cada consulta vuelve a mirar
+``TASKS_SYNC_GRACE_SECONDS`` hacia atras. Los clientes deben aplicar los
+cambios de forma idempotente (pueden recibir una misma tarea dos veces).
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+from .serializers import TaskReadSerializer
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class ResyncRequired(Exception):
+    """El cursor ya no alcanza: hay que volver a descargar todo."""
+
+
+def encode_cursor(moment):
+    tokens = {"t": moment.isoformat()}
+    return urlsafe_b64encode(
+        json.dumps(tokens, separators=(",", ":")).encode("ascii")
+    ).decode("ascii")
+
+
+def decode_cursor(encoded):
+    try:
+        tokens = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        moment = datetime.fromisoformat(tokens["t"])
+    except (TypeError, ValueError, KeyError, AttributeError, BinasciiError):
+        raise InvalidCursor
+    if timezone.is_naive(moment):
+        raise InvalidCursor
+    return moment
+
+
+def retention():
+    return timedelta(days=settings.TASKS_TOMBSTONE_RETENTION_DAYS)
+
+
+def get_changes(user_id, cursor):
+    """
+    Tareas creadas/modificadas y ids eliminados desde ``cursor``, mas el
+    cursor siguiente. Sin cursor solo devuelve el punto de partida.
+    """
+    now = timezone.now()
+    result = {"tasks": [], "deleted": [], "cursor": encode_cursor(now)}
+    if cursor is None:
+        return result
+
+    since = decode_cursor(cursor)
+    if since < now - retention():
+        # Las bajas anteriores pudieron compactarse.
+        raise ResyncRequired
+    since -= timedelta(seconds=settings.TASKS_SYNC_GRACE_SECONDS)
+
+    limit = settings.TASKS_SYNC_MAX_CHANGES
+    tasks = list(
+        Task.objects.filter(user_id=user_id, updated_at__gt=since)
+        .order_by("updated_at", "id")
+        .values(*TaskReadSerializer.fields)[:limit + 1]
+    )
+    deleted = list(
+        TaskTombstone.objects.filter(user_id=user_id, deleted_at__gt=since)
+        .order_by("deleted_at", "task_id")
+        .values_list("task_id", flat=True)[:limit + 1]
+    )
+    if len(tasks) + len(deleted) > limit:
+        raise ResyncRequired
+
+    result["tasks"] = TaskReadSerializer(tasks, many=True).data
+    result["deleted"] = deleted
+    return result
+
+
+def compact_tombstones(older_than=None):
+    """Borra las marcas de baja fuera de la ventana de retencion."""
+    if older_than is None:
+        older_than = timezone.now() - retention()
+    deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=older_than).delete()
+    return deleted
@@ -0,0 +1,174 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import clear_auth_caches
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import ArchivedTask, Task, TaskCollection
+from ..search import FTS_TABLE, build_match_query
+from ..stats import rebuild_stats
+from .tests_stats import snapshot
+
+
+def envejecer(tasks, days):
+    moment = timezone.now() - timedelta(days=days)
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(
+        created_at=moment, updated_at=moment, completed_at=moment
+    )
+
+
+class TestArchiveTasks(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.viejas = TaskFactory.create_batch(3, user=self.user, completed=True)
+        self.viejas[0].title = "Comprar leche"
+        self.viejas[0].save()
+        envejecer(self.viejas, 400)
+        self.pendiente = TaskFactory(user=self.user, completed=False)
+        envejecer([self.pendiente], 400)
+        self.nueva = TaskFactory(user=self.user, completed=True, title="Leche nueva")
+        self.ajena = TaskFactory(user=UserFactory(), completed=True)
+        envejecer([self.ajena], 400)
+        self.list_url = reverse("task-list-create")
+
+    def archivar(self, *args):
+        out = StringIO()
+        call_command("archive_tasks", *args, stdout=out)
+        return out.getvalue()
+
+    def listar(self, **params):
+        resp = self.client.get(self.list_url, {"include_archived": "true", **params})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()
+
+    def fts_ids(self, term):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s",
+                [build_match_query([term])],
+            )
+            return {row[0] for row in cursor.fetchall()}
+
+    def test_mueve_solo_completadas_viejas_en_lotes(self):
+        rebuild_stats()
+        before = snapshot(self.user)
+        out = self.archivar("--batch-size", "2", "--user", str(self.user.id))
+        self.assertIn("3 tareas archivadas", out)
+
+        ids = {task.pk for task in self.viejas}
+        self.assertFalse(Task.objects.filter(pk__in=ids).exists())
+        self.assertEqual(
+            set(ArchivedTask.objects.values_list("id", flat=True)), ids
+        )
+        self.assertTrue(Task.objects.filter(pk=self.pendiente.pk).exists())
+        self.assertTrue(Task.objects.filter(pk=self.ajena.pk).exists())
+        self.assertNotIn(self.viejas[0].pk, self.fts_ids("leche"))
+        self.assertIn(self.nueva.pk, self.fts_ids("leche"))
+        # Volver a correrlo no encuentra nada mas.
+        self.assertIn("0 tareas archivadas", self.archivar("--user", str(self.user.id)))
+
+        collection = TaskCollection.objects.get(user=self.user)
+        self.assertEqual(
+            (collection.task_count, collection.completed_count,
+             collection.archived_count),
+            (2, 1, 3),
+        )
+        # El historial por dia no cambia al archivar.
+        self.assertEqual(snapshot(self.user)[1], before[1])
+        incremental = TaskCollection.objects.filter(user=self.user).values_list(
+            "task_count", "completed_count", "archived_count"
+        ).get()
+        rebuild_stats(user_ids=[self.user.id])
+        self.assertEqual(snapshot(self.user)[1], before[1])
+        self.assertEqual(
+            TaskCollection.objects.filter(user=self.user).values_list(
+                "task_count", "completed_count", "archived_count"
+            ).get(),
+            incremental,
+        )
+
+        stats = self.client.get(reverse("task-stats")).json()
+        self.assertEqual((stats["total"], stats["archived"]), (2, 3))
+
+    def test_archivar_no_recalcula_estadisticas(self):
+        rebuild_stats()
+        with mock.patch("tasks.stats.rebuild_stats", wraps=rebuild_stats) as rebuild:
+            self.archivar("--batch-size", "1", "--user", str(self.user.id))
+        rebuild.assert_not_called()
+        self.assertEqual(ArchivedTask.objects.count(), 3)
+
+    def test_dias_configurables(self):
+        self.assertIn("0 tareas archivadas", self.archivar("--days", "500"))
+        self.assertIn("4 tareas archivadas", self.archivar("--days", "30"))
+
+    def test_archivadas_no_se_modifican(self):
+        self.archivar()
+        pk = self.viejas[0].pk
+        resp = self.client.get(reverse("task-detail", args=[pk]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        resp = self.client.patch(reverse("task-toggle", args=[pk]), {}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listado_con_archivadas(self):
+        self.archivar()
+        self.assertEqual(
+            [item["id"] for item in self.client.get(self.list_url).json()["results"]],
+            [self.nueva.pk, self.pendiente.pk],
+        )
+        body = self.listar()
+        self.assertEqual(body["count"], 5)
+        self.assertEqual(
+            {item["id"] for item in body["results"]},
+            {self.nueva.pk, self.pendiente.pk, *(task.pk for task in self.viejas)},
+        )
+        self.assertEqual(body["results"][0]["id"], self.nueva.pk)
+
+        body = self.listar(completed="false")
+        self.assertEqual([item["id"] for item in body["results"]], [self.pendiente.pk])
+        body = self.listar(ordering="title", fields="title", limit=2)
+        titles = sorted([
+            *Task.objects.filter(user=self.user).values_list("title", flat=True),
+            *ArchivedTask.objects.filter(user=self.user).values_list(
+                "title", flat=True
+            ),
+        ])
+        self.assertEqual(
+            [item["title"] for item in body["results"]], titles[:2]
+        )
+        self.assertEqual(set(body["results"][0]), {"title"})
+
+        body = self.listar(search="leche")
+        self.assertEqual(
+            {item["id"] for item in body["results"]},
+            {self.viejas[0].pk, self.nueva.pk},
+        )
+
+    def test_include_archived_invalido_o_con_cursor(self):
+        resp = self.client.get(self.list_url, {"include_archived": "tal vez"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include_archived", resp.json())
+        resp = self.client.get(
+            self.list_url, {"include_archived": "1", "pagination": "cursor"}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_listado_async_con_archivadas(self):
+        clear_auth_caches()
+        self.archivar()
+        self.client.force_authenticate(user=None)
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        resp = self.client.get(
+            reverse("task-async-list-create"), {"include_archived": "true"}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()["count"], 5)
@@ -0,0 +1,129 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import clear_auth_caches
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task, TaskCollection, TaskTombstone
+
+
+class TestAsyncTaskViews(APITestCase):
+    def setUp(self):
+        clear_auth_caches()
+        self.user = UserFactory()
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.tasks = TaskFactory.create_batch(12, user=self.user, completed=False)
+        self.ajena = TaskFactory(user=UserFactory())
+        self.list_url = reverse("task-async-list-create")
+
+    def detail_url(self, pk):
+        return reverse("task-async-detail", args=[pk])
+
+    def test_listado_igual_al_sync(self):
+        for params in (
+            {},
+            {"limit": 5, "offset": 10},
+            {"ordering": "title", "fields": "id,title"},
+            {"completed": "false", "exclude": "description"},
+            {"search": self.tasks[0].title.split()[0]},
+        ):
+            resp = self.client.get(self.list_url, params)
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            expected = self.client.get(reverse("task-list-create"), params).json()
+            body = resp.json()
+            for key in ("next", "previous"):
+                if expected[key]:
+                    expected[key] = expected[key].replace("/api/?", "/api/async/?")
+            self.assertEqual(body, expected, params)
+
+    def test_solo_paginacion_offset(self):
+        resp = self.client.get(self.list_url, {"pagination": "cursor"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtro_invalido_400(self):
+        resp = self.client.get(self.list_url, {"created_at_after": "no-es-fecha"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_alta_notifica(self):
+        resp = self.client.post(
+            self.list_url, {"title": "Async", "completed": True}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.json()["title"], "Async")
+        task = Task.objects.get(pk=resp.json()["id"])
+        self.assertEqual(task.user, self.user)
+        self.assertIsNotNone(task.completed_at)
+        collection = TaskCollection.objects.get(user=self.user)
+        self.assertEqual((collection.task_count, collection.completed_count), (13, 1))
+
+        resp = self.client.post(self.list_url, {"title": ""}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", resp.json())
+
+    def test_detalle_y_permisos(self):
+        task = self.tasks[0]
+        resp = self.client.get(self.detail_url(task.pk))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            resp.json(), self.client.get(reverse("task-detail", args=[task.pk])).json()
+        )
+        resp = self.client.get(self.detail_url(self.ajena.pk))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_toggle_con_if_match(self):
+        task = self.tasks[0]
+        url = reverse("task-async-toggle", args=[task.pk])
+        resp = self.client.patch(url, {}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp.json()["completed"])
+        self.assertEqual(resp["ETag"], f'"{task.pk}.2"')
+
+        resp = self.client.patch(url, {}, format="json", HTTP_IF_MATCH=f'"{task.pk}.1"')
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        resp = self.client.patch(
+            reverse("task-async-toggle", args=[self.ajena.pk]), {}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_baja(self):
+        task = self.tasks[0]
+        resp = self.client.delete(self.detail_url(task.pk))
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertTrue(TaskTombstone.objects.filter(task_id=task.pk).exists())
+        resp = self.client.delete(self.detail_url(self.ajena.pk))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_autenticacion(self):
+        self.client.credentials()
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn("Bearer", resp["WWW-Authenticate"])
+
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer no-es-un-token")
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = False
+        self.user.save()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        with override_settings(JWT_USER_STATUS_TTL=60):
+            resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_metodo_no_permitido(self):
+        resp = self.client.put(self.list_url, {}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    async def test_atiende_en_el_event_loop(self):
+        resp = await self.async_client.get(
+            self.list_url, {"limit": 3},
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        body = resp.json()
+        self.assertEqual(body["count"], 12)
+        self.assertEqual(len(body["results"]), 3)
@@ -0,0 +1,147 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task
+
+
+class TestTasksBulkAPI(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.pending = TaskFactory.create_batch(3, user=self.user, completed=False)
+        self.done = TaskFactory(user=self.user, completed=True)
+        self.other_task = TaskFactory(user=UserFactory(), completed=False)
+        self.bulk_url = reverse("task-bulk")
+        self.toggle_url = reverse("task-bulk-toggle")
+
+    def test_create_201_en_un_solo_insert(self):
+        payload = [{"title": f"Nueva {i}"} for i in range(5)]
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(self.bulk_url, payload, format="json")
+        inserts = [
+            q for q in queries if q["sql"].startswith('INSERT INTO "tasks_task"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        results = resp.json()["results"]
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(item["id"] for item in results))
+        self.assertEqual(
+            Task.objects.filter(user=self.user, title__startswith="Nueva").count(), 5
+        )
+
+    def test_create_400_errores_por_item_y_no_escribe_nada(self):
+        payload = [{"title": "ok"}, {"description": "sin titulo"}, {"title": "ok2"}]
+        resp = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = resp.json()["errors"]
+        self.assertEqual(list(errors), ["1"])
+        self.assertIn("title", errors["1"])
+        self.assertFalse(Task.objects.filter(title__in=["ok", "ok2"]).exists())
+
+    @override_settings(TASKS_BULK_MAX_ITEMS=2)
+    def test_create_400_excede_maximo(self):
+        payload = [{"title": "a"}, {"title": "b"}, {"title": "c"}]
+        resp = self.client.post(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_200_bulk_update(self):
+        payload = [
+            {"id": self.pending[0].id, "title": "A"},
+            {"id": self.pending[1].id, "completed": True},
+        ]
+        resp = self.client.patch(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.pending[0].refresh_from_db()
+        self.pending[1].refresh_from_db()
+        self.assertEqual(self.pending[0].title, "A")
+        self.assertTrue(self.pending[1].completed)
+        self.assertGreater(self.pending[0].updated_at, self.pending[0].created_at)
+
+    def test_update_400_ajena_o_invalida_no_escribe_nada(self):
+        payload = [
+            {"id": self.pending[0].id, "title": "A"},
+            {"id": self.other_task.id, "title": "B"},
+            {"title": "sin id"},
+        ]
+        resp = self.client.patch(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = resp.json()["errors"]
+        self.assertEqual(sorted(errors), ["1", "2"])
+        self.assertIn("id", errors["1"])
+        self.assertIn("id", errors["2"])
+        self.pending[0].refresh_from_db()
+        self.assertNotEqual(self.pending[0].title, "A")
+
+        payload = [{"id": self.pending[0].id, "title": ""}]
+        resp = self.client.patch(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("title", resp.json()["errors"]["0"])
+
+    def test_update_400_id_de_tipo_invalido(self):
+        payload = [
+            {"id": str(self.pending[0].id), "title": "A"},
+            {"id": "abc", "title": "B"},
+            {"id": [self.pending[1].id], "title": "C"},
+            "no es un objeto",
+        ]
+        resp = self.client.patch(self.bulk_url, payload, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = resp.json()["errors"]
+        self.assertEqual(sorted(errors), ["1", "2", "3"])
+        for index in ("1", "2"):
+            self.assertNotIn("No existe la tarea.", errors[index]["id"])
+        self.assertIn("non_field_errors", errors["3"])
+
+        # Un id numerico como texto se acepta, como en los demas endpoints.
+        resp = self.client.patch(self.bulk_url, payload[:1], format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.pending[0].refresh_from_db()
+        self.assertEqual(self.pending[0].title, "A")
+
+    def test_delete_204(self):
+        ids = [task.id for task in self.pending]
+        resp = self.client.delete(self.bulk_url, {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Task.objects.filter(id__in=ids).exists())
+
+    def test_delete_400_ajena_no_borra_nada(self):
+        ids = [self.pending[0].id, self.other_task.id]
+        resp = self.client.delete(self.bulk_url, {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.json()["errors"], {"1": {"id": ["No existe la tarea."]}})
+        self.assertTrue(Task.objects.filter(id__in=ids).count() == 2)
+
+    def test_toggle_invierte_cada_una(self):
+        ids = [self.pending[0].id, self.done.id]
+        resp = self.client.patch(self.toggle_url, {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        states = dict(Task.objects.filter(id__in=ids).values_list("id", "completed"))
+        self.assertEqual(states, {self.pending[0].id: True, self.done.id: False})
+
+    def test_toggle_explicito(self):
+        ids = [self.pending[0].id, self.done.id]
+        resp = self.client.patch(
+            self.toggle_url, {"ids": ids, "completed": True}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(all(item["completed"] for item in resp.json()["results"]))
+
+    def test_toggle_400_ajena_hace_rollback(self):
+        ids = [self.pending[0].id, self.other_task.id]
+        resp = self.client.patch(self.toggle_url, {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.pending[0].refresh_from_db()
+        self.other_task.refresh_from_db()
+        self.assertFalse(self.pending[0].completed)
+        self.assertFalse(self.other_task.completed)
+
+    def test_ids_repetidos_400(self):
+        ids = [self.pending[0].id, self.pending[0].id]
+        resp = self.client.patch(self.toggle_url, {"ids": ids}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
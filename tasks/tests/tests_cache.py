@@ -0,0 +1,129 @@
+from django.core.cache import caches
+from django.db.models import F
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..cache import LRUCache, get_response_cache, stats
+from ..factories import TaskFactory
+from ..models import Task, TaskCollection
+from ..stats import rebuild_stats
+
+
+class TestTaskResponseCache(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.task = TaskFactory(user=self.user, title="Cacheada", completed=False)
+        self.list_url = reverse("task-list-create")
+        self.detail_url = reverse("task-detail", args=[self.task.id])
+
+    def test_list_hit_no_consulta_tareas(self):
+        first = self.client.get(self.list_url)
+        with self.assertNumQueries(1):  # solo la version para el ETag
+            second = self.client.get(self.list_url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(stats.as_dict()["hits"], 1)
+        self.assertEqual(stats.as_dict()["misses"], 1)
+
+    def test_detail_hit(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):  # solo updated_at para el ETag
+            resp = self.client.get(self.detail_url)
+        self.assertEqual(resp.json()["title"], "Cacheada")
+        self.assertEqual(stats.hits, 1)
+
+    def test_claves_distintas_por_parametros(self):
+        self.client.get(self.list_url)
+        self.client.get(self.list_url, {"completed": "true"})
+        self.assertEqual(stats.misses, 2)
+
+    def test_escrituras_invalidan(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.client.patch(
+            reverse("task-toggle", args=[self.task.id]), {}, format="json"
+        )
+        self.assertTrue(self.client.get(self.detail_url).json()["completed"])
+        self.client.post(self.list_url, {"title": "Nueva"}, format="json")
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 2)
+        self.client.delete(self.detail_url)
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 1)
+        self.assertEqual(stats.hits, 0)
+
+    def test_usuarios_aislados(self):
+        self.client.get(self.list_url)
+        other = UserFactory()
+        TaskFactory(user=other)
+        self.client.force_authenticate(user=other)
+        resp = self.client.get(self.list_url)
+        self.assertNotEqual(resp.json()["results"][0]["title"], "Cacheada")
+        self.assertEqual(stats.hits, 0)
+
+    def test_escrituras_fuera_de_la_api_invalidan(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        self.task.title = "Desde el shell"
+        self.task.save()
+        self.assertEqual(self.client.get(self.detail_url).json()["title"], "Desde el shell")
+        TaskFactory(user=self.user)
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 2)
+        self.task.delete()
+        self.assertEqual(self.client.get(self.list_url).json()["count"], 1)
+        self.assertEqual(TaskCollection.objects.get(user=self.user).task_count, 1)
+        self.assertEqual(stats.hits, 0)
+
+    def test_escritura_de_otro_proceso_invalida(self):
+        # Otro worker escribe en la base sin tocar el cache de este proceso:
+        # las claves usan la version de la base, no un contador del cache.
+        rebuild_stats(user_ids=[self.user.id])
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        Task.objects.filter(pk=self.task.pk).update(
+            title="Renombrada", version=F("version") + 1
+        )
+        TaskCollection.objects.filter(user=self.user).update(version=F("version") + 1)
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.json()["results"][0]["title"], "Renombrada")
+        self.assertEqual(self.client.get(self.detail_url).json()["title"], "Renombrada")
+        self.assertEqual(stats.hits, 0)
+
+    @override_settings(TASKS_CACHE_ENABLED=False)
+    def test_deshabilitado(self):
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.assertEqual(stats.hits + stats.misses, 0)
+
+    @override_settings(
+        CACHES={"tasks": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        TASKS_CACHE_ALIAS="tasks",
+    )
+    def test_usa_cache_de_django_si_esta_configurado(self):
+        self.assertIs(get_response_cache(), caches["tasks"])
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.assertEqual(stats.hits, 1)
+        caches["tasks"].clear()
+
+
+class TestLRUCache(APITestCase):
+    def test_desaloja_la_menos_usada(self):
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 2)
+
+    def test_incr_add_y_expiracion(self):
+        cache = LRUCache()
+        with self.assertRaises(ValueError):
+            cache.incr("n")
+        self.assertTrue(cache.add("n", 1))
+        self.assertFalse(cache.add("n", 5))
+        self.assertEqual(cache.incr("n"), 2)
+        cache.set("t", "x", timeout=-1)
+        self.assertIsNone(cache.get("t"))
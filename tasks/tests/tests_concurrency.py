@@ -0,0 +1,213 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+from todo_challenge.db.base import DatabaseWrapper
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task, TaskCollection
+from ..versions import check_if_match
+from ..views import TaskDetailView
+
+
+class TestTaskToggleAtomico(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.task = TaskFactory(user=self.user, completed=False)
+        self.url = reverse("task-toggle", args=[self.task.id])
+
+    def test_una_sola_sentencia_sobre_tasks(self):
+        # Con contadores ya creados (si no, la primera escritura los calcula).
+        TaskCollection.objects.get_or_create(user=self.user, defaults={"task_count": 1})
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.patch(self.url, {}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        on_tasks = [
+            q["sql"] for q in ctx.captured_queries if '"tasks_task"' in q["sql"]
+        ]
+        self.assertEqual(len(on_tasks), 1)
+        self.assertTrue(on_tasks[0].startswith('UPDATE "tasks_task"'))
+        self.assertIn("RETURNING", on_tasks[0])
+
+    def test_incrementa_version_y_updated_at(self):
+        resp = self.client.patch(self.url, {}, format="json")
+        self.assertTrue(resp.json()["completed"])
+        self.assertEqual(resp["ETag"], f'"{self.task.id}.2"')
+        before = self.task.updated_at
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.completed, self.task.version), (True, 2))
+        self.assertGreater(self.task.updated_at, before)
+        self.assertEqual(resp.json()["updated_at"].replace("Z", "+00:00"),
+                         self.task.updated_at.isoformat())
+
+    def test_valor_explicito(self):
+        resp = self.client.patch(self.url, {"completed": True}, format="json")
+        self.assertTrue(resp.json()["completed"])
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 2)
+
+    def test_valor_explicito_igual_no_escribe(self):
+        resp = self.client.patch(self.url, {"completed": False}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertFalse(resp.json()["completed"])
+        self.assertEqual(resp["ETag"], f'"{self.task.id}.1"')
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.version, 1)
+
+    def test_if_match(self):
+        resp = self.client.patch(self.url, {}, format="json", HTTP_IF_MATCH='"999.1"')
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        etag = f'"{self.task.id}.1"'
+        resp = self.client.patch(self.url, {}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        resp = self.client.patch(self.url, {}, format="json", HTTP_IF_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.completed, self.task.version), (True, 2))
+
+    def test_ajena_404_aun_con_if_match(self):
+        ajena = TaskFactory(user=UserFactory())
+        url = reverse("task-toggle", args=[ajena.id])
+        resp = self.client.patch(url, {}, format="json", HTTP_IF_MATCH=f'"{ajena.id}.1"')
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TestTaskIfMatch(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.task = TaskFactory(user=self.user, title="Original")
+        self.url = reverse("task-detail", args=[self.task.id])
+
+    def patch(self, data, **headers):
+        return self.client.patch(self.url, data, format="json", **headers)
+
+    def test_etag_del_get_sirve_para_if_match(self):
+        etag = self.client.get(self.url)["ETag"]
+        resp = self.patch({"title": "Nuevo"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp["ETag"], etag)
+        self.assertEqual(resp["ETag"], self.client.get(self.url)["ETag"])
+
+    def test_etag_viejo_412_sin_escribir(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.patch({"title": "Primero"}, HTTP_IF_MATCH=etag)
+        resp = self.patch({"title": "Segundo"}, HTTP_IF_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "Primero")
+
+    def test_put_con_if_match(self):
+        resp = self.client.put(
+            self.url, {"title": "Put", "completed": True}, format="json",
+            HTTP_IF_MATCH='"0.0"',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+
+    def test_etag_debil_y_comodin(self):
+        weak = f'W/"{self.task.id}.1"'
+        resp = self.patch({"title": "x"}, HTTP_IF_MATCH=weak)
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        resp = self.patch({"title": "x"}, HTTP_IF_MATCH="*")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_sin_if_match_incrementa_version(self):
+        self.patch({"title": "a"})
+        self.patch({"title": "b"})
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.title, self.task.version), ("b", 3))
+
+    def stale_get_object(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        Task.objects.filter(pk=self.task.pk).update(
+            title="Concurrente", version=F("version") + 1
+        )
+
+        def get_object(view):
+            # Lectura previa a la escritura concurrente.
+            check_if_match(view.request, stale)
+            return stale
+        return mock.patch.object(TaskDetailView, "get_object", get_object)
+
+    def test_escritura_concurrente_con_if_match_412(self):
+        with self.stale_get_object():
+            resp = self.patch({"title": "Mio"}, HTTP_IF_MATCH=f'"{self.task.id}.1"')
+        self.assertEqual(resp.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "Concurrente")
+
+    def test_escritura_concurrente_sin_if_match_409(self):
+        with self.stale_get_object():
+            resp = self.patch({"title": "Mio"})
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.title, "Concurrente")
+
+
+class TestTaskVersionEnBulk(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = TaskFactory.create_batch(2, user=self.user)
+        self.ids = [task.id for task in self.tasks]
+
+    def versiones(self):
+        return list(
+            Task.objects.filter(id__in=self.ids).order_by("id")
+            .values_list("version", flat=True)
+        )
+
+    def test_bulk_patch_y_toggle_incrementan_version(self):
+        self.client.patch(
+            reverse("task-bulk"),
+            [{"id": pk, "title": "x"} for pk in self.ids],
+            format="json",
+        )
+        self.assertEqual(self.versiones(), [2, 2])
+        self.client.patch(
+            reverse("task-bulk-toggle"), {"ids": self.ids}, format="json"
+        )
+        self.assertEqual(self.versiones(), [3, 3])
+
+
+class TestSqliteBackend(SimpleTestCase):
+    def open(self, **options):
+        path = os.path.join(tempfile.mkdtemp(), "db.sqlite3")
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": path, "OPTIONS": options}, "tuned"
+        )
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        # Conexion cruda: el wrapper no esta registrado en ``connections``.
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        self.addCleanup(conn.close)
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_aplica_pragmas_por_defecto_y_configurados(self):
+        wrapper = self.open(
+            pragmas={"cache_size": -1000, "mmap_size": None},
+            init_command="PRAGMA synchronous = FULL",
+            transaction_mode="IMMEDIATE",
+        )
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 5000)
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -1000)
+        self.assertEqual(self.pragma(wrapper, "mmap_size"), 0)
+        self.assertEqual(self.pragma(wrapper, "synchronous"), 2)  # FULL
+        self.assertEqual(self.pragma(wrapper, "foreign_keys"), 1)
+        self.assertEqual(wrapper.transaction_mode, "IMMEDIATE")
+
+    def test_pragma_invalido(self):
+        wrapper = self.open(pragmas={"cache_size": "1; DROP TABLE x"})
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.get_connection_params()
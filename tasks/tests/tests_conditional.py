@@ -0,0 +1,88 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+
+
+class TestTasksConditionalGet(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.other = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("task-list-create")
+        self.task = self.client.post(
+            self.list_url, {"title": "Primera"}, format="json"
+        ).json()
+        self.detail_url = reverse("task-detail", args=[self.task["id"]])
+        self.toggle_url = reverse("task-toggle", args=[self.task["id"]])
+
+    def test_list_emite_etag_y_last_modified(self):
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(resp["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", resp)
+
+    def test_list_304_sin_consultar_ni_serializar(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(resp.content, b"")
+
+    def test_list_if_modified_since(self):
+        last_modified = self.client.get(self.list_url)["Last-Modified"]
+        resp = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_etag_cambia_con_cada_escritura(self):
+        etags = {self.client.get(self.list_url)["ETag"]}
+        self.client.post(self.list_url, {"title": "Otra"}, format="json")
+        etags.add(self.client.get(self.list_url)["ETag"])
+        self.client.patch(self.toggle_url, {}, format="json")
+        etags.add(self.client.get(self.list_url)["ETag"])
+        self.client.patch(self.detail_url, {"title": "X"}, format="json")
+        etags.add(self.client.get(self.list_url)["ETag"])
+        self.client.delete(self.detail_url)
+        etags.add(self.client.get(self.list_url)["ETag"])
+        self.assertEqual(len(etags), 5)
+
+    def test_list_etag_depende_de_los_parametros(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        resp = self.client.get(
+            self.list_url, {"completed": "true"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_no_cambia_por_escrituras_de_otro_usuario(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        self.client.force_authenticate(user=self.other)
+        self.client.post(self.list_url, {"title": "Ajena"}, format="json")
+        self.client.force_authenticate(user=self.user)
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_detail_304_y_cambia_tras_toggle(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.toggle_url, {}, format="json")
+        resp = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_detail_ajena_404_sin_etag(self):
+        ajena = TaskFactory(user=self.other)
+        resp = self.client.get(reverse("task-detail", args=[ajena.id]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", resp)
+
+    def test_bulk_tambien_invalida(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        self.client.patch(
+            reverse("task-bulk-toggle"), {"ids": [self.task["id"]]}, format="json"
+        )
+        resp = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
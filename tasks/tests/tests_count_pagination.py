@@ -0,0 +1,140 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import TaskCollection
+
+
+def count_queries(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+
+
+class TestTaskNoCountPagination(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        TaskFactory.create_batch(5, user=self.user)
+        self.list_url = reverse("task-list-create")
+
+    def test_sin_count_y_con_next(self):
+        with CaptureQueriesContext(connection) as ctx:
+            body = self.client.get(
+                self.list_url, {"pagination": "nocount", "limit": 2}
+            ).json()
+        self.assertEqual(count_queries(ctx), [])
+        self.assertNotIn("count", body)
+        self.assertEqual(len(body["results"]), 2)
+        self.assertIsNone(body["previous"])
+
+        ids = [item["id"] for item in body["results"]]
+        while body["next"]:
+            body = self.client.get(body["next"]).json()
+            ids.extend(item["id"] for item in body["results"])
+        self.assertEqual(len(set(ids)), 5)
+        self.assertIsNotNone(body["previous"])
+
+    def test_ultima_pagina_exacta_sin_next(self):
+        body = self.client.get(
+            self.list_url, {"pagination": "nocount", "limit": 5}
+        ).json()
+        self.assertEqual(len(body["results"]), 5)
+        self.assertIsNone(body["next"])
+
+
+class TestTaskCachedCountPagination(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("task-list-create")
+
+    def count(self, mode, **params):
+        resp = self.client.get(self.list_url, {"pagination": mode, **params})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()["count"]
+
+    def assertContadores(self):
+        for params in ({}, {"completed": "true"}, {"completed": "false"}):
+            self.assertEqual(
+                self.count("cached", **params), self.count("offset", **params), params
+            )
+
+    def test_contadores_se_mantienen_en_cada_escritura(self):
+        created = [
+            self.client.post(self.list_url, {"title": f"T{i}"}, format="json").json()
+            for i in range(3)
+        ]
+        self.assertContadores()
+        self.client.patch(reverse("task-toggle", args=[created[0]["id"]]), {}, format="json")
+        self.client.patch(
+            reverse("task-toggle", args=[created[0]["id"]]), {"completed": True},
+            format="json",
+        )
+        self.assertContadores()
+        self.client.patch(
+            reverse("task-detail", args=[created[1]["id"]]), {"completed": True},
+            format="json",
+        )
+        self.assertContadores()
+        self.client.delete(reverse("task-detail", args=[created[0]["id"]]))
+        self.assertContadores()
+
+        bulk = self.client.post(
+            reverse("task-bulk"),
+            [{"title": "B1", "completed": True}, {"title": "B2"}],
+            format="json",
+        ).json()["results"]
+        bulk_ids = [item["id"] for item in bulk]
+        self.assertContadores()
+        self.client.patch(
+            reverse("task-bulk"),
+            [{"id": pk, "completed": False} for pk in bulk_ids],
+            format="json",
+        )
+        self.assertContadores()
+        self.client.patch(
+            reverse("task-bulk-toggle"), {"ids": bulk_ids + [created[2]["id"]]},
+            format="json",
+        )
+        self.assertContadores()
+        self.client.patch(
+            reverse("task-bulk-toggle"), {"ids": bulk_ids, "completed": False},
+            format="json",
+        )
+        self.assertContadores()
+        self.client.delete(reverse("task-bulk"), {"ids": bulk_ids}, format="json")
+        self.assertContadores()
+        self.client.post(
+            reverse("task-import"),
+            '{"title": "I1", "completed": true}\n{"title": "I2"}\n',
+            content_type="application/x-ndjson",
+        )
+        self.assertContadores()
+
+    def test_sin_count_query(self):
+        self.client.post(self.list_url, {"title": "T"}, format="json")
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.count("cached"), 1)
+            self.assertEqual(self.count("cached", completed="true"), 0)
+        self.assertEqual(count_queries(ctx), [])
+
+    def test_filtros_o_busqueda_hacen_count_exacto(self):
+        self.client.post(self.list_url, {"title": "Comprar pan"}, format="json")
+        self.client.post(self.list_url, {"title": "Otra"}, format="json")
+        # Contador desincronizado a proposito: solo se usa sin filtros.
+        TaskCollection.objects.filter(user=self.user).update(task_count=99)
+        self.assertEqual(self.count("cached"), 99)
+        self.assertEqual(self.count("cached", search="pan"), 1)
+        self.assertEqual(self.count("cached", created_at_after="2000-01-01"), 2)
+
+    def test_sin_contadores_usa_count_exacto(self):
+        TaskFactory.create_batch(2, user=self.user)
+        self.assertEqual(self.count("cached"), 2)
+
+    def test_primera_escritura_calcula_contadores(self):
+        TaskFactory.create_batch(2, user=self.user, completed=True)
+        self.client.post(self.list_url, {"title": "T"}, format="json")
+        collection = TaskCollection.objects.get(user=self.user)
+        self.assertEqual((collection.task_count, collection.completed_count), (3, 2))
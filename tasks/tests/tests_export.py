@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task
+from ..serializers import TaskSerializer
+
+
+class TestTaskExport(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        TaskFactory.create_batch(3, user=self.user, completed=False)
+        TaskFactory.create_batch(2, user=self.user, completed=True)
+        TaskFactory(user=self.user, title='Coma, "comillas"\ny salto', description=None)
+        TaskFactory(user=UserFactory(), title="Ajena")
+        self.url = reverse("task-export")
+
+    def exportar(self, **params):
+        resp = self.client.get(self.url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(resp, StreamingHttpResponse)
+        return resp, b"".join(resp.streaming_content).decode()
+
+    def esperado(self, **filters):
+        queryset = Task.objects.filter(user=self.user, **filters)
+        return [dict(item) for item in TaskSerializer(queryset, many=True).data]
+
+    def test_ndjson_por_defecto(self):
+        resp, body = self.exportar()
+        self.assertEqual(resp["Content-Type"], "application/x-ndjson")
+        self.assertIn('filename="tasks.ndjson"', resp["Content-Disposition"])
+        items = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(items, self.esperado())
+
+    def test_csv(self):
+        resp, body = self.exportar(output="csv")
+        self.assertTrue(resp["Content-Type"].startswith("text/csv"))
+        rows = list(csv.DictReader(io.StringIO(body)))
+        expected = self.esperado()
+        self.assertEqual(len(rows), len(expected))
+        for row, item in zip(rows, expected):
+            self.assertEqual(int(row["id"]), item["id"])
+            self.assertEqual(row["title"], item["title"])
+            self.assertEqual(row["description"], item["description"] or "")
+            self.assertEqual(row["completed"], str(item["completed"]))
+            self.assertEqual(row["created_at"], item["created_at"])
+
+    def test_respeta_filtros_y_ordering(self):
+        _, body = self.exportar(completed="true", ordering="title")
+        items = [json.loads(line) for line in body.splitlines()]
+        expected = sorted(self.esperado(completed=True), key=lambda i: i["title"])
+        self.assertEqual(items, expected)
+
+    def test_sin_tareas(self):
+        self.client.force_authenticate(user=UserFactory())
+        _, body = self.exportar()
+        self.assertEqual(body, "")
+        _, body = self.exportar(output="csv")
+        self.assertEqual(body.splitlines(), [",".join(TaskSerializer.Meta.fields)])
+
+    @override_settings(TASKS_EXPORT_CHUNK_SIZE=2)
+    def test_lee_en_chunks(self):
+        _, body = self.exportar()
+        self.assertEqual(len(body.splitlines()), 6)
+
+    def test_primer_byte_antes_de_consultar(self):
+        resp = self.client.get(self.url, {"output": "csv"})
+        content = iter(resp.streaming_content)
+        with self.assertNumQueries(0):
+            self.assertTrue(next(content).startswith(b"id,title"))
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(content)), 6)
+
+    def test_formato_invalido_400(self):
+        resp = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtro_invalido_400(self):
+        resp = self.client.get(self.url, {"created_at_after": "no-es-fecha"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_401_sin_autenticacion(self):
+        self.client.force_authenticate(user=None)
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+
+
+class TestTaskSparseFieldsets(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = TaskFactory.create_batch(3, user=self.user, description="x" * 500)
+        self.list_url = reverse("task-list-create")
+        self.detail_url = reverse("task-detail", args=[self.tasks[0].id])
+
+    def listar(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.list_url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        page = [q["sql"] for q in ctx.captured_queries if "LIMIT" in q["sql"]]
+        return resp.json()["results"], page[-1]
+
+    def test_fields_recorta_respuesta_y_columnas(self):
+        results, sql = self.listar(fields="id,title")
+        self.assertEqual([list(item) for item in results], [["id", "title"]] * 3)
+        self.assertNotIn('"description"', sql.split("FROM")[0])
+
+    def test_exclude(self):
+        results, sql = self.listar(exclude="description")
+        self.assertEqual(
+            list(results[0]), ["id", "title", "completed", "created_at", "updated_at"]
+        )
+        self.assertNotIn('"description"', sql.split("FROM")[0])
+
+    def test_respeta_el_orden_del_serializer(self):
+        results, _ = self.listar(fields="updated_at,title")
+        self.assertEqual(list(results[0]), ["title", "updated_at"])
+
+    def test_campos_desconocidos_400(self):
+        for params in (
+            {"fields": "title,user"},
+            {"exclude": "password"},
+            {"fields": "title", "exclude": "id"},
+            {"fields": ","},
+            {"exclude": "id,title,description,completed,created_at,updated_at"},
+        ):
+            resp = self.client.get(self.list_url, params)
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    def test_cursor_con_campos_de_orden_no_pedidos(self):
+        ids, url = [], self.list_url
+        data = {"pagination": "cursor", "limit": 2, "fields": "title", "ordering": "title"}
+        while url:
+            body = self.client.get(url, data).json()
+            self.assertEqual({tuple(item) for item in body["results"]}, {("title",)})
+            ids.extend(item["title"] for item in body["results"])
+            url, data = body["next"], None
+        self.assertEqual(ids, sorted(task.title for task in self.tasks))
+
+    def test_detalle(self):
+        resp = self.client.get(self.detail_url, {"fields": "title,completed"})
+        self.assertEqual(list(resp.json()), ["title", "completed"])
+        resp = self.client.get(self.detail_url, {"fields": "nope"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_escrituras_no_se_ven_afectadas(self):
+        resp = self.client.post(
+            self.list_url + "?fields=title", {"title": "Nueva"}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertIn("description", resp.json())
@@ -0,0 +1,103 @@
+import json
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..models import Task
+
+
+class TestTaskImport(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("task-import")
+
+    def importar(self, body, content_type="application/x-ndjson"):
+        return self.client.post(self.url, body, content_type=content_type)
+
+    def ndjson(self, *rows):
+        return "\n".join(json.dumps(row) for row in rows) + "\n"
+
+    def test_ndjson(self):
+        resp = self.importar(self.ndjson(
+            {"title": "Uno", "description": "d", "completed": True},
+            {"title": "Dos"},
+        ))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json(), {"accepted": 2, "rejected": 0, "errors": {}})
+        tasks = Task.objects.filter(user=self.user).order_by("title")
+        self.assertEqual([t.title for t in tasks], ["Dos", "Uno"])
+        self.assertTrue(tasks[1].completed)
+
+    def test_csv(self):
+        body = (
+            "title,description,completed\n"
+            'Uno,"con, coma",true\n'
+            '"Multi\nlinea",,false\n'
+            ",sin titulo,false\n"
+        )
+        resp = self.importar(body, "text/csv; charset=utf-8")
+        data = resp.json()
+        self.assertEqual(data["accepted"], 2)
+        self.assertEqual(data["rejected"], 1)
+        self.assertIn("title", data["errors"]["5"])
+        self.assertTrue(Task.objects.filter(title="Multi\nlinea").exists())
+
+    def test_filas_invalidas_por_linea(self):
+        body = self.ndjson({"title": "Ok"}) + "no json\n\n[1]\n" + self.ndjson(
+            {"title": "x" * 300}, {"title": "Ok 2"}
+        )
+        data = self.importar(body).json()
+        self.assertEqual(data["accepted"], 2)
+        self.assertEqual(data["rejected"], 3)
+        self.assertEqual(sorted(data["errors"]), ["2", "4", "5"])
+        self.assertIn("title", data["errors"]["5"])
+
+    def test_ignora_campos_de_solo_lectura(self):
+        self.importar(self.ndjson({"title": "T", "id": 999, "user": 123}))
+        task = Task.objects.get(title="T")
+        self.assertNotEqual(task.id, 999)
+        self.assertEqual(task.user, self.user)
+
+    @override_settings(TASKS_IMPORT_BATCH_SIZE=2)
+    def test_inserta_en_lotes(self):
+        body = self.ndjson(*({"title": f"T{i}"} for i in range(5)))
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.importar(body).json()
+        self.assertEqual(data["accepted"], 5)
+        inserts = [
+            q for q in ctx.captured_queries
+            if q["sql"].startswith('INSERT INTO "tasks_task"')
+        ]
+        self.assertEqual(len(inserts), 3)
+
+    @override_settings(TASKS_IMPORT_MAX_ERRORS=2)
+    def test_limita_errores_detallados(self):
+        data = self.importar("x\n" * 5).json()
+        self.assertEqual(data["rejected"], 5)
+        self.assertEqual(len(data["errors"]), 2)
+
+    def test_invalida_cache_del_listado(self):
+        list_url = reverse("task-list-create")
+        self.assertEqual(self.client.get(list_url).json()["count"], 0)
+        self.importar(self.ndjson({"title": "Nueva"}))
+        self.assertEqual(self.client.get(list_url).json()["count"], 1)
+
+    def test_content_type_no_soportado_415(self):
+        resp = self.client.post(self.url, [{"title": "x"}], format="json")
+        self.assertEqual(resp.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        resp = self.importar("title\nx\n", "text/csv; charset=no-existe")
+        self.assertEqual(resp.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+    def test_cuerpo_vacio(self):
+        resp = self.importar("")
+        self.assertEqual(resp.json(), {"accepted": 0, "rejected": 0, "errors": {}})
+
+    def test_401_sin_autenticacion(self):
+        self.client.force_authenticate(user=None)
+        resp = self.importar(self.ndjson({"title": "x"}))
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task
+from ..pagination import TaskCursorPagination
+
+
+class TestTaskCursorPagination(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        TaskFactory.create_batch(25, user=self.user)
+        TaskFactory.create_batch(3, user=UserFactory())
+        self.list_url = reverse("task-list-create")
+
+    def recorrer(self, params):
+        ids, url, pages = [], self.list_url, 0
+        data = {"pagination": "cursor", **params}
+        while url:
+            resp = self.client.get(url, data)
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            body = resp.json()
+            self.assertNotIn("count", body)
+            ids.extend(item["id"] for item in body["results"])
+            url, data = body["next"], None
+            pages += 1
+        return ids, pages
+
+    def test_recorre_todas_las_paginas_en_orden_por_defecto(self):
+        ids, pages = self.recorrer({"limit": 10})
+        expected = list(
+            Task.objects.filter(user=self.user)
+            .order_by("-created_at", "-id")
+            .values_list("id", flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_respeta_ordering_updated_at_y_title(self):
+        for ordering in ("updated_at", "-updated_at", "title"):
+            ids, _ = self.recorrer({"limit": 7, "ordering": ordering})
+            expected = list(
+                Task.objects.filter(user=self.user)
+                .order_by(ordering, "-id" if ordering.startswith("-") else "id")
+                .values_list("id", flat=True)
+            )
+            self.assertEqual(ids, expected)
+
+    def test_empates_en_created_at_se_desempatan_por_id(self):
+        Task.objects.filter(user=self.user).update(created_at=timezone.now())
+        ids, _ = self.recorrer({"limit": 4})
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_estable_ante_inserciones_concurrentes(self):
+        first = self.client.get(
+            self.list_url, {"pagination": "cursor", "limit": 10}
+        ).json()
+        TaskFactory.create_batch(5, user=self.user)
+        second = self.client.get(first["next"]).json()
+        first_ids = {item["id"] for item in first["results"]}
+        second_ids = {item["id"] for item in second["results"]}
+        self.assertFalse(first_ids & second_ids)
+        self.assertEqual(len(second_ids), 10)
+
+    def test_previous_vuelve_a_la_pagina_anterior(self):
+        first = self.client.get(
+            self.list_url, {"pagination": "cursor", "limit": 10}
+        ).json()
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).json()
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual(back["results"], first["results"])
+
+    def test_cursor_invalido_404(self):
+        resp = self.client.get(
+            self.list_url, {"pagination": "cursor", "cursor": "no-es-un-cursor"}
+        )
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_de_otro_ordering_404(self):
+        first = self.client.get(
+            self.list_url, {"pagination": "cursor", "limit": 10}
+        ).json()
+        resp = self.client.get(first["next"] + "&ordering=title")
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_modo_invalido_400(self):
+        resp = self.client.get(self.list_url, {"pagination": "otro"})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_offset_sigue_siendo_el_default(self):
+        resp = self.client.get(self.list_url, {"limit": 5, "offset": 20})
+        body = resp.json()
+        self.assertEqual(body["count"], 25)
+        self.assertEqual(len(body["results"]), 5)
+
+    def test_filtro_keyset_usa_el_indice(self):
+        paginator = TaskCursorPagination()
+        paginator.ordering = ("-created_at", "-id")
+        now = timezone.now() - timedelta(days=1)
+        queryset = (
+            Task.objects.filter(user=self.user)
+            .order_by(*paginator.ordering)
+            .filter(paginator.keyset_filter([now.isoformat(), 10]))[:10]
+        )
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("task_user_created_idx (user_id=? AND created_at", plan)
@@ -0,0 +1,69 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task
+from ..serializers import TaskReadSerializer, TaskSerializer
+
+
+class TestTaskReadSerializerParidad(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        TaskFactory(user=self.user, description=None, completed=True)
+        TaskFactory(user=self.user, title="Acentos ñandú", description="")
+        TaskFactory.create_batch(5, user=self.user)
+        # Sin microsegundos y con microsegundos: isoformat cambia de forma.
+        Task.objects.filter(pk=Task.objects.first().pk).update(
+            created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+        )
+        self.queryset = Task.objects.filter(user=self.user)
+
+    def assertParidad(self):
+        expected = TaskSerializer(self.queryset, many=True).data
+        actual = TaskReadSerializer(
+            self.queryset.values(*TaskReadSerializer.fields), many=True
+        ).data
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            [list(item) for item in actual], [list(item) for item in expected]
+        )
+        return actual
+
+    def test_misma_salida_que_task_serializer(self):
+        self.assertParidad()
+
+    def test_detalle(self):
+        task = self.queryset.first()
+        row = self.queryset.values(*TaskReadSerializer.fields).get(pk=task.pk)
+        self.assertEqual(
+            TaskReadSerializer(row).data, TaskSerializer(task).data
+        )
+
+    def test_zona_horaria_activa(self):
+        with timezone.override("America/Argentina/Buenos_Aires"):
+            data = self.assertParidad()
+        self.assertTrue(data[0]["created_at"].endswith("-03:00"))
+
+    @override_settings(REST_FRAMEWORK={"DATETIME_FORMAT": "%d/%m/%Y %H:%M"})
+    def test_formato_no_iso(self):
+        self.assertParidad()
+
+    @override_settings(REST_FRAMEWORK={"DATETIME_FORMAT": None})
+    def test_sin_formato(self):
+        self.assertParidad()
+
+    def test_respuestas_de_la_api(self):
+        list_data = self.client.get(
+            reverse("task-list-create"), {"limit": 100}
+        ).json()["results"]
+        expected = TaskSerializer(self.queryset, many=True).data
+        self.assertEqual(list_data, [dict(item) for item in expected])
+
+        task = self.queryset.first()
+        detail = self.client.get(reverse("task-detail", args=[task.pk])).json()
+        self.assertEqual(detail, dict(TaskSerializer(task).data))
@@ -0,0 +1,101 @@
+from django.db import connection, connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task
+from ..replicas import ReplicaRouter, pin_cache, pin_key, read_from_replica
+
+REPLICA = "replica"
+
+
+@override_settings(DATABASE_READ_REPLICAS=[REPLICA], DATABASE_REPLICA_PIN_SECONDS=60)
+class TestReadReplicas(APITransactionTestCase):
+    """``replica`` es otra conexion a la base de test (por eso transaccional)."""
+    databases = {"default", REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.settings[REPLICA] = {**connection.settings_dict}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.task = TaskFactory(user=self.user, completed=False)
+        # Sin la marca de la escritura de arriba. La tabla del cache tampoco
+        # se vacia entre tests transaccionales.
+        pin_cache().clear()
+        self.list_url = reverse("task-list-create")
+        self.detail_url = reverse("task-detail", args=[self.task.pk])
+
+    def captured(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections[REPLICA]) as replica, \
+                CaptureQueriesContext(connection) as primary:
+            resp = getattr(self.client, method)(url, **kwargs)
+        return resp, len(replica.captured_queries), len(primary.captured_queries)
+
+    def test_lecturas_van_a_la_replica(self):
+        for url in (self.list_url, self.detail_url):
+            with CaptureQueriesContext(connection) as primary:
+                resp, on_replica, _ = self.captured("get", url)
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+            self.assertGreater(on_replica, 0)
+            # En el primario solo se consulta la marca (cache compartido).
+            self.assertEqual(
+                [q["sql"] for q in primary.captured_queries
+                 if "django_cache" not in q["sql"]],
+                [],
+            )
+
+    def test_marca_de_otro_proceso(self):
+        # Otro worker atendio la escritura: la marca esta en el cache compartido.
+        pin_cache().set(pin_key(self.user.id), True, 60)
+        _, on_replica, on_primary = self.captured("get", self.list_url)
+        self.assertEqual(on_replica, 0)
+        self.assertGreater(on_primary, 0)
+
+    def test_escrituras_al_primario_y_lee_sus_escrituras(self):
+        resp, on_replica, _ = self.captured(
+            "patch", reverse("task-toggle", args=[self.task.pk]), data={},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(on_replica, 0)
+        # Fijado al primario durante DATABASE_REPLICA_PIN_SECONDS.
+        resp, on_replica, on_primary = self.captured("get", self.detail_url)
+        self.assertTrue(resp.json()["completed"])
+        self.assertEqual(on_replica, 0)
+        self.assertGreater(on_primary, 0)
+
+        other = UserFactory()
+        self.client.force_authenticate(user=other)
+        _, on_replica, _ = self.captured("get", self.list_url)
+        self.assertGreater(on_replica, 0)
+
+    def test_router(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Task))
+        with read_from_replica(self.user.id):
+            self.assertEqual(router.db_for_read(Task), REPLICA)
+            self.assertIsNone(router.db_for_write(Task))
+            self.assertEqual(Task.objects.all().db, REPLICA)
+        self.assertFalse(router.allow_migrate(REPLICA, "tasks"))
+        self.assertIsNone(router.allow_migrate("default", "tasks"))
+
+    @override_settings(DATABASE_READ_REPLICAS=[])
+    def test_sin_replicas_todo_al_primario(self):
+        resp, on_replica, on_primary = self.captured("get", self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(on_replica, 0)
+        self.assertGreater(on_primary, 0)
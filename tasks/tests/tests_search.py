@@ -0,0 +1,78 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..search import FTS_TABLE, build_match_query
+
+
+class TestTaskSearch(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.en_titulo = TaskFactory(
+            user=self.user, title="Comprar leche", description="En el super"
+        )
+        self.en_descripcion = TaskFactory(
+            user=self.user, title="Mandados", description="comprar pan y leche"
+        )
+        self.sin_match = TaskFactory(
+            user=self.user, title="Pagar factura", description="Luz"
+        )
+        self.ajena = TaskFactory(
+            user=UserFactory(), title="Comprar leche", description="ajena"
+        )
+        self.list_url = reverse("task-list-create")
+
+    def buscar(self, term, **params):
+        resp = self.client.get(self.list_url, {"search": term, **params})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in resp.json()["results"]]
+
+    def test_ranking_prioriza_titulo_y_excluye_ajenas(self):
+        ids = self.buscar("leche")
+        self.assertEqual(ids, [self.en_titulo.id, self.en_descripcion.id])
+
+    def test_match_por_prefijo(self):
+        self.assertEqual(self.buscar("fact"), [self.sin_match.id])
+
+    def test_todos_los_terminos_son_requeridos(self):
+        self.assertEqual(self.buscar("comprar pan"), [self.en_descripcion.id])
+
+    def test_ignora_acentos(self):
+        TaskFactory(user=self.user, title="Revisión anual", description="")
+        self.assertEqual(len(self.buscar("revision")), 1)
+
+    def test_ordering_explicito_reemplaza_ranking(self):
+        ids = self.buscar("leche", ordering="title")
+        self.assertEqual(ids, [self.en_titulo.id, self.en_descripcion.id])
+        ids = self.buscar("leche", ordering="-title")
+        self.assertEqual(ids, [self.en_descripcion.id, self.en_titulo.id])
+
+    def test_sintaxis_fts_no_rompe(self):
+        for term in ['"', "leche*", "NOT", "a:b", "(leche"]:
+            resp = self.client.get(self.list_url, {"search": term})
+            self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_indice_sincronizado_con_update_y_delete(self):
+        self.sin_match.title = "Factura de gas"
+        self.sin_match.save()
+        self.assertEqual(self.buscar("gas"), [self.sin_match.id])
+        self.assertEqual(self.buscar("luz"), [self.sin_match.id])
+        self.sin_match.delete()
+        self.assertEqual(self.buscar("gas"), [])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(self.buscar("leche"), [])
+        call_command("rebuild_task_search_index", stdout=StringIO())
+        self.assertEqual(len(self.buscar("leche")), 2)
+
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query(["com", 'x"y']), '"com"* "x y"*')
+        self.assertEqual(build_match_query(['"']), "")
@@ -0,0 +1,208 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..importer import TaskImporter
+from ..models import Task, TaskCollection, TaskTombstone, UserShard
+from ..shards import forget, lookup, plan_rebalance, shard_for
+
+SHARD = "shard1"
+BLOCK = 2 ** 40
+
+
+@override_settings(
+    TASK_SHARDS=["default", SHARD], TASK_SHARD_ID_BLOCK=BLOCK,
+    TASK_SHARD_CACHE_SECONDS=60,
+)
+class TestTaskShards(APITransactionTestCase):
+    """``shard1`` es un archivo SQLite aparte, migrado para esta clase."""
+    databases = {"default", SHARD}
+
+    @classmethod
+    def setUpClass(cls):
+        path = os.path.join(tempfile.mkdtemp(), "shard1.sqlite3")
+        connections.settings[SHARD] = {**connection.settings_dict, "NAME": path}
+        super().setUpClass()
+        call_command("migrate", database=SHARD, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[SHARD].close()
+        del connections[SHARD]
+        del connections.settings[SHARD]
+
+    def user_on(self, alias):
+        while True:
+            user = UserFactory()
+            if shard_for(user.id) == alias:
+                return user
+
+    def setUp(self):
+        self.user = self.user_on(SHARD)
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("task-list-create")
+
+    def tasks_in(self, alias, user=None):
+        return Task.objects.using(alias).filter(user=user or self.user)
+
+    def test_usuarios_nuevos_se_reparten(self):
+        other = self.user_on("default")
+        self.assertEqual(UserShard.objects.get(user=self.user).alias, SHARD)
+        self.assertEqual(UserShard.objects.get(user=other).alias, "default")
+
+    def test_api_escribe_y_lee_en_el_shard_del_usuario(self):
+        resp = self.client.post(self.list_url, {"title": "Comprar leche"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        pk = resp.json()["id"]
+        self.assertGreaterEqual(pk, BLOCK)
+        self.assertTrue(self.tasks_in(SHARD).filter(pk=pk).exists())
+        self.assertFalse(self.tasks_in("default").exists())
+        self.client.post(reverse("task-bulk"), [{"title": "A"}, {"title": "B"}],
+                         format="json")
+        self.client.patch(reverse("task-toggle", args=[pk]), {}, format="json")
+
+        body = self.client.get(self.list_url, {"search": "leche"}).json()
+        self.assertEqual([item["id"] for item in body["results"]], [pk])
+        self.assertTrue(self.client.get(reverse("task-detail", args=[pk])).json()[
+            "completed"
+        ])
+        stats = self.client.get(reverse("task-stats")).json()
+        self.assertEqual((stats["total"], stats["completed"]), (3, 1))
+        self.assertEqual(
+            TaskCollection.objects.using(SHARD).get(user=self.user).task_count, 3
+        )
+
+        resp = self.client.delete(reverse("task-detail", args=[pk]))
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(
+            TaskTombstone.objects.using(SHARD).filter(task_id=pk).exists()
+        )
+
+    def test_listado_async(self):
+        TaskFactory.create_batch(2, user=self.user)
+        self.client.force_authenticate(user=None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        resp = self.client.get(reverse("task-async-list-create"))
+        self.assertEqual(resp.json()["count"], 2)
+
+    def test_mover_usuario_conserva_ids_y_resumenes(self):
+        tasks = TaskFactory.create_batch(3, user=self.user, completed=False)
+        self.client.delete(reverse("task-detail", args=[tasks[0].pk]))
+        self.client.patch(reverse("task-toggle", args=[tasks[1].pk]), {}, format="json")
+        before = self.client.get(self.list_url).json()
+        stats = self.client.get(reverse("task-stats")).json()
+
+        out = StringIO()
+        call_command(
+            "move_task_users", "--user", str(self.user.id), "--to", "default",
+            "--wait", "0", stdout=out,
+        )
+        self.assertIn(f"{SHARD} -> default", out.getvalue())
+        self.assertFalse(self.tasks_in(SHARD).exists())
+        self.assertEqual(
+            set(self.tasks_in("default").values_list("id", flat=True)),
+            {tasks[1].pk, tasks[2].pk},
+        )
+        self.assertTrue(TaskTombstone.objects.filter(task_id=tasks[0].pk).exists())
+        self.assertEqual(self.client.get(self.list_url).json(), before)
+        self.assertEqual(self.client.get(reverse("task-stats")).json(), stats)
+        body = self.client.get(self.list_url, {"search": tasks[2].title.split()[0]})
+        self.assertIn(tasks[2].pk, [item["id"] for item in body.json()["results"]])
+
+        # Las tareas nuevas usan el rango del shard nuevo.
+        pk = self.client.post(self.list_url, {"title": "N"}, format="json").json()["id"]
+        self.assertLess(pk, BLOCK)
+
+    def test_export_lee_del_shard_del_usuario(self):
+        TaskFactory.create_batch(3, user=self.user)
+        resp = self.client.get(reverse("task-export"))
+        # El cuerpo se genera despues de que la vista restauro el shard.
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_escrituras_durante_la_mudanza_503(self):
+        TaskFactory(user=self.user)
+        UserShard.objects.filter(user=self.user).update(moving=True)
+        forget(self.user.id)
+        resp = self.client.post(self.list_url, {"title": "X"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.json()["count"], 1)
+
+    def test_escritura_con_directorio_viejo_en_cache_503(self):
+        lookup(self.user.id)  # (SHARD, False) queda en cache
+        # move_user en otro proceso, despues de que empezo este request.
+        UserShard.objects.filter(user=self.user).update(moving=True)
+        resp = self.client.post(self.list_url, {"title": "X"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        UserShard.objects.filter(user=self.user).update(alias="default", moving=False)
+        resp = self.client.post(self.list_url, {"title": "X"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertFalse(self.tasks_in(SHARD).exists())
+
+    @override_settings(TASKS_IMPORT_BATCH_SIZE=1)
+    def test_importacion_se_corta_si_empieza_una_mudanza(self):
+        flush = TaskImporter.flush
+
+        def flush_then_move(importer, batch):
+            flush(importer, batch)
+            UserShard.objects.filter(user=self.user).update(moving=True)
+
+        body = "".join(f'{{"title": "T{n}"}}\n' for n in range(3))
+        with mock.patch.object(TaskImporter, "flush", flush_then_move):
+            resp = self.client.post(
+                reverse("task-import"), body, content_type="application/x-ndjson"
+            )
+        self.assertEqual(resp.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(self.tasks_in(SHARD).count(), 1)
+
+    def test_lookup_durante_la_mudanza_no_queda_en_cache(self):
+        UserShard.objects.filter(user=self.user).update(moving=True)
+        forget(self.user.id)
+        self.assertEqual(lookup(self.user.id), (SHARD, True))
+        # move_user en otro proceso: cambia el directorio sin tocar este cache.
+        UserShard.objects.filter(user=self.user).update(alias="default", moving=False)
+        self.assertEqual(lookup(self.user.id), ("default", False))
+
+    def test_resumen_y_rebalanceo(self):
+        TaskFactory.create_batch(4, user=self.user)
+        other = self.user_on(SHARD)
+        TaskFactory.create_batch(2, user=other)
+        out = StringIO()
+        call_command("move_task_users", stdout=out)
+        self.assertIn(f"{SHARD}: 2 usuarios, 6 tareas.", out.getvalue())
+        self.assertIn("default: 0 usuarios, 0 tareas.", out.getvalue())
+
+        out = StringIO()
+        call_command("move_task_users", "--rebalance", "--wait", "0", stdout=out)
+        self.assertEqual(shard_for(other.id), "default")
+        self.assertEqual(shard_for(self.user.id), SHARD)
+        self.assertIn("1 usuarios movidos.", out.getvalue())
+
+        call_command("rebuild_task_stats", stdout=out)
+        self.assertIn("2 usuarios recalculados.", out.getvalue())
+
+    def test_plan_rebalance(self):
+        self.assertEqual(
+            plan_rebalance({"a": {1: 10, 2: 6, 3: 1}, "b": {4: 1}}),
+            [(2, "a", "b"), (3, "a", "b")],
+        )
+        self.assertEqual(plan_rebalance({"a": {1: 10}, "b": {}}), [])
+
+    def test_borrar_usuario_borra_sus_tareas_del_shard(self):
+        TaskFactory.create_batch(2, user=self.user)
+        self.user.delete()
+        self.assertFalse(Task.objects.using(SHARD).exists())
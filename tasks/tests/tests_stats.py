@@ -0,0 +1,180 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task, TaskCollection, TaskDailyStats
+from ..stats import rebuild_stats
+
+
+def snapshot(user):
+    collection = TaskCollection.objects.filter(user=user).values_list(
+        "task_count", "completed_count"
+    ).first()
+    days = {
+        day: (created, completed)
+        for day, created, completed in TaskDailyStats.objects.filter(
+            user=user
+        ).values_list("day", "created_count", "completed_count")
+        if created or completed
+    }
+    return collection, days
+
+
+class TestTaskStats(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.list_url = reverse("task-list-create")
+        self.stats_url = reverse("task-stats")
+
+    def stats(self, **params):
+        resp = self.client.get(self.stats_url, params)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()
+
+    def assertIgualAReconstruir(self):
+        incremental = snapshot(self.user)
+        rebuild_stats(user_ids=[self.user.id])
+        self.assertEqual(incremental, snapshot(self.user))
+
+    def test_resumenes_se_mantienen_en_cada_escritura(self):
+        ids = [
+            self.client.post(self.list_url, {"title": f"T{i}"}, format="json").json()["id"]
+            for i in range(4)
+        ]
+        self.client.patch(reverse("task-toggle", args=[ids[0]]), {}, format="json")
+        self.client.patch(reverse("task-toggle", args=[ids[0]]), {}, format="json")
+        self.client.patch(reverse("task-toggle", args=[ids[0]]), {}, format="json")
+        self.client.patch(
+            reverse("task-detail", args=[ids[1]]), {"completed": True}, format="json"
+        )
+        self.client.delete(reverse("task-detail", args=[ids[2]]))
+        self.assertIgualAReconstruir()
+
+        bulk_url = reverse("task-bulk")
+        created = self.client.post(bulk_url, [
+            {"title": "A", "completed": True}, {"title": "B"},
+        ], format="json").json()["results"]
+        self.client.patch(bulk_url, [
+            {"id": created[1]["id"], "completed": True},
+            {"id": ids[1], "completed": False},
+        ], format="json")
+        self.client.patch(
+            reverse("task-bulk-toggle"), {"ids": [ids[0], ids[3]]}, format="json"
+        )
+        self.client.patch(
+            reverse("task-bulk-toggle"),
+            {"ids": [ids[0], created[0]["id"]], "completed": True}, format="json",
+        )
+        self.client.delete(bulk_url, {"ids": [created[1]["id"]]}, format="json")
+        self.client.post(
+            reverse("task-import"), b'{"title": "I", "completed": true}\n',
+            content_type="application/x-ndjson",
+        )
+        self.assertIgualAReconstruir()
+
+        body = self.stats(days=1)
+        self.assertEqual(body["total"], Task.objects.filter(user=self.user).count())
+        self.assertEqual(
+            body["completed"],
+            Task.objects.filter(user=self.user, completed=True).count(),
+        )
+        self.assertEqual(body["created_per_day"][0]["count"], body["total"])
+        self.assertEqual(body["completed_per_day"][0]["count"], body["completed"])
+
+    def test_completed_at_solo_al_pasar_a_completada(self):
+        task_id = self.client.post(
+            self.list_url, {"title": "T"}, format="json"
+        ).json()["id"]
+        self.assertIsNone(Task.objects.get(pk=task_id).completed_at)
+        self.client.patch(reverse("task-toggle", args=[task_id]), {}, format="json")
+        completed_at = Task.objects.get(pk=task_id).completed_at
+        self.assertIsNotNone(completed_at)
+        self.client.patch(
+            reverse("task-detail", args=[task_id]), {"title": "Otro"}, format="json"
+        )
+        self.assertEqual(Task.objects.get(pk=task_id).completed_at, completed_at)
+
+    def test_histograma_denso_por_dia(self):
+        today = timezone.localdate()
+        TaskFactory.create_batch(2, user=self.user, completed=False)
+        old = TaskFactory(user=self.user, completed=True)
+        Task.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=3),
+            completed_at=timezone.now() - timedelta(days=1),
+        )
+        call_command("rebuild_task_stats", stdout=StringIO())
+
+        body = self.stats(days=5)
+        self.assertEqual(
+            (body["total"], body["completed"], body["pending"]), (3, 1, 2)
+        )
+        self.assertEqual(
+            [item["date"] for item in body["created_per_day"]],
+            [(today - timedelta(days=offset)).isoformat() for offset in range(4, -1, -1)],
+        )
+        self.assertEqual(
+            [item["count"] for item in body["created_per_day"]], [0, 1, 0, 0, 2]
+        )
+        self.assertEqual(
+            [item["count"] for item in body["completed_per_day"]], [0, 0, 0, 1, 0]
+        )
+
+    def test_lectura_no_consulta_las_tareas(self):
+        TaskFactory.create_batch(3, user=self.user)
+        self.stats()
+        with CaptureQueriesContext(connection) as ctx:
+            self.stats(days=366)
+        sql = [query["sql"] for query in ctx.captured_queries]
+        self.assertFalse([query for query in sql if '"tasks_task"' in query])
+        self.assertLessEqual(len(sql), 3)
+
+    def test_usuario_sin_resumenes_se_inicializa(self):
+        TaskFactory.create_batch(2, user=self.user, completed=True)
+        TaskCollection.objects.filter(user=self.user).delete()
+        TaskDailyStats.objects.filter(user=self.user).delete()
+        body = self.stats(days=1)
+        self.assertEqual((body["total"], body["completed"]), (2, 2))
+        self.assertEqual(body["completed_per_day"][0]["count"], 2)
+
+    def test_rebuild_command_corrige_desvios(self):
+        TaskFactory.create_batch(3, user=self.user)
+        rebuild_stats()
+        expected = snapshot(self.user)
+        TaskCollection.objects.filter(user=self.user).update(task_count=99)
+        TaskDailyStats.objects.filter(user=self.user).update(created_count=7)
+        out = StringIO()
+        call_command("rebuild_task_stats", "--user", str(self.user.id), stdout=out)
+        self.assertIn("1 usuarios", out.getvalue())
+        self.assertEqual(snapshot(self.user), expected)
+
+    def test_rebuild_invalida_etag_y_cache_del_listado(self):
+        TaskFactory.create_batch(3, user=self.user)
+        rebuild_stats()
+        TaskCollection.objects.filter(user=self.user).update(task_count=99)
+        first = self.client.get(self.list_url, {"pagination": "cached"})
+        self.assertEqual(first.json()["count"], 99)
+        call_command("rebuild_task_stats", "--user", str(self.user.id), stdout=StringIO())
+        resp = self.client.get(
+            self.list_url, {"pagination": "cached"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()["count"], 3)
+
+    def test_days_invalido_400(self):
+        for days in ("0", "367", "abc"):
+            resp = self.client.get(self.stats_url, {"days": days})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requiere_autenticacion(self):
+        self.client.force_authenticate(user=None)
+        resp = self.client.get(self.stats_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
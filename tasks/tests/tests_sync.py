@@ -0,0 +1,100 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.factories import UserFactory
+from ..factories import TaskFactory
+from ..models import Task, TaskTombstone
+from ..sync import encode_cursor
+
+
+@override_settings(TASKS_SYNC_GRACE_SECONDS=0)
+class TestTaskChanges(APITestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.client.force_authenticate(user=self.user)
+        self.tasks = TaskFactory.create_batch(3, user=self.user, completed=False)
+        self.url = reverse("task-changes")
+        self.since = encode_cursor(timezone.now())
+
+    def cambios(self, cursor):
+        resp = self.client.get(self.url, {"cursor": cursor})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        return resp.json()
+
+    def test_sin_cursor_devuelve_punto_de_partida(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        body = resp.json()
+        self.assertEqual((body["tasks"], body["deleted"]), ([], []))
+        self.assertTrue(body["cursor"])
+
+    def test_sin_cambios(self):
+        body = self.cambios(self.since)
+        self.assertEqual((body["tasks"], body["deleted"]), ([], []))
+
+    def test_altas_modificaciones_y_bajas(self):
+        nueva = self.client.post(
+            reverse("task-list-create"), {"title": "Nueva"}, format="json"
+        ).json()
+        self.client.patch(
+            reverse("task-toggle", args=[self.tasks[0].id]), {}, format="json"
+        )
+        self.client.delete(reverse("task-detail", args=[self.tasks[1].id]))
+        self.client.delete(
+            reverse("task-bulk"), {"ids": [self.tasks[2].id]}, format="json"
+        )
+
+        body = self.cambios(self.since)
+        self.assertEqual(
+            [item["id"] for item in body["tasks"]], [nueva["id"], self.tasks[0].id]
+        )
+        self.assertTrue(body["tasks"][1]["completed"])
+        self.assertEqual(body["deleted"], [self.tasks[1].id, self.tasks[2].id])
+
+        body = self.cambios(body["cursor"])
+        self.assertEqual((body["tasks"], body["deleted"]), ([], []))
+
+    def test_aislado_por_usuario(self):
+        otra = TaskFactory(user=UserFactory())
+        TaskTombstone.record(otra.user_id, [otra.id])
+        body = self.cambios(self.since)
+        self.assertEqual((body["tasks"], body["deleted"]), ([], []))
+
+    @override_settings(TASKS_SYNC_GRACE_SECONDS=60)
+    def test_ventana_de_gracia_reenvia_escrituras_recientes(self):
+        body = self.cambios(self.since)
+        self.assertEqual(len(body["tasks"]), 3)
+
+    def test_cursor_vencido_410(self):
+        viejo = encode_cursor(timezone.now() - timedelta(days=31))
+        resp = self.client.get(self.url, {"cursor": viejo})
+        self.assertEqual(resp.status_code, status.HTTP_410_GONE)
+
+    @override_settings(TASKS_SYNC_MAX_CHANGES=2)
+    def test_demasiados_cambios_410(self):
+        Task.objects.filter(user=self.user).update(updated_at=timezone.now())
+        resp = self.client.get(self.url, {"cursor": self.since})
+        self.assertEqual(resp.status_code, status.HTTP_410_GONE)
+
+    def test_cursor_invalido_400(self):
+        for cursor in ["no-es-un-cursor", encode_cursor(timezone.now())[:-4]]:
+            resp = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_compactacion(self):
+        TaskTombstone.record(self.user.id, [100, 101])
+        TaskTombstone.objects.filter(task_id=100).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+        out = StringIO()
+        call_command("compact_task_tombstones", stdout=out)
+        self.assertIn("1 marcas", out.getvalue())
+        self.assertEqual(
+            list(TaskTombstone.objects.values_list("task_id", flat=True)), [101]
+        )
@@ -1,8 +1,35 @@
 from django.urls import path
-from .views import TaskListCreateView, TaskDetailView, TaskToggleView
+from .async_views import (
+    AsyncTaskListCreateView,
+    AsyncTaskDetailView,
+    AsyncTaskToggleView,
+)
+from .views import (
+    TaskListCreateView,
+    TaskDetailView,
+    TaskToggleView,
+    TaskBulkView,
+    TaskBulkToggleView,
+    TaskExportView,
+    TaskImportView,
+    TaskChangesView,
+    TaskStatsView,
+)
 
 urlpatterns = [
     path("", TaskListCreateView.as_view(), name="task-list-create"),
     path("<int:pk>/", TaskDetailView.as_view(), name="task-detail"),
     path("<int:pk>/toggle/", TaskToggleView.as_view(), name="task-toggle"),
+    path("bulk/", TaskBulkView.as_view(), name="task-bulk"),
+    path("bulk/toggle/", TaskBulkToggleView.as_view(), name="task-bulk-toggle"),
+    path("export/", TaskExportView.as_view(), name="task-export"),
+    path("import/", TaskImportView.as_view(), name="task-import"),
+    path("changes/", TaskChangesView.as_view(), name="task-changes"),
+    path("stats/", TaskStatsView.as_view(), name="task-stats"),
+    path("async/", AsyncTaskListCreateView.as_view(), name="task-async-list-create"),
+    path("async/<int:pk>/", AsyncTaskDetailView.as_view(), name="task-async-detail"),
+    path(
+        "async/<int:pk>/toggle/", AsyncTaskToggleView.as_view(),
+        name="task-async-toggle",
+    ),
 ]
@@ -0,0 +1,113 @@
+"""
+Versionado de las tareas para GET condicionales (ETag / Last-Modified).
+
+- Listado: una version por usuario (``TaskCollection``), incrementada por
+  cada escritura via la señal ``tasks_changed`` (tasks.stats). Comprobarla
+  es una consulta por clave primaria.
+- Detalle: la propia tarea (``id`` + ``version``). El mismo ETag sirve
+  para ``If-Match`` en las escrituras (concurrencia optimista, 412).
+"""
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Task, TaskCollection
+
+
+def get_collection_state(request):
+    """
+    (version, modified_at, task_count, completed_count) del usuario,
+    memorizado por request: el ETag y el paginador comparten la consulta.
+    """
+    request = getattr(request, "_request", request)  # Request de DRF
+    if not hasattr(request, "_task_collection_state"):
+        request._task_collection_state = (
+            TaskCollection.objects.filter(user_id=request.user.id)
+            .values_list("version", "modified_at", "task_count", "completed_count")
+            .first()
+        ) or (0, None, None, None)
+    return request._task_collection_state
+
+
+def collection_etag(request, *args, **kwargs):
+    version = get_collection_state(request)[0]
+    # La representacion depende de la URL completa (filtros, paginacion,
+    # links absolutos), no solo de la version.
+    url = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()[:16]
+    return f"{request.user.id}.{version}.{url}"
+
+
+def collection_last_modified(request, *args, **kwargs):
+    return get_collection_state(request)[1]
+
+
+def get_task_state(request, pk):
+    """(version, updated_at) de la tarea, memorizado por request."""
+    request = getattr(request, "_request", request)  # Request de DRF
+    if not hasattr(request, "_task_state"):
+        request._task_state = (
+            Task.objects.filter(pk=pk, user_id=request.user.id)
+            .values_list("version", "updated_at")
+            .first()
+        ) or (None, None)
+    return request._task_state
+
+
+def build_task_etag(pk, version):
+    return f"{pk}.{version}"
+
+
+def task_etag(request, pk, *args, **kwargs):
+    version, _ = get_task_state(request, pk)
+    if version is None:
+        return None
+    return build_task_etag(pk, version)
+
+
+def task_last_modified(request, pk, *args, **kwargs):
+    return get_task_state(request, pk)[1]
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "La tarea fue modificada por otro cliente."
+    default_code = "precondition_failed"
+
+
+class TaskConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "La tarea cambio mientras se actualizaba. Reintentar."
+    default_code = "conflict"
+
+
+def if_match_versions(request, pk):
+    """
+    Versiones aceptadas por el ``If-Match`` del request para la tarea
+    ``pk``: None si no hay precondicion (header ausente o ``*``).
+    """
+    header = request.headers.get("If-Match")
+    if header is None:
+        return None
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+    prefix = f'"{pk}.'
+    versions = set()
+    for etag in etags:
+        # Comparacion fuerte: los ETags debiles (W/"...") nunca coinciden.
+        if etag.startswith(prefix) and etag[len(prefix):-1].isdigit():
+            versions.add(int(etag[len(prefix):-1]))
+    return versions
+
+
+def check_if_match(request, task):
+    versions = if_match_versions(request, task.pk)
+    if versions is not None and task.version not in versions:
+        raise PreconditionFailed
+
+
+def set_task_etag(response, task):
+    response["ETag"] = quote_etag(build_task_etag(task.pk, task.version))
+    return response
@@ -1,3 +1,5 @@
+import codecs
+
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework.generics import (
@@ -6,67 +8,611 @@ from rest_framework.generics import (
     UpdateAPIView,
     GenericAPIView
 )
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework import status
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework import serializers, status
+from rest_framework.exceptions import NotFound, UnsupportedMediaType, ValidationError
+from rest_framework.fields import empty
+from rest_framework.filters import OrderingFilter
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_header_parameters
+from django.views.decorators.http import condition
 
-from .models import Task
-from .serializers import TaskSerializer
-from .filters import TaskFilter
+from .cache import cached_response
+from .export import FORMATS as EXPORT_FORMATS
+from .importer import PARSERS as IMPORT_PARSERS, TaskImporter, decode_lines
+from .models import ArchivedTask, Task, TaskTombstone
+from .serializers import TaskSerializer, TaskIdsSerializer, TaskReadSerializer
+from .filters import TaskFilter, TaskFilterBackend, TaskSearchFilter
+from .pagination import TaskPagination
 from .permissions import IsOwner
+from .replicas import replica_read
+from .shards import activate_shard, atomic, lookup, task_db, use_shard
+from .signals import reported_by_views, tasks_changed
+from .stats import TaskState, get_stats, task_state
+from .sync import InvalidCursor, ResyncRequired, get_changes
+from .versions import (
+    PreconditionFailed,
+    TaskConflict,
+    check_if_match,
+    collection_etag,
+    collection_last_modified,
+    get_collection_state,
+    get_task_state,
+    if_match_versions,
+    set_task_etag,
+    task_etag,
+    task_last_modified,
+)
 
 
 class TaskBaseView(GenericAPIView):
     """
-    Base view para definir queryset de view por usuario
+    Base view para definir queryset de view por usuario. Al autenticar activa
+    el shard del usuario (tasks.shards): las consultas de tareas y las
+    transacciones (``atomic()``) van a esa base.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        # initial() activa el shard; al terminar el request se restaura.
+        with use_shard(None), reported_by_views():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        activate_shard(
+            lookup(request.user.id), write=request.method not in SAFE_METHODS,
+            user_id=request.user.id,
+        )
+
+    def get_queryset(self):
+        # request.user puede ser un TokenUser (sin fila de User): se usa el id.
+        # ShardRouter resuelve la base: el shard activado en initial().
+        return Task.objects.filter(user_id=self.request.user.id)
+
+    def notify_change(self, before=(), after=()):
+        """
+        Avisa que cambiaron las tareas del usuario (versiones, caches,
+        estadisticas). ``before`` y ``after`` son las tareas afectadas antes
+        y despues de la escritura (ver ``tasks_changed``).
+        """
+        tasks_changed.send(
+            sender=Task, user_id=self.request.user.id,
+            before=before, after=after,
+        )
+
+
+class TaskReadMixin:
+    """
+    Las lecturas (GET/HEAD) consultan ``values()`` y serializan con
+    TaskReadSerializer; el resto de los metodos usa modelos y
+    ``serializer_class``.
+
+    ``?fields=a,b`` / ``?exclude=a,b`` recortan la respuesta y tambien las
+    columnas leidas de la base. Campos desconocidos responden 400.
     """
+    read_serializer_class = TaskReadSerializer
+    # Columnas que se leen aunque no se pidan: el paginador keyset necesita
+    # ``id`` y el campo de orden de cada fila.
+    read_extra_fields = ["id", "created_at"]
+    fields_query_param = "fields"
+    exclude_query_param = "exclude"
+
+    def is_read(self):
+        return self.request.method in ("GET", "HEAD")
+
+    def parse_field_list(self, param):
+        value = self.request.query_params.get(param)
+        if value is None:
+            return None
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if name not in TaskReadSerializer.fields]
+        if unknown:
+            raise ValidationError({param: [
+                f"Campos desconocidos: {', '.join(unknown)}. "
+                f"Opciones: {', '.join(TaskReadSerializer.fields)}."
+            ]})
+        return names
+
+    def get_read_fields(self):
+        """Campos de la respuesta segun ``fields`` / ``exclude``."""
+        if hasattr(self, "_read_fields"):
+            return self._read_fields
+        only = self.parse_field_list(self.fields_query_param)
+        exclude = self.parse_field_list(self.exclude_query_param)
+        if only is not None and exclude is not None:
+            raise ValidationError({self.fields_query_param: [
+                f"No se puede combinar con {self.exclude_query_param}."
+            ]})
+        fields = list(TaskReadSerializer.fields)
+        if only is not None:
+            fields = [name for name in fields if name in only]
+        elif exclude is not None:
+            fields = [name for name in fields if name not in exclude]
+        if not fields:
+            raise ValidationError({self.fields_query_param: [
+                "Se debe incluir al menos un campo."
+            ]})
+        self._read_fields = fields
+        return fields
+
+    def get_query_fields(self):
+        """Campos de la respuesta mas los extra y los de ``ordering``."""
+        ordering = [
+            name.strip().lstrip("-")
+            for name in self.request.query_params.get("ordering", "").split(",")
+        ]
+        extra = self.read_extra_fields + [
+            name for name in ordering if name in TaskReadSerializer.fields
+        ]
+        return list(dict.fromkeys(self.get_read_fields() + extra))
+
     def get_queryset(self):
-        return Task.objects.filter(user=self.request.user)
+        queryset = super().get_queryset()
+        if self.is_read():
+            return queryset.values(*self.get_query_fields())
+        return queryset
+
+    def get_serializer_class(self):
+        if self.is_read():
+            return self.read_serializer_class
+        return super().get_serializer_class()
 
+    def get_serializer(self, *args, **kwargs):
+        if self.is_read():
+            kwargs.setdefault("fields", self.get_read_fields())
+        return super().get_serializer(*args, **kwargs)
 
-class TaskListCreateView(TaskBaseView, ListCreateAPIView):
+
+class TaskListCreateView(TaskReadMixin, TaskBaseView, ListCreateAPIView):
     """
     List y Create view unificadas
-    GET: Lista todas las tareas del usuario.
+    GET: Lista todas las tareas del usuario. ``?pagination=cursor`` usa
+    paginacion keyset en lugar de limit/offset. ``?include_archived=true``
+    suma las tareas archivadas (UNION con ArchivedTask). Soporta
+    If-None-Match / If-Modified-Since (304) contra la version de las tareas
+    del usuario.
     POST: Crea una nueva task
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    pagination_class = TaskPagination
+    filter_backends = [TaskFilterBackend, TaskSearchFilter, OrderingFilter]
     filterset_class = TaskFilter
     search_fields = ["title", "description"]
     ordering_fields = ["created_at", "updated_at", "title"]
+    include_archived_query_param = "include_archived"
+
+    @property
+    def reads_archive(self):
+        if not hasattr(self, "_reads_archive"):
+            self._reads_archive = self.is_read() and self.parse_include_archived()
+        return self._reads_archive
+
+    def parse_include_archived(self):
+        param = self.include_archived_query_param
+        value = self.request.query_params.get(param, "false").lower()
+        if value not in ("true", "1", "false", "0"):
+            raise ValidationError({param: ["Debe ser true o false."]})
+        return value in ("true", "1")
+
+    def filter_queryset(self, queryset):
+        if not self.reads_archive:
+            return super().filter_queryset(queryset)
+        archived = ArchivedTask.objects.filter(
+            user_id=self.request.user.id
+        ).values(*self.get_query_fields())
+        tasks = super().filter_queryset(queryset)
+        archived = super().filter_queryset(archived)
+        ordering = tasks.query.order_by or Task._meta.ordering
+        # Las partes del UNION van sin ORDER BY: el orden se aplica al total.
+        return tasks.order_by().union(archived.order_by(), all=True).order_by(
+            *ordering
+        )
+
+    @replica_read
+    @method_decorator(condition(
+        etag_func=collection_etag, last_modified_func=collection_last_modified
+    ))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
 
+    def list(self, request, *args, **kwargs):
+        return cached_response(
+            request, "list", get_collection_state(request)[0],
+            lambda: super(TaskListCreateView, self).list(request, *args, **kwargs),
+        )
+
+    @atomic()
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        task = serializer.save(user_id=self.request.user.id)
+        self.notify_change(after=[task])
 
 
-class TaskDetailView(TaskBaseView, RetrieveUpdateDestroyAPIView):
+class TaskDetailView(TaskReadMixin, TaskBaseView, RetrieveUpdateDestroyAPIView):
     """
-    Detail view con principio RESTful
+    Detail view con principio RESTful. GET soporta ETag / Last-Modified.
+    PUT/PATCH aceptan ``If-Match`` con el ETag: si la tarea cambio responden
+    412. Sin ``If-Match``, una escritura concurrente entre la lectura y el
+    guardado responde 409 en lugar de pisar cambios.
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
+    read_extra_fields = ["id", "user_id"]  # user_id para IsOwner
+
+    @replica_read
+    @method_decorator(condition(
+        etag_func=task_etag, last_modified_func=task_last_modified
+    ))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(
+            request, "detail", get_task_state(request, kwargs["pk"])[0],
+            lambda: super(TaskDetailView, self).retrieve(request, *args, **kwargs),
+        )
+
+    def get_object(self):
+        task = super().get_object()
+        if self.request.method in ("PUT", "PATCH"):
+            check_if_match(self.request, task)
+        return task
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        return set_task_etag(response, self.updated_task)
+
+    @atomic()
+    def perform_update(self, serializer):
+        task = serializer.instance
+        # Reserva la version leida: si otro cliente escribio en el medio no
+        # se actualiza ninguna fila.
+        claimed = Task.objects.filter(pk=task.pk, version=task.version).update(
+            version=F("version") + 1
+        )
+        if not claimed:
+            if if_match_versions(self.request, task.pk) is not None:
+                raise PreconditionFailed
+            raise TaskConflict
+        task.version += 1
+        before = task_state(task)
+        self.updated_task = serializer.save()
+        self.notify_change(before=[before], after=[self.updated_task])
+
+    @atomic()
+    def perform_destroy(self, instance):
+        TaskTombstone.record(instance.user_id, [instance.pk])
+        instance.delete()
+        self.notify_change(before=[instance])
 
 
 class TaskToggleView(TaskBaseView, UpdateAPIView):
     """
-    Actualiza el estado de la tarea especificamente
+    Actualiza el estado de la tarea especificamente, con un solo
+    ``UPDATE ... RETURNING`` (sin lectura previa). Acepta ``If-Match``.
     """
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsOwner]
 
-    @transaction.atomic
-    def patch(self, request, *args, **kwargs):
-        task = self.get_object()
+    def patch(self, request, pk, *args, **kwargs):
+        task = self.toggle_task(request, pk)
+        response = Response(
+            self.get_serializer(task).data,
+            status=status.HTTP_200_OK
+        )
+        return set_task_etag(response, task)
+
+    @atomic()
+    def toggle_task(self, request, pk):
+        """Aplica el toggle pedido y devuelve la tarea resultante."""
+        completed = None
         if "completed" in request.data:
-            task.completed = bool(request.data["completed"])
+            completed = bool(request.data["completed"])
+        versions = if_match_versions(request, pk)
+        task = Task.toggle(pk, request.user.id, completed, versions)
+        if task is None:
+            task = self.get_queryset().filter(pk=pk).first()
+            if task is None:
+                raise NotFound
+            if versions is not None and task.version not in versions:
+                raise PreconditionFailed
+            # Ya tenia el estado pedido: no hay cambios.
         else:
-            task.completed = not task.completed
-        task.save(update_fields=["completed"])
+            # completed_at solo cambia al pasar a completada.
+            before = TaskState(
+                task.created_at, not task.completed, task.completed_at
+            )
+            self.notify_change(before=[before], after=[task])
+        return task
+
+
+class TaskBulkBaseView(TaskBaseView):
+    """
+    Base de las operaciones masivas. Son todo o nada: si algun elemento es
+    invalido no se escribe nada y ``errors`` mapea la posicion de cada
+    elemento invalido en el request a sus errores (mismo formato que
+    ListSerializer).
+    """
+    serializer_class = TaskSerializer
+    permission_classes = [IsAuthenticated]
+    missing_error = "No existe la tarea."
+
+    def errors_response(self, errors):
+        if errors and all(isinstance(key, int) for key in errors):
+            errors = {"errors": errors}
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def missing_errors(self, ids, found):
+        return {
+            index: {"id": [self.missing_error]}
+            for index, pk in enumerate(ids)
+            if pk not in found
+        }
+
+    def get_ids(self, request):
+        serializer = TaskIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+
+class TaskBulkView(TaskBulkBaseView):
+    """
+    POST: crea ``[{...}, ...]`` con un solo bulk_create.
+    PATCH: actualiza parcialmente ``[{"id": 1, ...}, ...]`` con un bulk_update.
+    DELETE: elimina ``{"ids": [...]}`` con un solo DELETE.
+    """
+    def post(self, request):
+        serializer = self.get_serializer(
+            data=request.data, many=True, max_length=settings.TASKS_BULK_MAX_ITEMS
+        )
+        if not serializer.is_valid():
+            return self.errors_response(serializer.errors)
+        with atomic():
+            tasks = serializer.save(user_id=self.request.user.id)
+            self.notify_change(after=tasks)
         return Response(
-            self.get_serializer(task).data,
+            {"results": self.get_serializer(tasks, many=True).data},
+            status=status.HTTP_201_CREATED
+        )
+
+    id_field = serializers.IntegerField(min_value=1)
+
+    def clean_ids(self, items):
+        """Id validado de cada elemento (None si falta o es invalido) y errores."""
+        ids, errors = [], {}
+        for index, item in enumerate(items):
+            pk = None
+            if not isinstance(item, dict):
+                errors[index] = {"non_field_errors": ["Se esperaba un objeto."]}
+            else:
+                try:
+                    pk = self.id_field.run_validation(item.get("id", empty))
+                except ValidationError as exc:
+                    errors[index] = {"id": exc.detail}
+            ids.append(pk)
+        return ids, errors
+
+    def patch(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return self.errors_response(
+                {"non_field_errors": ["Se esperaba una lista de tareas."]}
+            )
+        if len(items) > settings.TASKS_BULK_MAX_ITEMS:
+            return self.errors_response({"non_field_errors": [
+                f"Maximo {settings.TASKS_BULK_MAX_ITEMS} tareas por operacion."
+            ]})
+
+        ids, id_errors = self.clean_ids(items)
+        with atomic():
+            tasks = self.get_queryset().in_bulk(
+                [pk for pk in ids if pk is not None]
+            )
+            # Un id invalido se reporta con su error, no como inexistente.
+            errors = {**self.missing_errors(ids, tasks), **id_errors}
+            for index, pk in enumerate(ids):
+                if pk in tasks and ids.index(pk) != index:
+                    errors[index] = {"id": ["Tarea repetida."]}
+            if errors:
+                return self.errors_response(errors)
+
+            serializer = self.get_serializer(
+                [tasks[pk] for pk in ids], data=items, many=True, partial=True
+            )
+            if not serializer.is_valid():
+                return self.errors_response(serializer.errors)
+            before = [task_state(task) for task in tasks.values()]
+            serializer.save()
+            self.notify_change(before=before, after=tasks.values())
+        return Response({"results": serializer.data}, status=status.HTTP_200_OK)
+
+    def delete(self, request):
+        ids = self.get_ids(request)["ids"]
+        with atomic():
+            queryset = self.get_queryset().filter(id__in=ids)
+            found = {
+                row["id"]: row for row in queryset.values(
+                    "id", "created_at", "completed", "completed_at"
+                )
+            }
+            if len(found) != len(ids):
+                return self.errors_response(self.missing_errors(ids, found))
+            TaskTombstone.record(request.user.id, ids)
+            queryset.delete()
+            self.notify_change(before=found.values())
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class TaskBulkToggleView(TaskBulkBaseView):
+    """
+    PATCH ``{"ids": [...]}`` invierte el estado de cada tarea;
+    con ``"completed": true|false`` lo fija para todas. Un solo UPDATE.
+    """
+    def patch(self, request):
+        data = self.get_ids(request)
+        ids = data["ids"]
+        now = timezone.now()
+        if "completed" in data:
+            completed = Value(data["completed"])
+        else:
+            completed = Case(
+                When(completed=True, then=Value(False)),
+                default=Value(True),
+            )
+        completed_at = F("completed_at")
+        if data.get("completed", True):
+            completed_at = Case(
+                When(completed=False, then=Value(now)), default=completed_at
+            )
+        queryset = self.get_queryset().filter(id__in=ids)
+        with atomic():
+            before = [
+                TaskState(**row) for row in queryset.values(
+                    "created_at", "completed", "completed_at"
+                )
+            ]
+            updated = queryset.update(
+                completed=completed,
+                completed_at=completed_at,
+                updated_at=now,
+                version=F("version") + 1,
+            )
+            if updated != len(ids):
+                found = set(queryset.values_list("id", flat=True))
+                transaction.set_rollback(True, using=task_db())
+                return self.errors_response(self.missing_errors(ids, found))
+            after = []
+            for state in before:
+                value = data.get("completed", not state.completed)
+                after.append(state._replace(
+                    completed=value,
+                    completed_at=now if value and not state.completed
+                    else state.completed_at,
+                ))
+            self.notify_change(before=before, after=after)
+        return Response(
+            {"results": self.get_serializer(queryset, many=True).data},
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+
+class TaskExportView(TaskBaseView):
+    """
+    GET: exporta todas las tareas del usuario en streaming.
+    ``?output=ndjson`` (default) o ``?output=csv``; acepta los filtros de
+    TaskFilter y ``ordering`` igual que el listado.
+    """
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_class = TaskFilter
+    ordering_fields = ["created_at", "updated_at", "title"]
+    output_query_param = "output"
+
+    def get(self, request):
+        output = request.query_params.get(self.output_query_param, "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({self.output_query_param: [
+                f"Formato invalido. Opciones: {', '.join(EXPORT_FORMATS)}."
+            ]})
+        content_type, lines = EXPORT_FORMATS[output]
+        # Se recorre al enviar el cuerpo, con el shard ya restaurado: se fija
+        # la base ahora.
+        queryset = self.filter_queryset(self.get_queryset()).using(task_db())
+        response = StreamingHttpResponse(
+            lines(queryset, settings.TASKS_EXPORT_CHUNK_SIZE),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="tasks.{output}"'
+        return response
+
+
+class TaskImportView(TaskBaseView):
+    """
+    POST: importa tareas desde el cuerpo del request, NDJSON
+    (``application/x-ndjson``) o CSV con encabezado (``text/csv``).
+    Lee el cuerpo en streaming, valida cada fila como TaskSerializer e
+    inserta en lotes de ``TASKS_IMPORT_BATCH_SIZE``, cada uno en su
+    transaccion. Responde ``accepted``, ``rejected`` y ``errors`` por numero
+    de linea (los primeros ``TASKS_IMPORT_MAX_ERRORS``).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        media_type, params = parse_header_parameters(request.content_type or "")
+        parse = IMPORT_PARSERS.get(media_type)
+        if parse is None:
+            raise UnsupportedMediaType(request.content_type)
+        importer = TaskImporter(
+            request.user.id,
+            batch_size=settings.TASKS_IMPORT_BATCH_SIZE,
+            max_errors=settings.TASKS_IMPORT_MAX_ERRORS,
+            on_batch=self.notify_change,
+            context=self.get_serializer_context(),
+        )
+        encoding = params.get("charset", settings.DEFAULT_CHARSET)
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise UnsupportedMediaType(request.content_type)
+        lines = decode_lines(request.stream, encoding)
+        return Response(importer.run(parse(lines)), status=status.HTTP_200_OK)
+
+
+class TaskChangesView(TaskBaseView):
+    """
+    GET ``?cursor=<cursor>``: tareas creadas o modificadas (``tasks``) e ids
+    eliminados (``deleted``) desde el cursor, mas el ``cursor`` para la
+    proxima llamada. Sin cursor devuelve solo el punto de partida.
+    Responde 410 si el cursor es mas viejo que la retencion de bajas o hay
+    demasiados cambios: el cliente debe volver a descargar todo.
+    """
+    permission_classes = [IsAuthenticated]
+    cursor_query_param = "cursor"
+
+    def get(self, request):
+        try:
+            changes = get_changes(
+                request.user.id, request.query_params.get(self.cursor_query_param)
+            )
+        except InvalidCursor:
+            raise ValidationError({self.cursor_query_param: ["Cursor invalido."]})
+        except ResyncRequired:
+            return Response(
+                {"detail": "El cursor expiro. Se requiere una sincronizacion completa."},
+                status=status.HTTP_410_GONE,
+            )
+        return Response(changes, status=status.HTTP_200_OK)
+
+
+class TaskStatsView(TaskBaseView):
+    """
+    GET ``?days=N``: total, completadas y pendientes del usuario, mas las
+    tareas creadas y completadas por dia en los ultimos N dias (zona horaria
+    activa). Lee los resumenes que mantiene cada escritura (tasks.stats), no
+    las tareas.
+    """
+    permission_classes = [IsAuthenticated]
+    days_query_param = "days"
+
+    def get_days(self, request):
+        value = request.query_params.get(
+            self.days_query_param, settings.TASKS_STATS_DEFAULT_DAYS
+        )
+        try:
+            days = int(value)
+        except (TypeError, ValueError):
+            days = 0
+        if not 1 <= days <= settings.TASKS_STATS_MAX_DAYS:
+            raise ValidationError({self.days_query_param: [
+                f"Debe ser un entero entre 1 y {settings.TASKS_STATS_MAX_DAYS}."
+            ]})
+        return days
+
+    def get(self, request):
+        days = self.get_days(request)
+        return Response(get_stats(request.user.id, days), status=status.HTTP_200_OK)
@@ -0,0 +1,47 @@
+"""
+Backend SQLite del proyecto (``ENGINE: "todo_challenge.db"``): el de Django
+mas PRAGMAs por conexion configurables en ``OPTIONS["pragmas"]``.
+
+Los valores por defecto (``DEFAULT_PRAGMAS``) apuntan a un servidor con
+escrituras concurrentes: WAL (los lectores no bloquean al escritor ni al
+reves), ``synchronous=NORMAL`` (en WAL no pierde integridad, solo las
+ultimas transacciones ante un corte de luz), espera de hasta
+``busy_timeout`` ms por el lock de escritura, cache de paginas y mmap mas
+grandes y temporales en memoria. Un PRAGMA en ``None`` no se aplica.
+
+Los PRAGMAs se ejecutan antes que ``OPTIONS["init_command"]``, que puede
+pisarlos.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,  # negativo: en KiB (20 MB)
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # sqlite3.connect() no acepta ``pragmas``.
+        pragmas = {**DEFAULT_PRAGMAS, **kwargs.pop("pragmas", {})}
+        self.init_commands = self.pragma_commands(pragmas) + self.init_commands
+        return kwargs
+
+    def pragma_commands(self, pragmas):
+        commands = []
+        for name, value in pragmas.items():
+            if value is None:
+                continue
+            if not name.isidentifier() or not str(value).replace("-", "").isalnum():
+                raise ImproperlyConfigured(
+                    f"settings.DATABASES[{self.alias!r}]['OPTIONS']['pragmas'] "
+                    f"tiene un PRAGMA invalido: {name!r} = {value!r}."
+                )
+            commands.append(f"PRAGMA {name} = {value}")
+        return commands
@@ -81,13 +81,65 @@ WSGI_APPLICATION = "todo_challenge.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite con PRAGMAs por conexion (WAL, busy_timeout, mmap...; ver
+# todo_challenge.db.base.DEFAULT_PRAGMAS, que se pisan en OPTIONS["pragmas"]).
+# Las transacciones toman el lock de escritura al empezar (IMMEDIATE): una
+# transaccion DEFERRED que lee y despues escribe no puede esperar el lock y
+# falla con "database is locked". Las conexiones se reutilizan entre requests
+# durante CONN_MAX_AGE segundos.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "todo_challenge.db",
         "NAME": str(BASE_DIR / "data" / "db.sqlite3"),
+        "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "pragmas": {},
+        },
     }
 }
 
+# Replicas de lectura para los GET del listado y detalle de tareas
+# (tasks.replicas): alias de DATABASES. Despues de escribir, un usuario lee
+# del primario durante DATABASE_REPLICA_PIN_SECONDS. Por ejemplo, una
+# conexion de solo lectura al mismo archivo (en tests, espejo de default):
+#   DATABASES["replica"] = {
+#       **DATABASES["default"],
+#       "NAME": f"file:{DATABASES['default']['NAME']}?mode=ro",
+#       "OPTIONS": {"pragmas": {"journal_mode": None}},
+#       "TEST": {"MIRROR": "default"},
+#   }
+#   DATABASE_READ_REPLICAS = ["replica"]
+DATABASE_ROUTERS = ["tasks.replicas.ReplicaRouter", "tasks.shards.ShardRouter"]
+DATABASE_READ_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = 5
+# Alias de CACHES con las marcas de DATABASE_REPLICA_PIN_SECONDS: tiene que
+# ser compartido por los workers (si no, otro proceso lee de la replica).
+DATABASE_REPLICA_PIN_CACHE = "shared"
+
+# Caches de Django. "shared" (tabla en default, ``createcachetable``) es
+# comun a todos los procesos y su ``add`` es atomico: ahi van las marcas que
+# tienen que verse desde cualquier worker (ver DATABASE_REPLICA_PIN_CACHE y
+# API_TOKEN_REFRESH_CACHE).
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    },
+}
+
+# Shards de tareas (tasks.shards): alias de DATABASES que guardan las tareas,
+# contadores y estadisticas; cada usuario vive en uno (tasks.UserShard, en
+# default). Cada shard se migra con ``migrate --database <alias>``; con mas
+# de uno, cada shard asigna ids de tarea de su rango de TASK_SHARD_ID_BLOCK
+# segun su posicion en la lista (no reordenarla). El directorio se cachea
+# TASK_SHARD_CACHE_SECONDS, que move_task_users espera antes de copiar.
+TASK_SHARDS = ["default"]
+TASK_SHARD_ID_BLOCK = 2 ** 40
+TASK_SHARD_CACHE_SECONDS = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,7 +184,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -149,9 +201,21 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=10),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_USER_CLASS': 'users.authentication.ApiTokenUser',
 }
 
+# Autenticacion de la API (users.authentication.CachedJWTAuthentication):
+# tokens verificados que se recuerdan por proceso (hasta su expiracion) y
+# segundos que se cachea si el usuario sigue activo (0: no se comprueba, un
+# usuario desactivado conserva el acceso hasta que vence su token).
+JWT_VERIFIED_TOKENS_MAX_ENTRIES = 10000
+JWT_USER_STATUS_TTL = 0
+JWT_USER_STATUS_MAX_ENTRIES = 10000
+
 DJANGO_TABLES2_TEMPLATE = "django_tables2/bootstrap5.html"
+# Segundos que se cachea el HTML de la tabla de tareas de la web
+# (web.templatetags.task_tables); 0 lo desactiva.
+WEB_TABLE_CACHE_TIMEOUT = 300
 
 LOGGING = {
     "version": 1,
@@ -175,6 +239,58 @@ LOGGING = {
     },
 }
 
+# Como llama la web a la API (web.transport): InProcessTransport despacha a
+# las vistas de la API en el mismo proceso (solo usa la ruta de
+# API_BASE_URL); con la API en otro servidor, "web.transport.HttpTransport".
+API_TRANSPORT = "web.transport.InProcessTransport"
 API_BASE_URL = "http://localhost:8000/api"
-API_REFRESH_PATH = "/auth/token/refresh/"
-API_TIMEOUT = 6
\ No newline at end of file
+API_REFRESH_PATH = "/users/auth/token/refresh/"
+API_TIMEOUT = 6
+# La web refresca el access token cuando le quedan menos de
+# API_TOKEN_REFRESH_MARGIN segundos. Los refresh simultaneos de una misma
+# sesion esperan al primero hasta API_TOKEN_REFRESH_WAIT segundos.
+API_TOKEN_REFRESH_MARGIN = 30
+API_TOKEN_REFRESH_WAIT = 5
+# Alias de CACHES con el lock y el resultado de cada refresh: compartido por
+# los workers para que un refresh en curso se vea desde cualquier proceso.
+API_TOKEN_REFRESH_CACHE = "shared"
+# HttpTransport: conexiones keep-alive por host del pool de cada proceso y
+# reintentos de GET/PUT/DELETE ante errores de conexion o 502/503/504.
+API_HTTP_POOL_SIZE = 10
+API_HTTP_MAX_RETRIES = 0
+API_HTTP_RETRY_BACKOFF = 0.2
+
+# Maximo de elementos por request en los endpoints masivos de tasks
+TASKS_BULK_MAX_ITEMS = 1000
+
+# Cache de respuestas de lectura de tasks (tasks.cache). Usa CACHES[alias]
+# si esta configurado; si no (por defecto), un LRU en memoria de cada proceso.
+TASKS_CACHE_ENABLED = True
+TASKS_CACHE_ALIAS = "tasks"
+TASKS_CACHE_TIMEOUT = 300
+TASKS_CACHE_LRU_MAX_ENTRIES = 1000
+
+# Filas leidas por consulta al exportar tareas (GET /api/export/)
+TASKS_EXPORT_CHUNK_SIZE = 2000
+
+# Importacion de tareas (POST /api/import/): filas por bulk_create/transaccion
+# y cantidad maxima de errores detallados en el resumen
+TASKS_IMPORT_BATCH_SIZE = 1000
+TASKS_IMPORT_MAX_ERRORS = 100
+
+# Sincronizacion incremental (GET /api/changes/). Las marcas de tareas
+# borradas se conservan TASKS_TOMBSTONE_RETENTION_DAYS; un cursor mas viejo
+# (o con mas de TASKS_SYNC_MAX_CHANGES cambios) exige resincronizar completo.
+TASKS_SYNC_GRACE_SECONDS = 5
+TASKS_SYNC_MAX_CHANGES = 1000
+TASKS_TOMBSTONE_RETENTION_DAYS = 30
+
+# Estadisticas (GET /api/stats/?days=N): dias del histograma por defecto y maximo
+TASKS_STATS_DEFAULT_DAYS = 30
+TASKS_STATS_MAX_DAYS = 366
+
+# Archivo de tareas (comando archive_tasks): completadas y sin cambios hace
+# mas de TASKS_ARCHIVE_AFTER_DAYS se mueven a ArchivedTask, de a
+# TASKS_ARCHIVE_BATCH_SIZE por transaccion
+TASKS_ARCHIVE_AFTER_DAYS = 365
+TASKS_ARCHIVE_BATCH_SIZE = 500
@@ -0,0 +1,105 @@
+"""
+Autenticacion JWT de la API sin consultar la base en cada request.
+
+El usuario se arma con los claims del token (``TokenUser``) y los tokens ya
+verificados se guardan en un LRU hasta su expiracion, asi que un request con
+un token conocido no vuelve a verificar la firma ni consulta ``User``.
+Opcionalmente (``JWT_USER_STATUS_TTL`` > 0) se comprueba que el usuario siga
+existiendo y activo, cacheando el resultado ese tiempo.
+"""
+import time
+from functools import cached_property
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from tasks.cache import LRUCache
+
+_verified_tokens = None
+_user_status = None
+
+
+class ApiTokenUser(TokenUser):
+    """TokenUser con el id del tipo de la clave primaria de User (no str)."""
+    @cached_property
+    def id(self):
+        return get_user_model()._meta.pk.to_python(
+            self.token[jwt_settings.USER_ID_CLAIM]
+        )
+
+
+def get_verified_tokens():
+    global _verified_tokens
+    if _verified_tokens is None:
+        _verified_tokens = LRUCache(settings.JWT_VERIFIED_TOKENS_MAX_ENTRIES)
+    return _verified_tokens
+
+
+def get_user_status_cache():
+    global _user_status
+    if _user_status is None:
+        _user_status = LRUCache(settings.JWT_USER_STATUS_MAX_ENTRIES)
+    return _user_status
+
+
+def clear_auth_caches():
+    get_verified_tokens().clear()
+    get_user_status_cache().clear()
+
+
+def token_ttl(token):
+    """Segundos hasta que el token expira (con el leeway de SIMPLE_JWT)."""
+    leeway = jwt_settings.LEEWAY
+    leeway = leeway.total_seconds() if hasattr(leeway, "total_seconds") else leeway
+    return token["exp"] + leeway - time.time()
+
+
+class CachedJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWTStatelessUserAuthentication con LRU de tokens verificados y chequeo
+    opcional (cacheado) de que el usuario siga activo. Con
+    ``CHECK_REVOKE_TOKEN`` el usuario se lee de la base como en
+    JWTAuthentication.
+    """
+    def get_validated_token(self, raw_token):
+        cache = get_verified_tokens()
+        token = cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            ttl = token_ttl(token)
+            if ttl > 0:
+                cache.set(raw_token, token, timeout=ttl)
+        return token
+
+    def get_user(self, validated_token):
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            return JWTAuthentication.get_user(self, validated_token)
+        user = super().get_user(validated_token)
+        if settings.JWT_USER_STATUS_TTL:
+            is_active = get_user_status_cache().get(user.id)
+            if is_active is None:
+                is_active = self.user_model.objects.filter(pk=user.id).values_list(
+                    "is_active", flat=True
+                ).first()
+                is_active = self.remember_status(user.id, is_active)
+            self.check_active(is_active)
+        return user
+
+    def remember_status(self, user_id, is_active):
+        is_active = bool(is_active)  # None: el usuario ya no existe
+        get_user_status_cache().set(
+            user_id, is_active, timeout=settings.JWT_USER_STATUS_TTL
+        )
+        return is_active
+
+    def check_active(self, is_active):
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
@@ -0,0 +1,88 @@
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from tasks.factories import TaskFactory
+from users.factories import UserFactory
+from ..authentication import ApiTokenUser, clear_auth_caches, get_verified_tokens
+
+
+class TestCachedJWTAuthentication(APITestCase):
+    def setUp(self):
+        clear_auth_caches()
+        self.user = UserFactory()
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        self.task = TaskFactory(user=self.user)
+        self.list_url = reverse("task-list-create")
+
+    def user_queries(self, ctx):
+        return [q["sql"] for q in ctx.captured_queries if '"auth_user"' in q["sql"]]
+
+    def test_no_consulta_user(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(self.list_url)
+            self.client.get(reverse("task-detail", args=[self.task.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json()["results"][0]["id"], self.task.pk)
+        self.assertEqual(self.user_queries(ctx), [])
+
+    def test_escrituras_con_token_user(self):
+        resp = self.client.post(self.list_url, {"title": "Nueva"}, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        resp = self.client.post(reverse("task-bulk"), [{"title": "B"}], format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        resp = self.client.patch(
+            reverse("task-toggle", args=[self.task.pk]), {}, format="json"
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.user.task_set.count(), 3)
+
+        otra = TaskFactory(user=UserFactory())
+        resp = self.client.get(reverse("task-detail", args=[otra.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_token_user_con_id_entero(self):
+        user = ApiTokenUser(AccessToken.for_user(self.user))
+        self.assertEqual(user.id, self.user.id)
+        self.assertIsInstance(user.id, int)
+
+    def test_recuerda_tokens_verificados(self):
+        self.client.get(self.list_url)
+        self.assertEqual(len(get_verified_tokens()), 1)
+        self.client.get(self.list_url)
+        self.assertEqual(len(get_verified_tokens()), 1)
+
+    def test_rechaza_tokens_invalidos(self):
+        for token in (self.token[:-2] + "xx", str(RefreshToken.for_user(self.user))):
+            self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            resp = self.client.get(self.list_url)
+            self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(get_verified_tokens()), 0)
+
+    def test_sin_chequeo_de_estado_por_defecto(self):
+        self.user.is_active = False
+        self.user.save()
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    @override_settings(JWT_USER_STATUS_TTL=60)
+    def test_estado_cacheado(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.list_url)
+            self.client.get(self.list_url)
+        self.assertEqual(len(self.user_queries(ctx)), 1)
+
+        self.user.is_active = False
+        self.user.save()
+        clear_auth_caches()
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.delete()
+        clear_auth_caches()
+        resp = self.client.get(self.list_url)
+        self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
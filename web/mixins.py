@@ -1,13 +1,77 @@
+import hashlib
 import requests
 import logging
+import threading
+import time
 
+import jwt
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
 
 logger = logging.getLogger(__name__)
 
 
+class RefreshStats:
+    """
+    Contadores de refresh del proceso actual: ``avoided_replays`` (refresh
+    antes de que venza el token: un 401 y su reintento que no ocurren),
+    ``coalesced`` (esperaron el refresh en curso de otro request) y
+    ``replays`` (401 reintentados).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.avoided_replays = 0
+            self.coalesced = 0
+            self.replays = 0
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def as_dict(self):
+        return {
+            "avoided_replays": self.avoided_replays,
+            "coalesced": self.coalesced,
+            "replays": self.replays,
+        }
+
+
+refresh_stats = RefreshStats()
+
+
+def token_payload(token):
+    """Claims del JWT sin verificar la firma (la verifica la API) o None."""
+    try:
+        return jwt.decode(token, options={"verify_signature": False})
+    except jwt.PyJWTError:
+        return None
+
+
+def token_expires_in(token):
+    """Segundos hasta el ``exp`` del JWT o None."""
+    exp = (token_payload(token) or {}).get("exp")
+    return exp - time.time() if isinstance(exp, (int, float)) else None
+
+
+def refresh_key(refresh):
+    return "web:refresh:" + hashlib.sha1(refresh.encode()).hexdigest()
+
+
+class ApiRedirect(Exception):
+    """La llamada a la API termino en un redirect (por ejemplo, al login)."""
+    def __init__(self, response):
+        super().__init__(response)
+        self.response = response
+
+
 class SessionRequiredMixin:
     """
     Exige sesión en cualquier CBV protegida.
@@ -22,7 +86,8 @@ class SessionRequiredMixin:
 
 class ApiSessionMixin:
     """
-    Interactua con la api a traves de requests.
+    Interactua con la api a traves del transporte de ``API_TRANSPORT``
+    (web.transport): en el mismo proceso o por HTTP.
     """
     def _require(self, name):
         return getattr(settings, name)
@@ -39,6 +104,9 @@ class ApiSessionMixin:
     def timeout(self):
         return self._require("API_TIMEOUT")
 
+    def get_transport(self, request):
+        return import_string(self._require("API_TRANSPORT"))(request)
+
     def build_url(self, path):
         return f"{self.api_base}/{str(path).lstrip('/')}"
 
@@ -63,30 +131,90 @@ class ApiSessionMixin:
         if data.get("refresh"):
             request.session["refresh"] = data.get("refresh")
 
-    def refresh_token(self, request):
-        refresh = request.session.get("refresh")
-        if not refresh:
-            request.session.flush()
-            return
-
+    def request_refresh(self, request, refresh):
+        """
+        Tokens nuevos de la API, ``{}`` si rechazo el refresh o None si no
+        se pudo llamar.
+        """
         try:
-            resp = requests.post(
+            resp = self.get_transport(request).post(
                 self.build_url(self.refresh_path),
                 json={"refresh": refresh},
                 timeout=self.timeout,
                 headers={"Accept": "application/json", "Content-Type": "application/json"},
             )
         except requests.RequestException:
-            return
+            return None
 
         if resp.status_code == 200:
             try:
-                self.save_tokens(request, resp.json())
+                data = resp.json()
             except ValueError:
-                request.session.flush()
+                return {}
+            return data if isinstance(data, dict) and data.get("access") else {}
+        return {}
+
+    def wait_for_refresh(self, cache, key):
+        deadline = time.monotonic() + settings.API_TOKEN_REFRESH_WAIT
+        while time.monotonic() < deadline:
+            result = cache.get(f"{key}:result")
+            if result is not None:
+                return result
+            if cache.get(f"{key}:lock") is None:
+                # El refresh termino sin resultado (error de conexion).
+                return None
+            time.sleep(0.05)
+        return None
+
+    def refresh_token(self, request):
+        """
+        Refresca los tokens de la sesion. Los requests con el mismo refresh
+        token (pestañas en paralelo, en cualquier hilo o proceso) esperan al
+        que ya esta refrescando (lock en ``CACHES[API_TOKEN_REFRESH_CACHE]``,
+        compartido por los workers) y usan su resultado, que queda en el
+        cache ``API_TOKEN_REFRESH_WAIT`` segundos: con
+        ``ROTATE_REFRESH_TOKENS`` un segundo refresh con el token viejo
+        fallaria y cerraria la sesion.
+        """
+        refresh = request.session.get("refresh")
+        if not refresh:
+            request.session.flush()
+            return
+
+        cache = caches[settings.API_TOKEN_REFRESH_CACHE]
+        key = refresh_key(refresh)
+        wait = settings.API_TOKEN_REFRESH_WAIT
+        result = cache.get(f"{key}:result")
+        if result is None:
+            if cache.add(f"{key}:lock", True, wait):
+                try:
+                    result = self.request_refresh(request, refresh)
+                    if result is not None:
+                        cache.set(f"{key}:result", result, wait)
+                finally:
+                    cache.delete(f"{key}:lock")
+            else:
+                refresh_stats.count("coalesced")
+                result = self.wait_for_refresh(cache, key)
+        if result is None:
+            return
+        if result:
+            self.save_tokens(request, result)
         else:
             request.session.flush()
 
+    def refresh_if_expiring(self, request):
+        """Refresca si el access token vence en menos de ``API_TOKEN_REFRESH_MARGIN``."""
+        access = request.session.get("access")
+        if not access or not request.session.get("refresh"):
+            return
+        expires_in = token_expires_in(access)
+        if expires_in is None or expires_in > settings.API_TOKEN_REFRESH_MARGIN:
+            return
+        self.refresh_token(request)
+        if request.session.get("access") not in (None, access):
+            refresh_stats.count("avoided_replays")
+
     def api_request(
         self,
         method,
@@ -98,14 +226,17 @@ class ApiSessionMixin:
         error_msg=None,
         params=None,
     ):
+        if token_required:
+            self.refresh_if_expiring(request)
         headers = self.get_headers(request, token_required)
         if token_required and headers is None:
             return redirect("web:login")
 
         url = self.build_url(path)
+        transport = self.get_transport(request)
         logger.info(f"WEB → API {method} {url}")
         try:
-            response = requests.request(
+            response = transport.send(
                 method,
                 url,
                 json=data,
@@ -118,12 +249,13 @@ class ApiSessionMixin:
             messages.error(request, "Error de conexión con el servidor.")
             return None
         if response.status_code == 401 and token_required:
+            refresh_stats.count("replays")
             self.refresh_token(request)
             headers = self.get_headers(request, token_required=True)
             if headers is None:
                 return redirect("web:login")
             try:
-                response = requests.request(
+                response = transport.send(
                     method,
                     url,
                     json=data,
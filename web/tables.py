@@ -1,14 +1,109 @@
+import hashlib
+import json
+
 import django_tables2 as tables
+from django.core.paginator import Paginator
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import localtime
+from django_tables2.data import TableData
+from django_tables2.utils import OrderBy
+
+
+class ApiTableData(TableData):
+    """
+    Datos de una tabla paginada leidos de un listado de la API, una pagina
+    por llamada: el orden de la tabla pasa como ``ordering``, la pagina como
+    ``limit``/``offset`` y el ``count`` de la API alimenta el paginador.
+
+    ``fetch(params)`` hace el GET y devuelve el cuerpo (``count`` y
+    ``results``) o None si fallo (la tabla queda vacia).
+    """
+    def __init__(self, fetch, params=None):
+        super().__init__([])
+        self.fetch = fetch
+        self.params = dict(params or {})
+        self.ordering_param = None
+        self.window = None
+        self.loaded = None
+        self.count = None
+
+    def expect(self, offset, limit):
+        """Ventana que va a pedir el paginador (la trae junto con ``count``)."""
+        self.window = (offset, limit)
+
+    def load(self, offset, limit):
+        params = {**self.params, "limit": limit, "offset": offset}
+        if self.ordering_param:
+            params["ordering"] = self.ordering_param
+        body = self.fetch(params)
+        if not isinstance(body, dict):
+            body = {}
+        self.count = body.get("count") or 0
+        self.data = body.get("results") or []
+        self.loaded = (offset, limit)
+        return self.data
+
+    def __len__(self):
+        if self.count is None:
+            self.load(*(self.window or (0, 10)))
+        return self.count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop = key.start or 0, key.stop
+            if stop is None:
+                stop = len(self)
+            if self.loaded and self.loaded[0] == start and stop - start <= self.loaded[1]:
+                # La ultima pagina pide menos que ``limit``.
+                return self.data[:stop - start]
+            return self.load(start, stop - start)
+        return self[key:key + 1][0]
+
+    def order_by(self, aliases):
+        ordering = []
+        for alias in aliases:
+            bound_column = self.table.columns[OrderBy(alias).bare]
+            # Como TableListData: order_by de la columna refleja el orden actual.
+            if alias[0] != bound_column.order_by_alias[0]:
+                ordering += bound_column.order_by.opposite
+            else:
+                ordering += bound_column.order_by
+        self.ordering_param = ",".join(
+            str(item).replace(".", "__") for item in ordering
+        ) or None
+        self.count = self.loaded = None
+
+    @property
+    def ordering(self):
+        return self.ordering_param
+
+    def fingerprint(self):
+        """Hash de lo que trajo la API (cambia con cualquier cambio en la pagina)."""
+        payload = [self.count, self.loaded, self.ordering_param, self.data]
+        return hashlib.sha1(
+            json.dumps(payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @property
+    def verbose_name(self):
+        return "tarea"
+
+    @property
+    def verbose_name_plural(self):
+        return "tareas"
 
 
 class TaskTable(tables.Table):
     """
     Tabla para renderizar los contenidos obtenidos desde API
     """
+    # Campos que se piden a la API (``?fields=``): la tabla no muestra
+    # ``description``.
+    api_fields = ("id", "title", "completed", "created_at", "updated_at")
+
     title = tables.Column(verbose_name="Tarea")
-    completed = tables.Column(verbose_name="Completada")
+    # La API no ordena por ``completed`` (ver ApiTableData).
+    completed = tables.Column(verbose_name="Completada", orderable=False)
     created_at = tables.Column(verbose_name="Creada")
     updated_at = tables.Column(verbose_name="Actualizada")
     acciones = tables.TemplateColumn(
@@ -17,6 +112,15 @@ class TaskTable(tables.Table):
         orderable=False,
     )
 
+    def paginate(self, paginator_class=Paginator, per_page=None, page=1, *args, **kwargs):
+        if isinstance(self.data, ApiTableData):
+            per_page = per_page or self._meta.per_page
+            try:
+                self.data.expect((max(int(page), 1) - 1) * per_page, per_page)
+            except (TypeError, ValueError):
+                pass
+        return super().paginate(paginator_class, per_page, page, *args, **kwargs)
+
     def render_completed(self, value):
         return "✅" if bool(value) else "❌"
 
@@ -0,0 +1,79 @@
+"""
+``{% render_cached_table table %}``: como ``render_table`` de django-tables2,
+pero guarda el HTML de las tablas con ApiTableData en el cache de
+tasks.cache (``WEB_TABLE_CACHE_TIMEOUT`` segundos).
+
+La clave lleva el usuario, la ruta y todos los parametros del request
+(filtros, pagina, orden), la zona horaria y el idioma activos y el hash de
+lo que devolvio la API para esa pagina: si cambia una tarea de la pagina o
+el total, la clave es otra. El fragmento se renderiza con un marcador en
+lugar del token CSRF, que se reemplaza por el del request en cada uso.
+"""
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from django.utils.timezone import get_current_timezone_name
+from django.utils.translation import get_language
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from tasks.cache import CacheStats, get_response_cache
+from web.mixins import token_payload
+from web.tables import ApiTableData
+
+register = template.Library()
+
+CSRF_PLACEHOLDER = "csrf0token0placeholder0f3a9c"
+
+stats = CacheStats()
+
+
+def fragment_key(request, table):
+    payload = token_payload(request.session.get("access") or "") or {}
+    user_id = payload.get(jwt_settings.USER_ID_CLAIM)
+    parts = [
+        request.path,
+        sorted(request.GET.lists()),
+        get_current_timezone_name(),
+        get_language(),
+        table.data.fingerprint(),
+    ]
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f"web:table:{user_id}:{digest}"
+
+
+def render_fragment(context, table, request, **extra):
+    """HTML de la tabla; ``extra`` pisa variables del contexto."""
+    with context.push(**extra):
+        # Como RenderTableNode: TemplateColumn renderiza con table.context.
+        table.context = context
+        try:
+            table.before_render(request)
+            return get_template(table.template_name).render(
+                context={"table": table}, request=request
+            )
+        finally:
+            del table.context
+
+
+@register.simple_tag(takes_context=True)
+def render_cached_table(context, table):
+    request = context.get("request")
+    if (
+        not settings.WEB_TABLE_CACHE_TIMEOUT
+        or request is None
+        or not isinstance(table.data, ApiTableData)
+    ):
+        return mark_safe(render_fragment(context, table, request))
+    cache = get_response_cache()
+    key = fragment_key(request, table)
+    html = cache.get(key)
+    if html is None:
+        stats.miss()
+        html = render_fragment(context, table, request, csrf_token=CSRF_PLACEHOLDER)
+        cache.set(key, html, settings.WEB_TABLE_CACHE_TIMEOUT)
+    else:
+        stats.hit()
+    return mark_safe(html.replace(CSRF_PLACEHOLDER, str(context.get("csrf_token", ""))))
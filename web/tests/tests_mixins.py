@@ -1,15 +1,23 @@
 import json
+import threading
+import time
+
+import jwt as pyjwt
 import pytest
 import requests
-from django.test import TestCase, RequestFactory
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.test import TestCase, override_settings, RequestFactory
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.contrib.messages.storage.fallback import FallbackStorage
 from unittest.mock import patch
-from web.mixins import ApiSessionMixin
+from web.mixins import ApiSessionMixin, refresh_key, refresh_stats
 
 pytestmark = pytest.mark.django_db
 
 
+@override_settings(API_TRANSPORT="web.transport.HttpTransport")
 class TestApiSessionMixinUnit(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -46,7 +54,7 @@ class TestApiSessionMixinUnit(TestCase):
     def test_api_request_exito(self):
         request = self.make_request("/", access="A")
         with patch(
-            "web.mixins.requests.request",
+            "web.transport.requests.Session.request",
             return_value=self.make_response(200, {"ok": True}),
         ) as mocked:
             response = self.m.api_request("GET", "/x", request, success_msg="ok")
@@ -57,7 +65,7 @@ class TestApiSessionMixinUnit(TestCase):
     def test_api_request_error_400(self):
         request = self.make_request("/", access="A")
         with patch(
-            "web.mixins.requests.request",
+            "web.transport.requests.Session.request",
             return_value=self.make_response(400, {"detail": "bad"}),
         ) as mocked:
             response = self.m.api_request("GET", "/x", request, error_msg="err")
@@ -68,7 +76,8 @@ class TestApiSessionMixinUnit(TestCase):
     def test_api_request_excepcion_retorna_none(self):
         request = self.make_request("/", access="A")
         with patch(
-            "web.mixins.requests.request", side_effect=requests.RequestException("boom")
+            "web.transport.requests.Session.request",
+            side_effect=requests.RequestException("boom"),
         ):
             response = self.m.api_request("GET", "/x", request)
         self.assertIsNone(response)
@@ -92,10 +101,127 @@ class TestApiSessionMixinUnit(TestCase):
             return first if len(calls) == 1 else second
 
         with (
-            patch("web.mixins.requests.post", return_value=refresh_resp),
-            patch("web.mixins.requests.request", side_effect=fake_request),
+            patch("web.transport.requests.Session.post", return_value=refresh_resp),
+            patch("web.transport.requests.Session.request", side_effect=fake_request),
         ):
             response = self.m.api_request("GET", "/x", request)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(calls[0]["h"].get("Authorization"), "Bearer OLD")
         self.assertEqual(calls[1]["h"].get("Authorization"), "Bearer NEW")
+
+
+@override_settings(API_TRANSPORT="web.transport.HttpTransport")
+class TestProactiveRefresh(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.m = ApiSessionMixin()
+        refresh_stats.reset()
+
+    def make_request(self, access, refresh="REF"):
+        request = self.factory.get("/")
+        SessionMiddleware(lambda r: None).process_request(request)
+        request.session["access"] = access
+        request.session["refresh"] = refresh
+        setattr(request, "_messages", FallbackStorage(request))
+        return request
+
+    make_response = TestApiSessionMixinUnit.make_response
+
+    def token(self, expires_in):
+        # Sin verificar la firma: la clave da igual.
+        return pyjwt.encode({"exp": int(time.time() + expires_in)}, "k" * 32)
+
+    def test_refresca_antes_de_vencer(self):
+        new = self.token(300)
+        request = self.make_request(self.token(10))
+        with (
+            patch(
+                "web.transport.requests.Session.post",
+                return_value=self.make_response(200, {"access": new}),
+            ) as post,
+            patch(
+                "web.transport.requests.Session.request",
+                return_value=self.make_response(200, {"ok": True}),
+            ) as send,
+        ):
+            response = self.m.api_request("GET", "/x", request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(send.call_args.kwargs["headers"]["Authorization"], f"Bearer {new}")
+        self.assertEqual(
+            refresh_stats.as_dict(), {"avoided_replays": 1, "coalesced": 0, "replays": 0}
+        )
+
+    def test_token_vigente_no_refresca(self):
+        request = self.make_request(self.token(200))
+        with (
+            patch("web.transport.requests.Session.post") as post,
+            patch(
+                "web.transport.requests.Session.request",
+                return_value=self.make_response(200, {}),
+            ),
+        ):
+            self.m.api_request("GET", "/x", request)
+        post.assert_not_called()
+
+    def test_usa_el_resultado_de_otro_proceso(self):
+        # Otro worker ya refresco: su resultado esta en el cache compartido.
+        new = self.token(300)
+        cache = caches[settings.API_TOKEN_REFRESH_CACHE]
+        self.assertIsInstance(cache, DatabaseCache)
+        cache.set(f"{refresh_key('REF')}:result", {"access": new}, 5)
+        request = self.make_request(self.token(5))
+        with patch("web.transport.requests.Session.post") as post:
+            self.m.refresh_if_expiring(request)
+        post.assert_not_called()
+        self.assertEqual(request.session["access"], new)
+
+    # Los hilos comparten un LocMemCache: la tabla del cache compartido no
+    # admite escrituras desde otros hilos dentro de la transaccion del test.
+    @override_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+            "refresh": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        },
+        API_TOKEN_REFRESH_CACHE="refresh",
+    )
+    def test_refresh_en_paralelo_una_sola_llamada(self):
+        new = self.token(300)
+        calls = []
+
+        def slow_refresh(*args, **kwargs):
+            calls.append(1)
+            time.sleep(0.2)
+            return self.make_response(200, {"access": new, "refresh": "REF2"})
+
+        requests_ = [self.make_request(self.token(5)) for _ in range(5)]
+        with patch("web.transport.requests.Session.post", side_effect=slow_refresh):
+            threads = [
+                threading.Thread(target=self.m.refresh_if_expiring, args=[request])
+                for request in requests_
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # Un request que llega despues con el refresh viejo usa el resultado.
+            late = self.make_request(self.token(5))
+            self.m.refresh_token(late)
+        self.assertEqual(len(calls), 1)
+        for request in [*requests_, late]:
+            self.assertEqual(request.session["access"], new)
+            self.assertEqual(request.session["refresh"], "REF2")
+        stats = refresh_stats.as_dict()
+        self.assertEqual(stats["avoided_replays"], 5)
+        self.assertEqual(stats["coalesced"], 4)
+
+    def test_refresh_rechazado_cierra_la_sesion(self):
+        request = self.make_request(self.token(5))
+        with patch(
+            "web.transport.requests.Session.post",
+            return_value=self.make_response(401, {"detail": "x"}),
+        ):
+            response = self.m.api_request("GET", "/x", request)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(list(request.session.keys()))
@@ -0,0 +1,155 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest.mock import patch
+from tasks.factories import TaskFactory
+from tasks.models import Task
+from users.factories import UserFactory
+from web.templatetags import task_tables as fragments
+from web.transport import InProcessTransport
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTaskTablePagination(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        now = timezone.now()
+        self.tasks = []
+        for n in range(25):
+            task = TaskFactory(user=self.user, title=f"Tarea {n:02d}", completed=n % 2)
+            self.tasks.append(task)
+        # created_at distintos: la tarea n es la n-esima mas vieja.
+        for n, task in enumerate(self.tasks):
+            Task.objects.filter(pk=task.pk).update(
+                created_at=now - timedelta(minutes=100 - n)
+            )
+        TaskFactory(user=UserFactory())
+        session = self.client.session
+        session["access"] = str(RefreshToken.for_user(self.user).access_token)
+        session.save()
+
+    def get_page(self, **params):
+        with patch.object(
+            InProcessTransport, "send", autospec=True, side_effect=InProcessTransport.send
+        ) as send:
+            response = self.client.get(reverse("web:tasks"), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 1)
+        table = response.context["table"]
+        titles = [row.record["title"] for row in table.page.object_list]
+        return table, titles, send.call_args.kwargs["params"]
+
+    def test_una_llamada_por_pagina(self):
+        table, titles, params = self.get_page()
+        self.assertEqual(titles, [f"Tarea {n:02d}" for n in range(24, 14, -1)])
+        self.assertEqual(table.paginator.count, 25)
+        self.assertEqual(table.paginator.num_pages, 3)
+        self.assertEqual(
+            (params["limit"], params["offset"], params["ordering"]),
+            (10, 0, "-created_at"),
+        )
+
+        table, titles, params = self.get_page(page=3)
+        self.assertEqual(titles, [f"Tarea {n:02d}" for n in range(4, -1, -1)])
+        self.assertEqual(params["offset"], 20)
+
+    def test_orden_por_columna(self):
+        _, titles, params = self.get_page(sort="title", page=2)
+        self.assertEqual(params["ordering"], "title")
+        self.assertEqual(titles, [f"Tarea {n:02d}" for n in range(10, 20)])
+        _, titles, params = self.get_page(sort="-updated_at")
+        self.assertEqual(params["ordering"], "-updated_at")
+        # ``completed`` no se puede ordenar en la API: queda el orden de la API.
+        _, titles, params = self.get_page(sort="completed")
+        self.assertNotIn("ordering", params)
+        self.assertEqual(titles, [f"Tarea {n:02d}" for n in range(24, 14, -1)])
+
+    def test_filtros_y_count(self):
+        table, titles, params = self.get_page(completed="true")
+        self.assertEqual(params["completed"], "true")
+        self.assertEqual(table.paginator.count, 12)
+        self.assertEqual(len(titles), 10)
+
+    def test_pagina_fuera_de_rango_muestra_la_ultima(self):
+        response = self.client.get(reverse("web:tasks"), {"page": 9})
+        table = response.context["table"]
+        self.assertEqual(table.page.number, 3)
+        self.assertEqual(len(table.page.object_list), 5)
+
+    def test_sesion_invalida_redirige(self):
+        session = self.client.session
+        session["access"] = "invalido"
+        session.pop("refresh", None)
+        session.save()
+        response = self.client.get(reverse("web:tasks"))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse("web:login"))
+
+
+class TestTaskTableFragmentCache(TestCase):
+    def setUp(self):
+        self.client = Client(enforce_csrf_checks=True)
+        self.user = UserFactory()
+        self.tasks = TaskFactory.create_batch(12, user=self.user, completed=False)
+        session = self.client.session
+        session["access"] = str(RefreshToken.for_user(self.user).access_token)
+        session.save()
+        fragments.stats.reset()
+
+    def get_tasks(self, **params):
+        response = self.client.get(reverse("web:tasks"), params)
+        self.assertEqual(response.status_code, 200)
+        html = response.content.decode()
+        self.assertNotIn(fragments.CSRF_PLACEHOLDER, html)
+        tokens = set(re.findall(r'name="csrfmiddlewaretoken" value="([^"]+)"', html))
+        # El formulario de alta (fuera del fragmento) y los de la tabla.
+        self.assertEqual(len(tokens), 1)
+        return html, tokens.pop()
+
+    def test_reutiliza_el_fragmento_con_el_csrf_del_request(self):
+        _, first_token = self.get_tasks()
+        # Otro navegador: cookie CSRF y token nuevos.
+        self.client.cookies.clear()
+        session = self.client.session
+        session["access"] = str(RefreshToken.for_user(self.user).access_token)
+        session.save()
+        second, token = self.get_tasks()
+        self.assertNotEqual(token, first_token)
+        self.assertEqual(fragments.stats.as_dict()["hits"], 1)
+        self.assertEqual(fragments.stats.as_dict()["misses"], 1)
+
+        task = self.tasks[-1]
+        self.assertIn(reverse("web:task-toggle", args=[task.pk]), second)
+        response = self.client.post(
+            reverse("web:task-toggle", args=[task.pk]), {"csrfmiddlewaretoken": token}
+        )
+        self.assertEqual(response.status_code, 302)
+        task.refresh_from_db()
+        self.assertTrue(task.completed)
+
+    def test_cambios_en_la_pagina_invalidan(self):
+        html, token = self.get_tasks()
+        self.assertNotIn("Reabrir", html)
+        self.client.post(
+            reverse("web:task-toggle", args=[self.tasks[-1].pk]),
+            {"csrfmiddlewaretoken": token},
+        )
+        html, _ = self.get_tasks()
+        self.assertIn("Reabrir", html)
+        self.get_tasks(page=2)
+        self.get_tasks(sort="title")
+        self.assertEqual(fragments.stats.as_dict()["misses"], 4)
+        self.assertEqual(fragments.stats.as_dict()["hits"], 0)
+
+    def test_desactivado(self):
+        with override_settings(WEB_TABLE_CACHE_TIMEOUT=0):
+            self.get_tasks()
+            self.get_tasks()
+        self.assertEqual(fragments.stats.as_dict()["misses"], 0)
+        self.assertEqual(fragments.stats.as_dict()["hits"], 0)
@@ -0,0 +1,170 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+from unittest.mock import patch
+from tasks.factories import TaskFactory
+from tasks.models import Task
+from users.factories import UserFactory
+from web.transport import (
+    HttpTransport,
+    InProcessTransport,
+    get_http_session,
+    http_pool_stats,
+    reset_http_session,
+)
+
+pytestmark = pytest.mark.django_db
+
+NO_HTTP = requests.RequestException("la web no deberia usar HTTP")
+
+
+@patch("web.transport.requests.Session.request", side_effect=NO_HTTP)
+@patch("web.transport.requests.Session.post", side_effect=NO_HTTP)
+class TestInProcessTransport(TestCase):
+    def setUp(self):
+        self.user = UserFactory(username="ana")
+        self.user.save()  # guarda la contraseña
+
+    def iniciar_sesion(self):
+        response = self.client.post(
+            reverse("web:login"), {"username": "ana", "password": "pass123"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse("web:tasks"))
+
+    def test_registro_login_y_tareas(self, *mocks):
+        response = self.client.post(
+            reverse("web:register"), {"username": "beto", "password": "pass123"}
+        )
+        self.assertEqual(response.url, reverse("web:login"))
+        self.iniciar_sesion()
+
+        response = self.client.post(
+            reverse("web:tasks"), {"title": "Comprar pan", "description": ""}
+        )
+        self.assertEqual(response.status_code, 302)
+        task = Task.objects.get(user=self.user)
+        response = self.client.get(reverse("web:tasks"))
+        self.assertContains(response, "Comprar pan")
+
+        self.client.post(reverse("web:task-toggle", args=[task.pk]))
+        task.refresh_from_db()
+        self.assertTrue(task.completed)
+        response = self.client.get(reverse("web:task-detail", args=[task.pk]))
+        self.assertContains(response, "Comprar pan")
+        self.client.post(reverse("web:task-delete", args=[task.pk]))
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    def test_tarea_ajena_redirige(self, *mocks):
+        ajena = TaskFactory(user=UserFactory())
+        self.iniciar_sesion()
+        response = self.client.get(reverse("web:task-detail", args=[ajena.pk]))
+        self.assertEqual(response.url, reverse("web:tasks"))
+
+    def test_token_vencido_se_refresca(self, *mocks):
+        refresh = RefreshToken.for_user(self.user)
+        session = self.client.session
+        session["access"] = "vencido"
+        session["refresh"] = str(refresh)
+        session.save()
+        TaskFactory(user=self.user, title="Regar plantas")
+        response = self.client.get(reverse("web:tasks"))
+        self.assertContains(response, "Regar plantas")
+        self.assertNotEqual(self.client.session["access"], "vencido")
+
+    def test_respuesta_como_la_de_http(self, *mocks):
+        TaskFactory.create_batch(3, user=self.user)
+        token = str(RefreshToken.for_user(self.user).access_token)
+        transport = InProcessTransport(RequestFactory().get("/tasks/"))
+        response = transport.send(
+            "GET", "http://localhost:8000/api/", params={"limit": 2},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        expected = self.client.get(
+            reverse("task-list-create"), {"limit": 2},
+            HTTP_AUTHORIZATION=f"Bearer {token}",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(response.content, expected.content)
+
+        response = transport.send("GET", "http://localhost:8000/api/no-existe/")
+        self.assertEqual(response.status_code, 404)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "sessionid=ajena")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(API_TRANSPORT="web.transport.HttpTransport")
+class TestHttpSession(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/api/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        reset_http_session()
+        self.addCleanup(reset_http_session)
+
+    def test_reutiliza_conexiones(self):
+        transport = HttpTransport(None)
+        for _ in range(5):
+            self.assertEqual(transport.send("GET", self.url).json(), {"ok": True})
+        self.assertEqual(
+            http_pool_stats(),
+            {"requests": 5, "connections": 1, "reused": 4, "reuse_ratio": 0.8},
+        )
+        # Las cookies de una respuesta no se mandan en requests de otros usuarios.
+        self.assertEqual(len(get_http_session().cookies), 0)
+
+    def test_una_sesion_por_proceso_y_configuracion(self):
+        sessions = []
+        threads = [
+            threading.Thread(target=lambda: sessions.append(get_http_session()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(session) for session in sessions}), 1)
+        session = sessions[0]
+        adapter = session.get_adapter(self.url)
+        self.assertEqual(adapter._pool_maxsize, 10)
+        self.assertEqual(adapter.max_retries.total, 0)
+
+        with override_settings(API_HTTP_POOL_SIZE=3, API_HTTP_MAX_RETRIES=2):
+            adapter = get_http_session().get_adapter(self.url)
+            self.assertEqual(adapter._pool_maxsize, 3)
+            self.assertEqual(adapter.max_retries.total, 2)
+        session = get_http_session()
+        self.assertIs(get_http_session(), session)
+        # Despues de un fork (otro pid) se crea una sesion nueva.
+        with patch("web.transport.os.getpid", return_value=-1):
+            self.assertIsNot(get_http_session(), session)
@@ -0,0 +1,200 @@
+"""
+Transportes con los que la web llama a la API (``API_TRANSPORT``).
+
+InProcessTransport (por defecto) despacha el request a la vista de la API en
+el mismo proceso: sin socket, sin pasar de nuevo por el servidor y sin
+ocupar un segundo worker esperando al primero (con pocos workers, las paginas
+podian bloquearse esperando a la API). La respuesta de DRF se entrega sin
+serializar a JSON. HttpTransport usa ``requests`` contra ``API_BASE_URL``,
+para cuando la web y la API corren por separado, con una sesion por proceso
+que reutiliza conexiones (``get_http_session``).
+
+Los dos devuelven un objeto con ``status_code``, ``headers``, ``content`` y
+``json()``, como ``requests.Response``.
+"""
+import json as jsonlib
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpResponseNotFound
+from django.urls import Resolver404, resolve
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+_session_key = None
+_session_lock = threading.Lock()
+
+
+def session_config():
+    return (
+        os.getpid(),
+        settings.API_HTTP_POOL_SIZE,
+        settings.API_HTTP_MAX_RETRIES,
+        settings.API_HTTP_RETRY_BACKOFF,
+    )
+
+
+def build_http_session(pool_size, max_retries, backoff):
+    session = requests.Session()
+    # Sin cookies: la sesion se comparte entre los usuarios de la web.
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # Retry solo reintenta metodos idempotentes (no POST ni PATCH).
+    retries = Retry(
+        total=max_retries, backoff_factor=backoff, status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session():
+    """
+    ``requests.Session`` del proceso, con un pool de ``API_HTTP_POOL_SIZE``
+    conexiones keep-alive por host (compartido entre hilos). Se vuelve a
+    crear en un proceso hijo (fork) o si cambia la configuracion.
+    """
+    global _session, _session_key
+    config = session_config()
+    if _session_key != config:
+        with _session_lock:
+            if _session_key != config:
+                # La sesion anterior no se cierra: despues de un fork sus
+                # sockets son del proceso padre.
+                _session = build_http_session(*config[1:])
+                _session_key = config
+    return _session
+
+
+def reset_http_session():
+    global _session, _session_key
+    with _session_lock:
+        _session = _session_key = None
+
+
+def http_pool_stats():
+    """
+    Requests y conexiones abiertas por el pool del proceso actual;
+    ``reused`` son los requests que usaron una conexion ya abierta.
+    """
+    requests_sent = connections = 0
+    if _session is not None:
+        for adapter in {id(a): a for a in _session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    requests_sent += pool.num_requests
+                    connections += pool.num_connections
+    reused = max(requests_sent - connections, 0)
+    return {
+        "requests": requests_sent,
+        "connections": connections,
+        "reused": reused,
+        "reuse_ratio": reused / requests_sent if requests_sent else 0.0,
+    }
+
+
+class HttpTransport:
+    """La API por HTTP, con la sesion de ``get_http_session``."""
+    def __init__(self, request):
+        self.request = request
+
+    def send(self, method, url, json=None, headers=None, params=None, timeout=None):
+        return get_http_session().request(
+            method, url, json=json, headers=headers, params=params, timeout=timeout
+        )
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        return get_http_session().post(url, json=json, headers=headers, timeout=timeout)
+
+
+def plain_copy(value):
+    """Copia de dicts y listas (lo que devolveria decodificar el JSON)."""
+    if isinstance(value, dict):
+        return {key: plain_copy(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain_copy(item) for item in value]
+    return value
+
+
+class InProcessResponse:
+    """Respuesta de una vista de la API con la interfaz de ``requests.Response``."""
+    def __init__(self, response):
+        self.response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def content(self):
+        if not getattr(self.response, "is_rendered", True):
+            self.response.render()
+        return self.response.content
+
+    @property
+    def text(self):
+        return self.content.decode(self.response.charset or "utf-8")
+
+    def json(self):
+        data = getattr(self.response, "data", None)
+        if data is not None:
+            # Copia: la API puede tener ``data`` en su cache de respuestas.
+            return plain_copy(data)
+        return jsonlib.loads(self.content)
+
+
+class InProcessTransport:
+    """
+    Arma un request para la URL de la API (con el host y el esquema del
+    request de la pagina) y llama a la vista que le corresponde.
+    """
+    # Del request de la pagina se copia todo menos headers y cuerpo.
+    skipped_meta = ("HTTP_", "CONTENT_", "wsgi.")
+
+    def __init__(self, request):
+        self.request = request
+
+    def build_request(self, method, url, json=None, headers=None, params=None):
+        body = b"" if json is None else jsonlib.dumps(json).encode()
+        environ = {
+            key: value for key, value in self.request.META.items()
+            if not key.startswith(self.skipped_meta)
+        }
+        environ.update({
+            "REQUEST_METHOD": method.upper(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": urlsplit(url).path,
+            "QUERY_STRING": urlencode(params or {}, doseq=True),
+            "HTTP_HOST": self.request.get_host(),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": BytesIO(body),
+            "wsgi.url_scheme": self.request.scheme,
+        })
+        for name, value in (headers or {}).items():
+            key = name.upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            environ[key] = value
+        return WSGIRequest(environ)
+
+    def send(self, method, url, json=None, headers=None, params=None, timeout=None):
+        api_request = self.build_request(method, url, json, headers, params)
+        try:
+            match = resolve(api_request.path_info)
+        except Resolver404:
+            return InProcessResponse(HttpResponseNotFound())
+        api_request.resolver_match = match
+        return InProcessResponse(match.func(api_request, *match.args, **match.kwargs))
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        return self.send("POST", url, json=json, headers=headers, timeout=timeout)
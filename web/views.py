@@ -14,8 +14,8 @@ from .forms import (
     TaskUpdateForm,
     TaskFilterForm
 )
-from .mixins import ApiSessionMixin, SessionRequiredMixin
-from .tables import TaskTable
+from .mixins import ApiRedirect, ApiSessionMixin, SessionRequiredMixin
+from .tables import ApiTableData, TaskTable
 
 logger = logging.getLogger(__name__)
 
@@ -130,7 +130,7 @@ class TaskListCreateView(
     """
     def get(self, request):
         filter_form = TaskFilterForm(request.GET or None)
-        params = {}
+        params = {"fields": ",".join(TaskTable.api_fields), "pagination": "cached"}
         if filter_form.is_valid():
             data = filter_form.cleaned_data
             if data.get("completed"):
@@ -144,24 +144,28 @@ class TaskListCreateView(
             if data.get("updated_at_before"):
                 params["updated_at_before"] = data["updated_at_before"].isoformat()
 
-        resp = self.api_request(
-            "GET", "/", request,
-            error_msg="No se pudieron obtener las tareas.",
-            params=params or None,
-        )
-        if isinstance(resp, HttpResponseBase):
-            return resp
-
-        tasks = []
-        if resp and resp.status_code == 200:
-            try:
-                data = resp.json()
-            except ValueError:
-                data = []
-            tasks = data.get("results", data) if isinstance(data, dict) else data
-
-        table = TaskTable(tasks)
-        RequestConfig(request, paginate={"per_page": 10}).configure(table)
+        def fetch(page_params):
+            resp = self.api_request(
+                "GET", "/", request,
+                error_msg="No se pudieron obtener las tareas.",
+                params=page_params,
+            )
+            if isinstance(resp, HttpResponseBase):
+                raise ApiRedirect(resp)
+            if resp and resp.status_code == 200:
+                try:
+                    return resp.json()
+                except ValueError:
+                    pass
+            return None
+
+        # Una sola llamada a la API por pagina: la pagina y el orden de la
+        # tabla se piden a la API (ApiTableData).
+        table = TaskTable(ApiTableData(fetch, params))
+        try:
+            RequestConfig(request, paginate={"per_page": 10}).configure(table)
+        except ApiRedirect as redirect:
+            return redirect.response
 
         return render(request, "web/tasks.html", {
             "form": TaskForm(),